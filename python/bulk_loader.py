@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+# Copyright 2025
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Streaming bulk loader for Iceberg tables. Sources yield columnar Arrow
+# record batches, and the loader commits once per N batches rather than
+# once per batch.
+
+import argparse
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable, Iterator, List, Mapping, Optional, Sequence
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pv
+import pyarrow.parquet as pq
+from pyiceberg.table import TableProperties
+
+from iceberg_catalog import get_catalog
+from tracing import span
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+DEFAULT_BATCH_ROWS = 256 * 1024
+DEFAULT_BATCHES_PER_COMMIT = 16
+
+
+@dataclass
+class LoadStats:
+    """Counters for a single load."""
+
+    rows: int = 0
+    batches: int = 0
+    commits: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    @property
+    def commits_per_sec(self) -> float:
+        return self.commits / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        return (
+            f"{self.rows} rows in {self.batches} batches, {self.commits} commits, "
+            f"{self.seconds:.2f}s ({self.rows_per_sec:,.0f} rows/s, "
+            f"{self.commits_per_sec:.2f} commits/s)"
+        )
+
+
+def conform_batch(
+    batch: pa.RecordBatch, schema: pa.Schema, timestamp_format: str = TIMESTAMP_FORMAT
+) -> pa.RecordBatch:
+    """Cast a batch to the target schema, parsing string timestamps in bulk."""
+    columns = []
+    for field in schema:
+        column = batch.column(field.name)
+        is_text = pa.types.is_string(column.type) or pa.types.is_large_string(
+            column.type
+        )
+        if pa.types.is_timestamp(field.type) and is_text:
+            column = pc.strptime(column, format=timestamp_format, unit=field.type.unit)
+        columns.append(column.cast(field.type))
+    return pa.RecordBatch.from_arrays(columns, schema=schema)
+
+
+def batch_from_columns(
+    columns: Mapping[str, Sequence],
+    schema: pa.Schema,
+    timestamp_format: str = TIMESTAMP_FORMAT,
+) -> pa.RecordBatch:
+    """Build a record batch from a mapping of column name to values."""
+    arrays = {name: pa.array(values) for name, values in columns.items()}
+    batch = pa.RecordBatch.from_pydict(arrays)
+    return conform_batch(batch, schema, timestamp_format)
+
+
+def csv_source(
+    path: str,
+    schema: pa.Schema,
+    block_size: int = 64 * 1024 * 1024,
+    timestamp_format: str = TIMESTAMP_FORMAT,
+) -> Iterator[pa.RecordBatch]:
+    """Stream record batches from a CSV file with a header row."""
+    convert_options = pv.ConvertOptions(
+        column_types=schema, timestamp_parsers=[timestamp_format]
+    )
+    reader = pv.open_csv(
+        path,
+        read_options=pv.ReadOptions(block_size=block_size),
+        convert_options=convert_options,
+    )
+    for batch in reader:
+        yield conform_batch(batch, schema, timestamp_format)
+
+
+def parquet_source(
+    path: str, schema: pa.Schema, batch_rows: int = DEFAULT_BATCH_ROWS
+) -> Iterator[pa.RecordBatch]:
+    """Stream record batches from a Parquet file."""
+    parquet_file = pq.ParquetFile(path)
+    for batch in parquet_file.iter_batches(batch_size=batch_rows, columns=schema.names):
+        yield conform_batch(batch, schema)
+
+
+def generator_source(
+    chunks: Iterable, schema: pa.Schema, timestamp_format: str = TIMESTAMP_FORMAT
+) -> Iterator[pa.RecordBatch]:
+    """Adapt an iterable of record batches or column mappings to a batch stream."""
+    for chunk in chunks:
+        if isinstance(chunk, pa.RecordBatch):
+            yield conform_batch(chunk, schema, timestamp_format)
+        else:
+            yield batch_from_columns(chunk, schema, timestamp_format)
+
+
+def synthetic_bids(
+    rows: int,
+    batch_rows: int = DEFAULT_BATCH_ROWS,
+    start: datetime = datetime(2019, 8, 7),
+    days: int = 5,
+    symbols: Sequence[str] = ("AAPL", "AMZN", "GOOG", "MSFT", "NVDA", "TSLA"),
+    seed: int = 0,
+) -> Iterator[dict]:
+    """Generate columns of random quotes for the iceberg.bids table."""
+    rng = np.random.default_rng(seed)
+    start_us = np.datetime64(start, "us")
+    span_us = days * 24 * 3600 * 1_000_000
+    symbol_values = np.array(symbols, dtype=object)
+    remaining = rows
+    while remaining > 0:
+        n = min(batch_rows, remaining)
+        bid = rng.uniform(100.0, 300.0, n).round(2)
+        yield {
+            "datetime": start_us
+            + rng.integers(0, span_us, n).astype("timedelta64[us]"),
+            "symbol": symbol_values[rng.integers(0, len(symbols), n)],
+            "bid": bid,
+            "ask": bid + rng.uniform(0.01, 0.5, n).round(2),
+        }
+        remaining -= n
+
+
+class BulkLoader:
+    """Append record batches to an Iceberg table, committing once per N batches."""
+
+    def __init__(
+        self,
+        table,
+        batches_per_commit: int = DEFAULT_BATCHES_PER_COMMIT,
+        target_file_size_bytes: Optional[int] = None,
+        row_group_rows: Optional[int] = None,
+    ):
+        """Initialize the loader and apply write properties to the table."""
+        self.table = table
+        self.batches_per_commit = batches_per_commit
+        self.schema = table.schema().as_arrow()
+        properties = {}
+        if target_file_size_bytes is not None:
+            properties[TableProperties.WRITE_TARGET_FILE_SIZE_BYTES] = str(
+                target_file_size_bytes
+            )
+        if row_group_rows is not None:
+            properties[TableProperties.PARQUET_ROW_GROUP_LIMIT] = str(row_group_rows)
+        self._set_properties(properties)
+
+    def load(self, batches: Iterable[pa.RecordBatch]) -> LoadStats:
+        """Load all batches from a source and return load statistics."""
+        stats = LoadStats()
+        start = time.perf_counter()
+        pending: List[pa.RecordBatch] = []
+        for batch in batches:
+            pending.append(batch)
+            stats.batches += 1
+            if len(pending) >= self.batches_per_commit:
+                stats.rows += self._commit(pending)
+                stats.commits += 1
+                pending = []
+        if pending:
+            stats.rows += self._commit(pending)
+            stats.commits += 1
+        stats.seconds = time.perf_counter() - start
+        return stats
+
+    def _commit(self, batches: List[pa.RecordBatch]) -> int:
+        """Append accumulated batches as a single snapshot."""
+        df = pa.Table.from_batches(batches, schema=self.schema)
+        with span("bulk_loader.append", "io", rows=df.num_rows):
+            self.table.append(df)
+        return df.num_rows
+
+    def _set_properties(self, properties: dict):
+        """Update table properties that differ from current values."""
+        current = self.table.properties
+        changed = {k: v for k, v in properties.items() if current.get(k) != v}
+        if changed:
+            with self.table.transaction() as txn:
+                txn.set_properties(changed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk load iceberg.bids")
+    parser.add_argument("--table", default="iceberg.bids")
+    parser.add_argument(
+        "--source", choices=["synthetic", "csv", "parquet"], default="synthetic"
+    )
+    parser.add_argument("--path", help="Input file for csv or parquet sources")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch-rows", type=int, default=DEFAULT_BATCH_ROWS)
+    parser.add_argument(
+        "--batches-per-commit", type=int, default=DEFAULT_BATCHES_PER_COMMIT
+    )
+    parser.add_argument("--target-file-size-bytes", type=int)
+    parser.add_argument("--row-group-rows", type=int)
+    args = parser.parse_args()
+
+    catalog = get_catalog()
+    table = catalog.load_table(args.table)
+    loader = BulkLoader(
+        table,
+        batches_per_commit=args.batches_per_commit,
+        target_file_size_bytes=args.target_file_size_bytes,
+        row_group_rows=args.row_group_rows,
+    )
+    if args.source == "csv":
+        batches = csv_source(args.path, loader.schema)
+    elif args.source == "parquet":
+        batches = parquet_source(args.path, loader.schema, args.batch_rows)
+    else:
+        chunks = synthetic_bids(args.rows, args.batch_rows)
+        batches = generator_source(chunks, loader.schema)
+    print(f"Loaded {args.table}: {loader.load(batches)}")
+
+
+if __name__ == "__main__":
+    main()
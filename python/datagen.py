@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+# Copyright 2025
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Config-driven test data for Iceberg tables. Each table in a YAML file
+# defines its columns with value generators, partitioning, sort order and
+# a target row count. Tables are created and loaded in parallel, so large
+# representative datasets for query plan benchmarks can be built in MinIO.
+
+import argparse
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import pyiceberg.exceptions
+import yaml
+from pyiceberg.partitioning import PartitionField, PartitionSpec
+from pyiceberg.schema import Schema
+from pyiceberg.table.sorting import SortField, SortOrder
+from pyiceberg.transforms import DayTransform, IdentityTransform
+from pyiceberg.types import (
+    DoubleType,
+    FloatType,
+    IntegerType,
+    LongType,
+    NestedField,
+    StringType,
+    TimestampType,
+)
+
+from bulk_loader import DEFAULT_BATCH_ROWS, BulkLoader, LoadStats, generator_source
+from iceberg_catalog import get_catalog
+from partition_writer import PartitionedWriter
+from tracing import span
+
+DEFAULT_CONFIG = os.path.join(os.path.dirname(__file__), "datagen_tables.yaml")
+
+TYPES = {
+    "timestamp": TimestampType,
+    "string": StringType,
+    "double": DoubleType,
+    "float": FloatType,
+    "long": LongType,
+    "int": IntegerType,
+}
+TRANSFORMS = {"day": DayTransform, "identity": IdentityTransform}
+
+
+@dataclass
+class TableSpec:
+    """A table to generate, as read from the config file."""
+
+    name: str
+    rows: int
+    columns: List[dict]
+    partition: Optional[dict] = None
+    sort_by: List[str] = field(default_factory=list)
+    location: Optional[str] = None
+    batch_rows: int = DEFAULT_BATCH_ROWS
+    properties: Dict[str, str] = field(default_factory=dict)
+    seed: int = 0
+
+    def schema(self) -> Schema:
+        return Schema(
+            *[
+                NestedField(
+                    field_id=i,
+                    name=column["name"],
+                    field_type=TYPES[column["type"]](),
+                    required=False,
+                )
+                for i, column in enumerate(self.columns, start=1)
+            ]
+        )
+
+    def partition_spec(self) -> PartitionSpec:
+        if not self.partition:
+            return PartitionSpec()
+        schema = self.schema()
+        source = schema.find_field(self.partition["column"])
+        transform = self.partition.get("transform", "identity")
+        return PartitionSpec(
+            PartitionField(
+                source_id=source.field_id,
+                field_id=1000,
+                transform=TRANSFORMS[transform](),
+                name=f"{source.name}_{transform}",
+            )
+        )
+
+    def sort_order(self) -> SortOrder:
+        schema = self.schema()
+        return SortOrder(
+            *[
+                SortField(
+                    source_id=schema.find_field(name).field_id,
+                    transform=IdentityTransform(),
+                )
+                for name in self.sort_by
+            ]
+        )
+
+
+def load_specs(path: str = DEFAULT_CONFIG, scale: float = 1.0) -> List[TableSpec]:
+    """Read table specs from a YAML config, multiplying row counts by scale."""
+    with open(path) as f:
+        config = yaml.safe_load(f)
+    specs = [TableSpec(**table) for table in config["tables"]]
+    for spec in specs:
+        spec.rows = int(spec.rows * scale)
+    return specs
+
+
+def tickers(count: int, rng: np.random.Generator) -> np.ndarray:
+    """Return count distinct ticker-like symbols of 1 to 5 capital letters,
+    shuffled so the most frequent ones are spread across the alphabet."""
+    letters = np.array(list("ABCDEFGHIJKLMNOPQRSTUVWXYZ"))
+    symbols = set()
+    while len(symbols) < count:
+        length = int(rng.choice([1, 2, 3, 4, 5], p=[0.02, 0.08, 0.3, 0.45, 0.15]))
+        symbols.add("".join(rng.choice(letters, length)))
+    return rng.permutation(np.array(sorted(symbols), dtype=object))
+
+
+def zipf_ranks(count: int, s: float, n: int, rng: np.random.Generator):
+    """Draw n ranks in [0, count) where rank k has weight 1 / (k + 1) ** s."""
+    weights = 1.0 / np.arange(1, count + 1) ** s
+    return rng.choice(count, size=n, p=weights / weights.sum())
+
+
+class ColumnGenerator:
+    """Generate values of one column from its config. Generators may refer
+    to columns generated earlier in the same batch."""
+
+    def __init__(self, column: dict, rng: np.random.Generator):
+        self.name = column["name"]
+        self.config = column.get("generator", {"kind": "uniform"})
+        self.kind = self.config["kind"]
+        self.rng = rng
+        if self.kind == "symbols":
+            self.values = tickers(self.config.get("cardinality", 500), rng)
+        elif self.kind == "choice":
+            self.values = np.array(self.config["values"], dtype=object)
+        elif self.kind == "price":
+            self.bases = {}
+
+    def generate(self, n: int, batch: dict) -> np.ndarray:
+        c, rng = self.config, self.rng
+        if self.kind == "timestamp":
+            start = np.datetime64(datetime.fromisoformat(str(c["start"])), "us")
+            day_us = 24 * 3600 * 1_000_000
+            open_h, close_h = c.get("hours", [0, 24])
+            days = rng.integers(0, c.get("days", 1), n)
+            within = rng.uniform(open_h / 24, close_h / 24, n) * day_us
+            offsets = days * day_us + within.astype(np.int64)
+            return start + offsets.astype("timedelta64[us]")
+        if self.kind in ("symbols", "choice"):
+            skew = c.get("skew", 0)
+            if skew:
+                return self.values[zipf_ranks(len(self.values), skew, n, rng)]
+            return self.values[rng.integers(0, len(self.values), n)]
+        if self.kind == "zipf":
+            ranks = zipf_ranks(c.get("cardinality", 1000), c.get("skew", 1.1), n, rng)
+            return ranks + 1
+        if self.kind == "uniform":
+            return rng.uniform(c.get("min", 0.0), c.get("max", 1.0), n).round(
+                c.get("decimals", 2)
+            )
+        if self.kind == "normal":
+            return rng.normal(c.get("mean", 0.0), c.get("stddev", 1.0), n)
+        if self.kind == "lognormal":
+            return rng.lognormal(c.get("mean", 0.0), c.get("sigma", 1.0), n)
+        if self.kind == "price":
+            # Each key, e.g. a symbol, trades around its own base price.
+            keys = batch[c["by"]]
+            unique, inverse = np.unique(keys, return_inverse=True)
+            for key in unique:
+                if key not in self.bases:
+                    self.bases[key] = rng.uniform(c.get("min", 1), c.get("max", 500))
+            bases = np.array([self.bases[key] for key in unique])[inverse]
+            noise = rng.normal(0, c.get("volatility", 0.02), n)
+            return (bases * (1 + noise)).round(2)
+        if self.kind == "spread":
+            return (batch[c["of"]] + rng.uniform(c["min"], c["max"], n)).round(2)
+        raise ValueError(f"Unknown generator kind {self.kind!r} for {self.name}")
+
+
+def generate(spec: TableSpec) -> Iterator[dict]:
+    """Yield column batches for a table spec until its row count is reached."""
+    rng = np.random.default_rng(spec.seed)
+    generators = [ColumnGenerator(column, rng) for column in spec.columns]
+    remaining = spec.rows
+    while remaining > 0:
+        n = min(spec.batch_rows, remaining)
+        batch = {}
+        for generator in generators:
+            batch[generator.name] = generator.generate(n, batch)
+        yield batch
+        remaining -= n
+
+
+def setup_table(
+    catalog, spec: TableSpec, replace: bool = True, workers: int = None
+) -> LoadStats:
+    """Create a table from its spec and load generated data into it.
+    Day-partitioned tables are written with PartitionedWriter, so each
+    file holds one day sorted by the table sort order."""
+    namespace = spec.name.split(".")[0]
+    try:
+        catalog.create_namespace(namespace)
+    except pyiceberg.exceptions.NamespaceAlreadyExistsError:
+        pass
+    if replace:
+        try:
+            catalog.drop_table(spec.name)
+        except pyiceberg.exceptions.NoSuchTableError:
+            pass
+    table = catalog.create_table(
+        identifier=spec.name,
+        schema=spec.schema(),
+        location=spec.location,
+        partition_spec=spec.partition_spec(),
+        sort_order=spec.sort_order(),
+        properties=spec.properties,
+    )
+    schema = table.schema().as_arrow()
+    with span("datagen.load", "app", table=spec.name, rows=spec.rows):
+        if spec.partition and spec.partition.get("transform") == "day":
+            writer = PartitionedWriter(
+                table, partition_column=spec.partition["column"], max_workers=workers
+            )
+            return writer.write(generator_source(generate(spec), schema))
+        return BulkLoader(table).load(generator_source(generate(spec), schema))
+
+
+def setup_tables(
+    catalog, specs: List[TableSpec], parallel: int = 4, workers: int = None
+) -> Dict[str, LoadStats]:
+    """Create and load several tables at the same time. Unless workers is
+    given, the CPUs are split between the tables loaded at once."""
+    workers = workers or max(1, (os.cpu_count() or 1) // parallel)
+    with ThreadPoolExecutor(max_workers=parallel) as executor:
+        futures = {
+            spec.name: executor.submit(setup_table, catalog, spec, True, workers)
+            for spec in specs
+        }
+        return {name: future.result() for name, future in futures.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate Iceberg test tables")
+    parser.add_argument("--config", default=DEFAULT_CONFIG)
+    parser.add_argument("--tables", help="Comma-separated subset of tables")
+    parser.add_argument("--scale", type=float, default=1.0, help="Row count factor")
+    parser.add_argument("--parallel", type=int, default=4, help="Tables at a time")
+    parser.add_argument("--workers", type=int, help="Writer processes per table")
+    args = parser.parse_args()
+
+    specs = load_specs(args.config, args.scale)
+    if args.tables:
+        specs = [s for s in specs if s.name in args.tables.split(",")]
+    results = setup_tables(get_catalog(), specs, args.parallel, args.workers)
+    for name, stats in results.items():
+        print(f"Loaded {name}: {stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+# Copyright 2025
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Shared catalog connection for the Python samples. The catalog is built
+# once per process from a profile in catalog_profiles.yaml and keeps a
+# pooled keep-alive HTTP session. Readers that reload the same tables can
+# opt in to caching table metadata for a TTL. Commits made in this process
+# update the cache at once, and commits by other processes become visible
+# once the TTL expires.
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+import yaml
+from pyiceberg.catalog import Catalog, load_catalog
+from pyiceberg.table import Table
+
+from tracing import span, traced
+
+DEFAULT_TTL_SECONDS = 0.0
+DEFAULT_POOL_SIZE = 16
+
+_catalogs: Dict[Tuple[str, float, int], "CachingCatalog"] = {}
+_catalog_lock = threading.Lock()
+
+
+@dataclass
+class _CacheEntry:
+    table: Table
+    loaded_at: float
+
+
+def _key(identifier) -> str:
+    return identifier if isinstance(identifier, str) else ".".join(identifier)
+
+
+class CachingCatalog:
+    """Catalog wrapper that can cache load_table results.
+
+    With ttl_seconds > 0, table metadata is reused until the TTL expires.
+    Commits through tables loaded from this catalog replace the cached
+    metadata, so the new snapshot is seen at once in this process, but
+    commits by other writers are not seen until the TTL expires. Every
+    load returns its own Table object, so a refresh or commit by one
+    caller does not change the tables of others. The default TTL of 0
+    always loads the latest metadata. Other catalog calls are delegated.
+    """
+
+    def __init__(self, catalog: Catalog, ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        self.catalog = catalog
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._tables: Dict[str, _CacheEntry] = {}
+        self._lock = threading.Lock()
+
+    def load_table(self, identifier) -> Table:
+        """Return a table, reusing cached metadata while it is fresh."""
+        key = _key(identifier)
+        with self._lock:
+            entry = self._tables.get(key)
+            if entry and time.monotonic() - entry.loaded_at < self.ttl_seconds:
+                self.hits += 1
+                return self._own(entry.table)
+        with span("catalog.load_table", "catalog", table=key):
+            table = self.catalog.load_table(identifier)
+        with self._lock:
+            self.misses += 1
+            if self.ttl_seconds > 0:
+                self._tables[key] = _CacheEntry(table, time.monotonic())
+        return self._own(table)
+
+    def commit_table(self, table: Table, requirements, updates):
+        """Commit a table and cache the metadata of the new snapshot."""
+        with span("catalog.commit_table", "catalog"):
+            response = self.catalog.commit_table(table, requirements, updates)
+        key = _key(table.name())
+        with self._lock:
+            entry = self._tables.get(key)
+            if entry:
+                entry.table = Table(
+                    entry.table.name(),
+                    response.metadata,
+                    response.metadata_location,
+                    entry.table.io,
+                    self.catalog,
+                    entry.table.config,
+                )
+        return response
+
+    def create_table(self, identifier, *args, **kwargs) -> Table:
+        """Create a table that commits through this catalog."""
+        self.invalidate(identifier)
+        with span("catalog.create_table", "catalog"):
+            return self._own(self.catalog.create_table(identifier, *args, **kwargs))
+
+    def invalidate(self, identifier=None):
+        """Drop one cached table, or all of them if no identifier is given."""
+        with self._lock:
+            if identifier is None:
+                self._tables.clear()
+            else:
+                self._tables.pop(_key(identifier), None)
+
+    def drop_table(self, identifier):
+        """Drop a table and its cache entry."""
+        self.invalidate(identifier)
+        with span("catalog.drop_table", "catalog"):
+            return self.catalog.drop_table(identifier)
+
+    def purge_table(self, identifier):
+        """Drop a table with its files, and its cache entry."""
+        self.invalidate(identifier)
+        with span("catalog.purge_table", "catalog"):
+            return self.catalog.purge_table(identifier)
+
+    def rename_table(self, from_identifier, to_identifier) -> Table:
+        """Rename a table and drop the cache entries of both names."""
+        self.invalidate(from_identifier)
+        self.invalidate(to_identifier)
+        with span("catalog.rename_table", "catalog"):
+            return self._own(self.catalog.rename_table(from_identifier, to_identifier))
+
+    def _own(self, table: Table) -> Table:
+        """Return a copy of a table that commits through this catalog."""
+        return Table(
+            table.name(),
+            table.metadata,
+            table.metadata_location,
+            table.io,
+            self,
+            table.config,
+        )
+
+    def __getattr__(self, name):
+        attr = getattr(self.catalog, name)
+        if callable(attr) and not name.startswith("_"):
+            return traced(f"catalog.{name}", "catalog")(attr)
+        return attr
+
+
+def load_profile(profile_name: str = None) -> dict:
+    """Return catalog properties for a profile in catalog_profiles.yaml."""
+    profile_name = profile_name or os.getenv("ICEBERG_PROFILE", "docker")
+    config_path = os.path.join(os.path.dirname(__file__), "catalog_profiles.yaml")
+    with open(config_path) as f:
+        profiles = yaml.safe_load(f)
+    if profile_name not in profiles:
+        raise ValueError(
+            f"Unknown profile name: {profile_name}. Available: {list(profiles.keys())}"
+        )
+    return {k: str(v) for k, v in profiles[profile_name].items() if v is not None}
+
+
+def _pool_connections(catalog: Catalog, pool_size: int):
+    """Mount a larger keep-alive connection pool on the REST session."""
+    from requests.adapters import HTTPAdapter
+
+    session = getattr(catalog, "_session", None)
+    if session is None or catalog.properties.get("rest.sigv4-enabled") == "true":
+        return
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+
+def get_catalog(
+    profile_name: str = None,
+    ttl_seconds: float = DEFAULT_TTL_SECONDS,
+    pool_size: int = DEFAULT_POOL_SIZE,
+) -> CachingCatalog:
+    """Get the process-wide catalog for a profile and settings, creating it
+    on first use."""
+    profile_name = profile_name or os.getenv("ICEBERG_PROFILE", "docker")
+    key = (profile_name, ttl_seconds, pool_size)
+    with _catalog_lock:
+        if key not in _catalogs:
+            properties = load_profile(profile_name)
+            with span("catalog.connect", "catalog", profile=profile_name):
+                catalog = load_catalog("rest", **properties)
+            _pool_connections(catalog, pool_size)
+            _catalogs[key] = CachingCatalog(catalog, ttl_seconds)
+        return _catalogs[key]
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+# Copyright 2025
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Maintenance for tables written by many small appends. Small data files
+# are bin-packed per partition into target-size files sorted by the table
+# sort order and swapped in with one overwrite commit, tagged as a rewrite
+# in the snapshot summary. Snapshots older than a retention period are
+# then expired and files only they referenced are deleted.
+
+import argparse
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import List, Set
+
+import pyarrow as pa
+from pyiceberg.expressions import AlwaysTrue
+from pyiceberg.io.pyarrow import ArrowScan, _dataframe_to_data_files
+from pyiceberg.table import TableProperties
+
+from iceberg_catalog import get_catalog
+
+DEFAULT_MIN_INPUT_FILES = 2
+
+# Iceberg's default history.expire.max-snapshot-age-ms of 5 days. Readers
+# and incremental consumers may still use snapshots younger than this.
+DEFAULT_MAX_SNAPSHOT_AGE_HOURS = 5 * 24
+
+# Added to the summary of compaction snapshots. pyiceberg cannot commit a
+# replace snapshot, so compaction is an overwrite that adds and deletes
+# the same number of records.
+REWRITE_SUMMARY = {"rewrite": "compaction"}
+
+
+@dataclass
+class ScanTiming:
+    """Planning and read time of a full table scan."""
+
+    files: int
+    plan_ms: float
+    scan_ms: float
+    rows: int
+
+    def __str__(self):
+        return (
+            f"{self.files} files, {self.rows} rows, plan {self.plan_ms:.0f} ms, "
+            f"scan {self.scan_ms:.0f} ms"
+        )
+
+
+@dataclass
+class CompactionStats:
+    """Outcome of one compaction run."""
+
+    partitions: int = 0
+    files_removed: int = 0
+    files_added: int = 0
+    bytes_rewritten: int = 0
+    snapshots_expired: int = 0
+    orphans_deleted: int = 0
+    seconds: float = 0.0
+
+
+def time_scan(table) -> ScanTiming:
+    """Time planning and reading a full scan of the current snapshot.
+    Batches are counted and dropped, so the table is never held in memory."""
+    scan = table.scan()
+    start = time.perf_counter()
+    tasks = list(scan.plan_files())
+    planned = time.perf_counter()
+    rows = sum(batch.num_rows for batch in scan.to_arrow_batch_reader())
+    done = time.perf_counter()
+    return ScanTiming(
+        len(tasks), (planned - start) * 1000, (done - planned) * 1000, rows
+    )
+
+
+def bin_pack(tasks: list, target_bytes: int) -> List[list]:
+    """Group scan tasks into bins of at most target_bytes, largest first."""
+    bins, sizes = [], []
+    for task in sorted(tasks, key=lambda t: -t.file.file_size_in_bytes):
+        size = task.file.file_size_in_bytes
+        for i, used in enumerate(sizes):
+            if used + size <= target_bytes:
+                bins[i].append(task)
+                sizes[i] += size
+                break
+        else:
+            bins.append([task])
+            sizes.append(size)
+    return bins
+
+
+class Compactor:
+    """Rewrite small files of a table into target-size sorted files."""
+
+    def __init__(
+        self,
+        table,
+        target_file_size_bytes: int = None,
+        min_input_files: int = DEFAULT_MIN_INPUT_FILES,
+        max_workers: int = 4,
+    ):
+        """Initialize the compactor. The target size defaults to the table's
+        write.target-file-size-bytes property."""
+        self.table = table
+        self.target_file_size_bytes = target_file_size_bytes or int(
+            table.properties.get(
+                TableProperties.WRITE_TARGET_FILE_SIZE_BYTES,
+                TableProperties.WRITE_TARGET_FILE_SIZE_BYTES_DEFAULT,
+            )
+        )
+        self.min_input_files = min_input_files
+        self.max_workers = max_workers
+        self.sort_columns = [
+            table.schema().find_column_name(field.source_id)
+            for field in table.sort_order().fields
+        ]
+
+    def plan(self) -> List[list]:
+        """Return bins of small files, each rewritten into one file. Files
+        are only combined within a partition of the same spec."""
+        small_limit = self.target_file_size_bytes * 3 // 4
+        by_partition = defaultdict(list)
+        for task in self.table.scan().plan_files():
+            # Files with deletes are left to a rewrite that applies them.
+            if task.delete_files or task.file.file_size_in_bytes >= small_limit:
+                continue
+            key = (task.file.spec_id, tuple(task.file.partition))
+            by_partition[key].append(task)
+        bins = []
+        for tasks in by_partition.values():
+            if len(tasks) >= self.min_input_files:
+                bins.extend(
+                    b
+                    for b in bin_pack(tasks, self.target_file_size_bytes)
+                    if len(b) >= self.min_input_files
+                )
+        return bins
+
+    def compact(self) -> CompactionStats:
+        """Rewrite all planned bins and commit them as one overwrite snapshot
+        tagged with REWRITE_SUMMARY."""
+        stats = CompactionStats()
+        start = time.perf_counter()
+        bins = self.plan()
+        if not bins:
+            print("Nothing to compact")
+            return stats
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            new_files = [
+                f for files in executor.map(self._rewrite, bins) for f in files
+            ]
+
+        with self.table.transaction() as txn:
+            with txn.update_snapshot(REWRITE_SUMMARY).overwrite() as overwrite:
+                for tasks in bins:
+                    for task in tasks:
+                        overwrite.delete_data_file(task.file)
+                for data_file in new_files:
+                    overwrite.append_data_file(data_file)
+
+        stats.partitions = len(
+            {(b[0].file.spec_id, tuple(b[0].file.partition)) for b in bins}
+        )
+        stats.files_removed = sum(len(b) for b in bins)
+        stats.files_added = len(new_files)
+        stats.bytes_rewritten = sum(t.file.file_size_in_bytes for b in bins for t in b)
+        stats.seconds = time.perf_counter() - start
+        return stats
+
+    def _rewrite(self, tasks: list) -> list:
+        """Read one bin, sort it and write it back as new data files."""
+        metadata = self.table.metadata
+        df = ArrowScan(
+            metadata, self.table.io, self.table.schema(), AlwaysTrue(), True
+        ).to_table(tasks)
+        if self.sort_columns:
+            df = df.sort_by([(name, "ascending") for name in self.sort_columns])
+        df = df.cast(pa.schema(self.table.schema().as_arrow()))
+        return list(
+            _dataframe_to_data_files(
+                metadata, df, self.table.io, write_uuid=uuid.uuid4()
+            )
+        )
+
+
+def _referenced_files(table, snapshots, live_only: bool) -> Set[str]:
+    """Return manifest lists, manifests and data files used by snapshots.
+    With live_only, data files a snapshot marks as deleted are left out."""
+    paths = set()
+    for snapshot in snapshots:
+        paths.add(snapshot.manifest_list)
+        for manifest in snapshot.manifests(table.io):
+            paths.add(manifest.manifest_path)
+            entries = manifest.fetch_manifest_entry(table.io, discard_deleted=live_only)
+            paths.update(entry.data_file.file_path for entry in entries)
+    return paths
+
+
+def expire_snapshots(
+    table,
+    retain_last: int = 1,
+    max_age_hours: float = DEFAULT_MAX_SNAPSHOT_AGE_HOURS,
+    delete_workers: int = 16,
+) -> tuple:
+    """Expire snapshots beyond the newest retain_last that are older than
+    max_age_hours, then delete files that no remaining snapshot references
+    on delete_workers threads. Returns the number of expired snapshots and
+    deleted files.
+
+    max_age_hours=0 expires old snapshots at once, which breaks readers
+    and incremental consumers still on them."""
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=max_age_hours)
+    cutoff_ms = int(cutoff.timestamp() * 1000)
+    snapshots = sorted(table.metadata.snapshots, key=lambda s: s.timestamp_ms)
+    current = table.metadata.current_snapshot_id
+    expired = [
+        s
+        for s in snapshots[: max(0, len(snapshots) - retain_last)]
+        if s.timestamp_ms < cutoff_ms and s.snapshot_id != current
+    ]
+    if not expired:
+        return 0, 0
+
+    candidates = _referenced_files(table, expired, live_only=False)
+    expire = table.maintenance.expire_snapshots()
+    # pyiceberg 0.10 declares the ids to expire as a class attribute, so
+    # every builder would otherwise add to the ids of earlier calls.
+    expire._snapshot_ids_to_expire = set()
+    expire.by_ids([s.snapshot_id for s in expired]).commit()
+    table.refresh()
+
+    orphans = candidates - _referenced_files(
+        table, table.metadata.snapshots, live_only=True
+    )
+    with ThreadPoolExecutor(max_workers=delete_workers) as executor:
+        list(executor.map(table.io.delete, orphans))
+    return len(expired), len(orphans)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compact small files and expire snapshots"
+    )
+    parser.add_argument("--table", default="iceberg.bids")
+    parser.add_argument(
+        "--target-file-size-mb", type=int, help="Default: table property"
+    )
+    parser.add_argument("--min-input-files", type=int, default=DEFAULT_MIN_INPUT_FILES)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--retain-last", type=int, default=1)
+    parser.add_argument(
+        "--max-snapshot-age-hours",
+        type=float,
+        default=DEFAULT_MAX_SNAPSHOT_AGE_HOURS,
+        help="Keep younger snapshots; 0 expires old snapshots immediately",
+    )
+    parser.add_argument("--no-expire", action="store_true", help="Keep old snapshots")
+    args = parser.parse_args()
+
+    catalog = get_catalog()
+    table = catalog.load_table(args.table)
+    before = time_scan(table)
+    print(f"Before: {before}")
+
+    compactor = Compactor(
+        table,
+        target_file_size_bytes=(
+            args.target_file_size_mb * 1024 * 1024 if args.target_file_size_mb else None
+        ),
+        min_input_files=args.min_input_files,
+        max_workers=args.workers,
+    )
+    stats = compactor.compact()
+    if not args.no_expire:
+        stats.snapshots_expired, stats.orphans_deleted = expire_snapshots(
+            table, args.retain_last, args.max_snapshot_age_hours
+        )
+    print(
+        f"Rewrote {stats.files_removed} files ({stats.bytes_rewritten} bytes) in "
+        f"{stats.partitions} partitions into {stats.files_added} files in "
+        f"{stats.seconds:.1f}s; expired {stats.snapshots_expired} snapshots and "
+        f"deleted {stats.orphans_deleted} unreferenced files"
+    )
+
+    after = time_scan(table)
+    print(f"After:  {after}")
+    if after.rows != before.rows:
+        raise SystemExit(f"Row count changed from {before.rows} to {after.rows}")
+
+
+if __name__ == "__main__":
+    main()
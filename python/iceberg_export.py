@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# Copyright 2025
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Export an Iceberg table to a local Parquet or Arrow IPC file with bounded
+# memory. Batches stream from the scan straight into the sink, and the
+# script reports peak RSS against rows scanned.
+
+import argparse
+import resource
+import time
+
+from iceberg_catalog import get_catalog
+from scan_reader import (
+    DEFAULT_MAX_BUFFERED_BYTES,
+    DEFAULT_PREFETCH_FILES,
+    pushdown_scan,
+    stream_batches,
+    write_batches,
+)
+
+
+def peak_rss_mb() -> float:
+    """Return peak resident set size of this process in MB."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def report_rss(batches, every_rows: int):
+    """Pass batches through, printing peak RSS every N rows scanned."""
+    rows = 0
+    next_report = every_rows
+    start = time.perf_counter()
+    for batch in batches:
+        yield batch
+        rows += batch.num_rows
+        if rows >= next_report:
+            elapsed = time.perf_counter() - start
+            print(f"rows={rows} peak_rss_mb={peak_rss_mb():.1f} seconds={elapsed:.2f}")
+            next_report += every_rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream an Iceberg table to a file")
+    parser.add_argument("--table", default="iceberg.bids")
+    parser.add_argument("--output", required=True)
+    parser.add_argument("--format", choices=["parquet", "ipc"], default="parquet")
+    parser.add_argument("--prefetch-files", type=int, default=DEFAULT_PREFETCH_FILES)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument(
+        "--max-buffered-mb", type=int, default=DEFAULT_MAX_BUFFERED_BYTES >> 20
+    )
+    parser.add_argument("--report-rows", type=int, default=1_000_000)
+    parser.add_argument("--symbols", help="Comma-separated symbols")
+    parser.add_argument("--columns", help="Comma-separated columns")
+    args = parser.parse_args()
+
+    catalog = get_catalog()
+    table = catalog.load_table(args.table)
+    scan = pushdown_scan(
+        table,
+        symbols=args.symbols.split(",") if args.symbols else None,
+        columns=args.columns.split(",") if args.columns else None,
+    )
+    batches = stream_batches(
+        scan,
+        prefetch_files=args.prefetch_files,
+        max_buffered_bytes=args.max_buffered_mb << 20,
+        concurrency=args.concurrency,
+    )
+    schema = scan.projection().as_arrow()
+    rows = write_batches(
+        report_rss(batches, args.report_rows), schema, args.output, args.format
+    )
+    print(f"Exported {rows} rows to {args.output}, peak_rss_mb={peak_rss_mb():.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,54 @@
 #!/usr/bin/env python3
-# Python script showing how to create and populate a table in Iceberg. 
+# Python script showing how to read a table in Iceberg.
 
-# Uncomment to see the module search path. 
+# Uncomment to see the module search path.
 #import sys
 #print(sys.path)
 
-# Allows us to connect to the catalog. 
-from pyiceberg.catalog import load_catalog
+import argparse
 
-print("Connect to the catalog") 
-catalog = load_catalog(
-    "rest", 
-    **{
-        "uri": "http://localhost:5000/",  # REST server URL. 
-        "type": "rest",
-        "token": "foo",
-        "s3.endpoint": f"http://localhost:9002",  # Minio URI and credentials
-        "s3.access-key-id": "minio",
-        "s3.secret-access-key": "minio123",
-    }  
-)
+from pyiceberg.exceptions import NoSuchTableError
 
-print("Get iceberg.bids data as a Pandas dataframe and print it")
+# Allows us to connect to the catalog using catalog_profiles.yaml.
+from iceberg_catalog import get_catalog
+from scan_reader import pruning_stats, pushdown_scan
+from tracing import span
+
+# Optional filters are pushed down to Iceberg so that only matching
+# partitions, files and columns are read.
+parser = argparse.ArgumentParser(description="Read iceberg.bids")
+parser.add_argument("--table", default="iceberg.bids", help="Table to read")
+parser.add_argument("--symbols", help="Comma-separated symbols, e.g. AAPL,MSFT")
+parser.add_argument("--start", help="Start datetime (inclusive), e.g. 2019-08-07T00:00:00")
+parser.add_argument("--end", help="End datetime (exclusive), e.g. 2019-08-08T00:00:00")
+parser.add_argument("--columns", help="Comma-separated columns to read")
+parser.add_argument("--stream", action="store_true", help="Print Arrow record batches")
+args = parser.parse_args()
+
+print("Connect to the catalog")
+catalog = get_catalog()
+
+if args.stream:
+    print(f"Get {args.table} data as Arrow record batches and print them")
+else:
+    print(f"Get {args.table} data as a Pandas dataframe and print it")
 try:
-    table = catalog.load_table("iceberg.bids")
-    df = table.scan().to_pandas()
-    print(df)
-except pyiceberg.exceptions.NoSuchTableError:
-    print("Table iceberg.bids does not exist")
+    table = catalog.load_table(args.table)
+    scan = pushdown_scan(
+        table,
+        symbols=args.symbols.split(",") if args.symbols else None,
+        start=args.start,
+        end=args.end,
+        columns=args.columns.split(",") if args.columns else None,
+    )
+    with span("iceberg_read.plan", "catalog"):
+        print(f"Pruning: {pruning_stats(table, scan)}")
+    with span("iceberg_read.read", "io"):
+        if args.stream:
+            for batch in scan.to_arrow_batch_reader():
+                print(batch.to_pandas())
+        else:
+            df = scan.to_pandas()
+            print(df)
+except NoSuchTableError:
+    print(f"Table {args.table} does not exist")
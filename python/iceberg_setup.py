@@ -5,12 +5,12 @@
 # import sys
 # print(sys.path)
 
-from datetime import datetime 
+import argparse
+import os
+import subprocess
+import sys
 
-import pyarrow
 import pyiceberg
-# Allows us to connect to the catalog. 
-from pyiceberg.catalog import load_catalog
 # These are used to create the table structure. 
 from pyiceberg.schema import Schema
 from pyiceberg.types import (
@@ -25,18 +25,22 @@ from pyiceberg.transforms import DayTransform
 from pyiceberg.table.sorting import SortOrder, SortField
 from pyiceberg.transforms import IdentityTransform
 
+from bulk_loader import BulkLoader, generator_source
+# Allows us to connect to the catalog using catalog_profiles.yaml.
+from iceberg_catalog import get_catalog
+# Timing spans, exported when TRACE_OUTPUT is set.
+from tracing import span
+
+parser = argparse.ArgumentParser(description="Create and load iceberg.bids")
+parser.add_argument("--table", default="iceberg.bids", help="Table to create")
+parser.add_argument("--location", default="s3://warehouse/data", help="Table location")
+parser.add_argument("--config", help="Also generate the tables in a datagen config")
+parser.add_argument("--scale", type=float, default=1.0, help="Row count factor")
+parser.add_argument("--parallel", type=int, default=4, help="Tables at a time")
+args = parser.parse_args()
+
 print("Connect to the catalog") 
-catalog = load_catalog(
-    "rest", 
-    **{
-        "uri": "http://localhost:5000/",  # REST server URL. 
-        "type": "rest",
-        "token": "foo",
-        "s3.endpoint": f"http://localhost:9002",  # Minio URI and credentials
-        "s3.access-key-id": "minio",
-        "s3.secret-access-key": "minio123",
-    }  
-)
+catalog = get_catalog()
 
 # Set up a namespace if it does not exist. 
 print("Create namespace iceberg")
@@ -56,9 +60,9 @@ print("List tables")
 tab_list = catalog.list_tables("iceberg")
 for tab in tab_list:
     print(tab, type(tab))
-    if tab[0] == "iceberg" and tab[1] == "bids":
-        print("Dropping bids table")
-        catalog.drop_table("iceberg.bids")
+    if ".".join(tab) == args.table:
+        print(f"Dropping {args.table} table")
+        catalog.drop_table(args.table)
 
 # Now create the test table. It's partitioned by datetime and 
 # sorted by symbol. 
@@ -75,37 +79,54 @@ partition_spec = PartitionSpec(
 )
 sort_order = SortOrder(SortField(source_id=2, transform=IdentityTransform()))
 table = catalog.create_table(
-    identifier="iceberg.bids",
+    identifier=args.table,
     schema=schema,
-    location="s3://warehouse/data", 
+    location=args.location,
     partition_spec=partition_spec,
     sort_order=sort_order,
 )
 
-# Define a helper function to create datetime values. 
-def to_dt(string):
-    format = "%Y-%m-%d %H:%M:%S"
-    dt = datetime.strptime(string, format)
-    return dt
-
 # Generate some trading data. Of course we use AAPL as an example.
+# Batches are built column by column, and the loader parses timestamp
+# strings in bulk and commits once for all batches.
 print("Add some data")
-import pyarrow as pa
-tt = pa.timestamp('us')
-df = pa.Table.from_pylist(
+loader = BulkLoader(table)
+batches = generator_source(
     [
-        {"datetime": pa.scalar(to_dt("2019-08-07 08:35:00"), tt), "symbol": "AAPL", "bid": 195.23, "ask": 195.28},
-        {"datetime": pa.scalar(to_dt("2019-08-07 08:35:00"), tt), "symbol": "AAPL", "bid": 195.22, "ask": 195.28},
+        {
+            "datetime": ["2019-08-07 08:35:00", "2019-08-07 08:35:00"],
+            "symbol": ["AAPL", "AAPL"],
+            "bid": [195.23, 195.22],
+            "ask": [195.28, 195.28],
+        },
+        # Add more trading data on another day. This will be in another partition.
+        {
+            "datetime": ["2019-08-09 08:35:00", "2019-08-09 08:35:00"],
+            "symbol": ["AAPL", "AAPL"],
+            "bid": [198.23, 198.25],
+            "ask": [195.45, 198.50],
+        },
     ],
+    loader.schema,
 )
-table.append(df)
+with span("iceberg_setup.load", "io"):
+    print(f"--{loader.load(batches)}")
 
-# Add more trading data on another day. This will be in another partiion. 
-print("Add some more data")
-df2 = pa.Table.from_pylist(
-    [
-        {"datetime": pa.scalar(to_dt("2019-08-09 08:35:00"), tt), "symbol": "AAPL", "bid": 198.23, "ask": 195.45},
-        {"datetime": pa.scalar(to_dt("2019-08-09 08:35:00"), tt), "symbol": "AAPL", "bid": 198.25, "ask": 198.50},
-    ],
-)
-table.append(df2)
+# Optionally generate larger tables described in a config file, such as
+# datagen_tables.yaml. They are created and loaded in parallel by
+# datagen.py. It runs as its own process because its writer processes
+# are spawned, and they would import this script and run it again.
+if args.config:
+    print(f"Generate tables from {args.config}")
+    with span("iceberg_setup.generate", "io"):
+        subprocess.run(
+            [
+                sys.executable,
+                "datagen.py",
+                f"--config={os.path.abspath(args.config)}",
+                f"--scale={args.scale}",
+                f"--parallel={args.parallel}",
+            ],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            check=True,
+        )
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# Copyright 2025
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Partition-aware parallel writer for day-partitioned tables like
+# iceberg.bids. Rows are routed into per-day buckets, each bucket is sorted
+# by the table sort order, and Parquet files for different partitions are
+# written in a process pool. All data files are committed as one snapshot.
+
+import argparse
+import multiprocessing
+import os
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, Iterable, List, Optional
+
+import pyarrow as pa
+import pyarrow.compute as pc
+from pyiceberg.io import load_file_io
+
+# pyiceberg has no public API to write data files without committing them,
+# which workers need so that all files land in one snapshot. This private
+# helper is tied to the pyiceberg version pinned in requirements.txt.
+from pyiceberg.io.pyarrow import _dataframe_to_data_files
+
+from bulk_loader import LoadStats, generator_source, synthetic_bids
+from iceberg_catalog import get_catalog
+from tracing import span
+
+DEFAULT_FLUSH_ROWS = 1024 * 1024
+
+
+def _write_bucket(metadata, io_properties: dict, sort_columns: List[str], df):
+    """Sort one partition bucket and write it to data files in a worker."""
+    io = load_file_io(io_properties, metadata.location)
+    if sort_columns:
+        df = df.sort_by([(name, "ascending") for name in sort_columns])
+    return list(_dataframe_to_data_files(metadata, df, io, write_uuid=uuid.uuid4()))
+
+
+class PartitionedWriter:
+    """Route batches into day buckets and write them in parallel."""
+
+    def __init__(
+        self,
+        table,
+        partition_column: str = "datetime",
+        max_workers: Optional[int] = None,
+        flush_rows: int = DEFAULT_FLUSH_ROWS,
+    ):
+        """Initialize the writer for a table partitioned by day."""
+        self.table = table
+        self.partition_column = partition_column
+        self.max_workers = max_workers or os.cpu_count()
+        self.flush_rows = flush_rows
+        self.schema = table.schema().as_arrow()
+        self.sort_columns = [
+            table.schema().find_column_name(field.source_id)
+            for field in table.sort_order().fields
+        ]
+
+    def write(self, batches: Iterable[pa.RecordBatch]) -> LoadStats:
+        """Write all batches and commit the resulting files as one snapshot."""
+        stats = LoadStats()
+        start = time.perf_counter()
+        buckets: Dict[object, List[pa.RecordBatch]] = defaultdict(list)
+        bucket_rows: Dict[object, int] = defaultdict(int)
+        data_files = []
+        pending = set()
+
+        # Spawned workers start clean. Forked ones would inherit locks and
+        # the pyiceberg thread pool of a parent that may have other threads.
+        with span("partition_writer.write_files", "io"), ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as pool:
+
+            def submit(day):
+                # Bound in-flight buckets so memory stays proportional to workers.
+                while len(pending) >= 2 * self.max_workers:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        pending.remove(future)
+                        data_files.extend(future.result())
+                df = pa.Table.from_batches(buckets.pop(day), schema=self.schema)
+                bucket_rows.pop(day)
+                pending.add(
+                    pool.submit(
+                        _write_bucket,
+                        self.table.metadata,
+                        self.table.io.properties,
+                        self.sort_columns,
+                        df,
+                    )
+                )
+
+            for batch in batches:
+                stats.batches += 1
+                stats.rows += batch.num_rows
+                for day, part in self._split_by_day(batch):
+                    buckets[day].append(part)
+                    bucket_rows[day] += part.num_rows
+                    if bucket_rows[day] >= self.flush_rows:
+                        submit(day)
+            for day in list(buckets):
+                submit(day)
+            for future in pending:
+                data_files.extend(future.result())
+
+        with span("partition_writer.commit", "commit", files=len(data_files)):
+            self._commit(data_files)
+        stats.commits = 1
+        stats.seconds = time.perf_counter() - start
+        print(f"Wrote {len(data_files)} data files")
+        return stats
+
+    def _split_by_day(self, batch: pa.RecordBatch):
+        """Yield (day, rows) slices of a batch grouped by calendar day."""
+        days = pc.cast(batch.column(self.partition_column), pa.date32())
+        indices = pc.sort_indices(days)
+        batch = batch.take(indices)
+        runs = pc.run_end_encode(days.take(indices))
+        offset = 0
+        for day, run_end in zip(runs.values.to_pylist(), runs.run_ends.to_pylist()):
+            yield day, batch.slice(offset, run_end - offset)
+            offset = run_end
+
+    def _commit(self, data_files: list):
+        """Commit all data files in a single fast-append snapshot."""
+        with self.table.transaction() as txn:
+            with txn.update_snapshot().fast_append() as append:
+                for data_file in data_files:
+                    append.append_data_file(data_file)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel backfill of iceberg.bids")
+    parser.add_argument("--table", default="iceberg.bids")
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--flush-rows", type=int, default=DEFAULT_FLUSH_ROWS)
+    args = parser.parse_args()
+
+    catalog = get_catalog()
+    table = catalog.load_table(args.table)
+    writer = PartitionedWriter(
+        table, max_workers=args.workers, flush_rows=args.flush_rows
+    )
+    chunks = synthetic_bids(args.rows, days=args.days)
+    print(
+        f"Loaded {args.table}: {writer.write(generator_source(chunks, writer.schema))}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# Copyright 2025
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Measure scan planning time against the number of data files, with
+# table.scan() and with the local planning index. A scratch table with the
+# iceberg.bids layout grows by small appends, one file per day, the way
+# streaming writers leave it.
+
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+
+from pyiceberg.exceptions import NoSuchTableError
+
+from bulk_loader import BulkLoader, generator_source, synthetic_bids
+from iceberg_catalog import get_catalog
+from plan_index import benchmark
+from scan_reader import build_row_filter
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark scan planning")
+    parser.add_argument("--source", default="iceberg.bids", help="Table to copy")
+    parser.add_argument("--table", default="iceberg.plan_bench")
+    parser.add_argument("--files", default="10,100,1000")
+    parser.add_argument("--files-per-commit", type=int, default=10)
+    parser.add_argument("--rows-per-file", type=int, default=1000)
+    args = parser.parse_args()
+
+    catalog = get_catalog()
+    source = catalog.load_table(args.source)
+    try:
+        catalog.drop_table(args.table)
+    except NoSuchTableError:
+        pass
+    table = catalog.create_table(
+        args.table,
+        schema=source.schema(),
+        partition_spec=source.spec(),
+        sort_order=source.sort_order(),
+    )
+
+    start = datetime(2019, 8, 7)
+    # One symbol on one day in the first step prunes by partition, while a
+    # symbol alone has to check the bounds of every file.
+    day = start + timedelta(days=int(args.files.split(",")[0]) // 2)
+    filters = {
+        "symbol_day": build_row_filter(
+            ["AAPL"], day.isoformat(), (day + timedelta(1)).isoformat()
+        ),
+        "symbol": build_row_filter(["AAPL"]),
+    }
+    index_root = tempfile.mkdtemp()
+    files = 0
+    try:
+        for target in [int(n) for n in args.files.split(",")]:
+            while files < target:
+                loader = BulkLoader(table)
+                days = args.files_per_commit
+                chunks = synthetic_bids(
+                    args.rows_per_file * days,
+                    start=start + timedelta(days=files),
+                    days=days,
+                    seed=files,
+                )
+                loader.load(generator_source(chunks, loader.schema))
+                files += days
+            for name, row_filter in filters.items():
+                print({"filter": name, **benchmark(table, row_filter, index_root)})
+    finally:
+        catalog.drop_table(args.table)
+
+
+if __name__ == "__main__":
+    main()
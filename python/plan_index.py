@@ -0,0 +1,450 @@
+#!/usr/bin/env python3
+# Copyright 2025
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Local planning index for Iceberg tables. Per-file partition values,
+# record counts and column metrics of the live data files are kept in a
+# SQLite file together with the snapshot id they describe. Refreshing
+# reads only manifests written by snapshots added since then, so repeated
+# filtered scans plan without reading Avro manifests from object storage.
+
+import argparse
+import datetime
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Dict, List, Optional, Sequence
+
+from pyiceberg.expressions import AlwaysTrue, BooleanExpression
+from pyiceberg.expressions.visitors import (
+    _InclusiveMetricsEvaluator,
+    expression_evaluator,
+    inclusive_projection,
+)
+from pyiceberg.manifest import (
+    DataFile,
+    DataFileContent,
+    FileFormat,
+    ManifestContent,
+    ManifestEntryStatus,
+)
+from pyiceberg.schema import Schema
+from pyiceberg.table import DataScan, FileScanTask
+from pyiceberg.typedef import Record
+
+from iceberg_catalog import get_catalog
+from scan_reader import build_row_filter
+
+DEFAULT_INDEX_DIR = os.path.join(os.path.dirname(__file__), ".plan_index")
+
+# Bumped when the stored format changes, so older indexes are rebuilt.
+INDEX_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS files (
+    file_path TEXT PRIMARY KEY,
+    spec_id INTEGER,
+    partition TEXT,
+    file_format TEXT,
+    record_count INTEGER,
+    file_size INTEGER,
+    metrics TEXT
+);
+CREATE INDEX IF NOT EXISTS files_partition ON files (spec_id, partition);
+"""
+_METRICS = {
+    "value_counts": False,
+    "null_value_counts": False,
+    "nan_value_counts": False,
+    "lower_bounds": True,
+    "upper_bounds": True,
+}
+
+
+@dataclass
+class RefreshStats:
+    """What a refresh of the index had to read."""
+
+    snapshot_id: Optional[int] = None
+    full_rebuild: bool = False
+    snapshots_read: int = 0
+    manifests_read: int = 0
+    files_added: int = 0
+    files_removed: int = 0
+    seconds: float = 0.0
+
+
+# Partition value types that JSON cannot represent, tagged with a name and
+# converted to and from strings.
+_PARTITION_TYPES = {
+    "bytes": (bytes, bytes.hex, bytes.fromhex),
+    "decimal": (Decimal, str, Decimal),
+    "uuid": (uuid.UUID, str, uuid.UUID),
+    "datetime": (
+        datetime.datetime,
+        datetime.datetime.isoformat,
+        datetime.datetime.fromisoformat,
+    ),
+    "date": (datetime.date, datetime.date.isoformat, datetime.date.fromisoformat),
+    "time": (datetime.time, datetime.time.isoformat, datetime.time.fromisoformat),
+}
+
+
+def _encode_partition(partition: Record) -> str:
+    """Encode partition values so that they decode with their types."""
+    values = []
+    for value in partition:
+        for name, (cls, encode, _) in _PARTITION_TYPES.items():
+            if isinstance(value, cls):
+                value = {"type": name, "value": encode(value)}
+                break
+        values.append(value)
+    return json.dumps(values)
+
+
+def _decode_partition(text: str) -> Record:
+    return Record(
+        *(
+            _PARTITION_TYPES[v["type"]][2](v["value"]) if isinstance(v, dict) else v
+            for v in json.loads(text)
+        )
+    )
+
+
+def _encode_metrics(data_file: DataFile) -> str:
+    metrics = {}
+    for name, is_bytes in _METRICS.items():
+        values = getattr(data_file, name) or {}
+        metrics[name] = {k: v.hex() if is_bytes else v for k, v in values.items()}
+    return json.dumps(metrics)
+
+
+def _decode_metrics(text: str) -> dict:
+    metrics = json.loads(text)
+    return {
+        name: {
+            int(k): bytes.fromhex(v) if _METRICS[name] else v
+            for k, v in metrics[name].items()
+        }
+        for name in _METRICS
+    }
+
+
+class PlanIndex:
+    """Persistent index of the live data files of one table."""
+
+    def __init__(self, path: str):
+        """Open or create the index at path."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._files: Dict[str, DataFile] = {}
+        self._partitions: Optional[Dict[tuple, tuple]] = None
+
+    @classmethod
+    def for_table(cls, table, root: str = DEFAULT_INDEX_DIR) -> "PlanIndex":
+        """Open the index of a table, keyed by the table UUID."""
+        return cls(os.path.join(root, f"{table.metadata.table_uuid}.sqlite"))
+
+    @property
+    def snapshot_id(self) -> Optional[int]:
+        """Return the snapshot the index describes."""
+        row = self.db.execute(
+            "SELECT value FROM state WHERE key = 'snapshot_id'"
+        ).fetchone()
+        return int(row[0]) if row and row[0] != "None" else None
+
+    def _state(self, key: str) -> Optional[str]:
+        row = self.db.execute(
+            "SELECT value FROM state WHERE key = ?", (key,)
+        ).fetchone()
+        return row[0] if row else None
+
+    @property
+    def has_deletes(self) -> bool:
+        """Return whether the indexed snapshot has delete files."""
+        return self._state("has_deletes") == "1"
+
+    def refresh(self, table) -> RefreshStats:
+        """Bring the index up to the current snapshot of the table."""
+        with self._lock:
+            start = time.perf_counter()
+            stats = RefreshStats()
+            snapshot = table.current_snapshot()
+            indexed = self.snapshot_id
+            if self._state("version") != str(INDEX_VERSION):
+                indexed = None
+            stats.snapshot_id = snapshot.snapshot_id if snapshot else None
+            if indexed is not None and stats.snapshot_id == indexed:
+                return stats
+
+            new_snapshots = []
+            parent = snapshot
+            while parent and parent.snapshot_id != indexed:
+                new_snapshots.append(parent)
+                parent = (
+                    table.metadata.snapshot_by_id(parent.parent_snapshot_id)
+                    if parent.parent_snapshot_id
+                    else None
+                )
+            # Rebuild when the indexed snapshot is no longer an ancestor,
+            # e.g. after a rollback or when it has expired.
+            stats.full_rebuild = indexed is None or parent is None
+            with self.db:
+                if stats.full_rebuild:
+                    self.db.execute("DELETE FROM files")
+                    if snapshot:
+                        self._apply(table, snapshot, stats, only_added=False)
+                else:
+                    for new_snapshot in reversed(new_snapshots):
+                        self._apply(table, new_snapshot, stats, only_added=True)
+                # Stored with the snapshot id, since an index that is already
+                # current is not refreshed by a new process.
+                has_deletes = bool(snapshot) and any(
+                    m.content == ManifestContent.DELETES
+                    for m in snapshot.manifests(table.io)
+                )
+                self.db.executemany(
+                    "INSERT OR REPLACE INTO state VALUES (?, ?)",
+                    [
+                        ("snapshot_id", str(stats.snapshot_id)),
+                        ("has_deletes", "1" if has_deletes else "0"),
+                        ("version", str(INDEX_VERSION)),
+                    ],
+                )
+            self._files = {}
+            self._partitions = None
+            stats.seconds = time.perf_counter() - start
+            return stats
+
+    def _apply(self, table, snapshot, stats: RefreshStats, only_added: bool):
+        """Apply data manifests of a snapshot. With only_added, manifests
+        written by earlier snapshots are skipped since they are indexed."""
+        stats.snapshots_read += 1
+        for manifest in snapshot.manifests(table.io):
+            if manifest.content != ManifestContent.DATA:
+                continue
+            if only_added and manifest.added_snapshot_id != snapshot.snapshot_id:
+                continue
+            stats.manifests_read += 1
+            entries = manifest.fetch_manifest_entry(
+                table.io, discard_deleted=not only_added
+            )
+            for entry in entries:
+                data_file = entry.data_file
+                if entry.status == ManifestEntryStatus.DELETED:
+                    self.db.execute(
+                        "DELETE FROM files WHERE file_path = ?", (data_file.file_path,)
+                    )
+                    stats.files_removed += 1
+                    continue
+                self.db.execute(
+                    "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        data_file.file_path,
+                        data_file.spec_id,
+                        _encode_partition(data_file.partition),
+                        data_file.file_format.value,
+                        data_file.record_count,
+                        data_file.file_size_in_bytes,
+                        _encode_metrics(data_file),
+                    ),
+                )
+                if entry.status == ManifestEntryStatus.ADDED or not only_added:
+                    stats.files_added += 1
+
+    def _load_partitions(self) -> Dict[tuple, tuple]:
+        """Return (partition record, file paths) by (spec id, partition)."""
+        if self._partitions is None:
+            self._partitions = {}
+            rows = self.db.execute("SELECT spec_id, partition, file_path FROM files")
+            for spec_id, partition, path in rows:
+                key = (spec_id, partition)
+                if key not in self._partitions:
+                    self._partitions[key] = (_decode_partition(partition), [])
+                self._partitions[key][1].append(path)
+        return self._partitions
+
+    def _data_file(self, path: str) -> DataFile:
+        """Decode one indexed file, keeping it in memory for later scans."""
+        if path not in self._files:
+            spec_id, partition, fmt, count, size, metrics = self.db.execute(
+                "SELECT spec_id, partition, file_format, record_count, file_size,"
+                " metrics FROM files WHERE file_path = ?",
+                (path,),
+            ).fetchone()
+            data_file = DataFile.from_args(
+                content=DataFileContent.DATA,
+                file_path=path,
+                file_format=FileFormat(fmt),
+                partition=_decode_partition(partition),
+                record_count=count,
+                file_size_in_bytes=size,
+                **_decode_metrics(metrics),
+            )
+            data_file.spec_id = spec_id
+            self._files[path] = data_file
+        return self._files[path]
+
+    def file_count(self) -> int:
+        """Return the number of indexed data files."""
+        return self.db.execute("SELECT count(*) FROM files").fetchone()[0]
+
+    def data_files(self) -> List[DataFile]:
+        """Return all indexed data files."""
+        with self._lock:
+            return [
+                self._data_file(path)
+                for _, paths in self._load_partitions().values()
+                for path in paths
+            ]
+
+    def plan_files(
+        self,
+        table,
+        row_filter: BooleanExpression = AlwaysTrue(),
+        case_sensitive: bool = True,
+    ) -> List[FileScanTask]:
+        """Return scan tasks for files that may match the filter. Partitions
+        are pruned first, so only files in matching partitions are decoded
+        and checked against their column bounds. Tables with delete files
+        fall back to regular planning."""
+        self.refresh(table)
+        if self.has_deletes:
+            return list(table.scan(row_filter=row_filter).plan_files())
+        schema = table.schema()
+        metrics = _InclusiveMetricsEvaluator(schema, row_filter, case_sensitive)
+        partition_evaluators = {}
+        tasks = []
+        with self._lock:
+            for (spec_id, _), (record, paths) in self._load_partitions().items():
+                if spec_id not in partition_evaluators:
+                    spec = table.specs()[spec_id]
+                    partition_schema = Schema(*spec.partition_type(schema).fields)
+                    partition_evaluators[spec_id] = expression_evaluator(
+                        partition_schema,
+                        inclusive_projection(schema, spec, case_sensitive)(row_filter),
+                        case_sensitive,
+                    )
+                if not partition_evaluators[spec_id](record):
+                    continue
+                for path in paths:
+                    data_file = self._data_file(path)
+                    if metrics.eval(data_file):
+                        tasks.append(FileScanTask(data_file))
+        return tasks
+
+    def scan(
+        self,
+        table,
+        row_filter: BooleanExpression = AlwaysTrue(),
+        selected_fields: Sequence[str] = ("*",),
+    ) -> "IndexedScan":
+        """Return a table scan that plans with this index."""
+        return IndexedScan(
+            index=self,
+            table=table,
+            table_metadata=table.metadata,
+            io=table.io,
+            row_filter=row_filter,
+            selected_fields=tuple(selected_fields),
+        )
+
+    def close(self):
+        self.db.close()
+
+
+class IndexedScan(DataScan):
+    """A DataScan whose files come from a PlanIndex. It works anywhere a
+    scan does, e.g. with to_arrow() or scan_reader.stream_batches()."""
+
+    def __init__(self, index: PlanIndex, table, **kwargs):
+        super().__init__(**kwargs)
+        self.index = index
+        self.table = table
+
+    def plan_files(self) -> List[FileScanTask]:
+        return self.index.plan_files(self.table, self.row_filter, self.case_sensitive)
+
+
+def _timed(fn) -> tuple:
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def benchmark(table, row_filter, index_root: str) -> Dict[str, float]:
+    """Compare plan time of table.scan() with a cold and warm index."""
+    tasks, scan_ms = _timed(
+        lambda: list(table.scan(row_filter=row_filter).plan_files())
+    )
+    index = PlanIndex.for_table(table, index_root)
+    refresh, refresh_ms = _timed(lambda: index.refresh(table))
+    index.close()
+    # A new instance reads the files from SQLite, as a new process would.
+    index = PlanIndex.for_table(table, index_root)
+    indexed, cold_ms = _timed(lambda: index.plan_files(table, row_filter))
+    _, warm_ms = _timed(lambda: index.plan_files(table, row_filter))
+    data_files = index.file_count()
+    index.close()
+    if {t.file.file_path for t in tasks} != {t.file.file_path for t in indexed}:
+        raise RuntimeError("Index planned different files than table.scan()")
+    return {
+        "data_files": data_files,
+        "planned_files": len(tasks),
+        "manifests_read": refresh.manifests_read,
+        "scan_plan_ms": round(scan_ms, 1),
+        "refresh_ms": round(refresh_ms, 1),
+        "index_plan_ms": round(cold_ms, 1),
+        "index_warm_plan_ms": round(warm_ms, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Plan scans with a local index")
+    parser.add_argument("--table", default="iceberg.bids")
+    parser.add_argument("--symbols", help="Comma-separated symbols, e.g. AAPL,MSFT")
+    parser.add_argument("--start", help="Start datetime (inclusive)")
+    parser.add_argument("--end", help="End datetime (exclusive)")
+    parser.add_argument("--index-dir", default=DEFAULT_INDEX_DIR)
+    parser.add_argument(
+        "--benchmark", action="store_true", help="Compare with table.scan()"
+    )
+    args = parser.parse_args()
+
+    catalog = get_catalog()
+    table = catalog.load_table(args.table)
+    row_filter = build_row_filter(
+        args.symbols.split(",") if args.symbols else None, args.start, args.end
+    )
+    if args.benchmark:
+        print(benchmark(table, row_filter, args.index_dir))
+        return
+    index = PlanIndex.for_table(table, args.index_dir)
+    print(f"Refresh: {index.refresh(table)}")
+    tasks, plan_ms = _timed(lambda: index.plan_files(table, row_filter))
+    print(f"Planned {len(tasks)} of {index.file_count()} files in {plan_ms:.1f} ms")
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# Copyright 2025
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Measure scan throughput against object storage at several levels of
+# concurrent file fetches and Arrow I/O threads. Works against MinIO or any
+# S3 stand-in. pyiceberg reads Parquet with pre-buffering, which fetches
+# the column chunks of a file's row groups as concurrent range requests on
+# the Arrow I/O pool, so the I/O thread count is the row group fan-out.
+
+import argparse
+import json
+import time
+
+import pyarrow as pa
+
+from iceberg_catalog import get_catalog
+from scan_reader import pushdown_scan, stream_batches
+
+
+def measure(scan, concurrency: int, prefetch_files: int) -> dict:
+    """Stream a scan once and return rows, bytes and throughput at the
+    current Arrow I/O thread count."""
+    rows = 0
+    nbytes = 0
+    start = time.perf_counter()
+    for batch in stream_batches(
+        scan, prefetch_files=prefetch_files, concurrency=concurrency
+    ):
+        rows += batch.num_rows
+        nbytes += batch.nbytes
+    seconds = time.perf_counter() - start
+    return {
+        "concurrency": concurrency,
+        "io_threads": pa.io_thread_count(),
+        "rows": rows,
+        "seconds": round(seconds, 3),
+        "rows_per_sec": round(rows / seconds),
+        "mb_per_sec": round(nbytes / seconds / 2**20, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark concurrent scans")
+    parser.add_argument("--table", default="iceberg.bids")
+    parser.add_argument("--concurrency", default="1,8,32")
+    parser.add_argument(
+        "--prefetch-files", type=int, default=0, help="Defaults to concurrency"
+    )
+    parser.add_argument(
+        "--io-threads",
+        help="Comma-separated Arrow I/O thread counts for row group reads, "
+        "default: Arrow's",
+    )
+    parser.add_argument("--output", help="Write the results as JSON")
+    args = parser.parse_args()
+
+    catalog = get_catalog()
+    scan = pushdown_scan(catalog.load_table(args.table))
+    io_threads = (
+        [int(t) for t in args.io_threads.split(",")]
+        if args.io_threads
+        else [pa.io_thread_count()]
+    )
+    results = []
+    for threads in io_threads:
+        pa.set_io_thread_count(threads)
+        for concurrency in [int(c) for c in args.concurrency.split(",")]:
+            result = measure(scan, concurrency, args.prefetch_files or concurrency)
+            print(result)
+            results.append(result)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"table": args.table, "results": results}, f, indent=2)
+        print(f"Wrote scan throughput to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+# Copyright 2025
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Iceberg scans with predicate and projection pushdown. Filters on symbol
+# and datetime become an Iceberg row filter so manifests, partitions and
+# row groups are pruned before data files are read. Streaming reads fetch
+# files concurrently and yield record batches with bounded read-ahead.
+
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Iterator, Optional, Sequence
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pyiceberg.expressions import (
+    AlwaysTrue,
+    And,
+    BooleanExpression,
+    GreaterThanOrEqual,
+    In,
+    LessThan,
+)
+
+from tracing import span
+
+DEFAULT_PREFETCH_FILES = 2
+DEFAULT_MAX_BUFFERED_BYTES = 256 * 1024 * 1024
+
+_END_OF_SCAN = object()
+_END_OF_FILE = object()
+
+
+@dataclass
+class PruningStats:
+    """File and byte counts for a scan compared with the whole table."""
+
+    total_files: int = 0
+    total_bytes: int = 0
+    scanned_files: int = 0
+    scanned_bytes: int = 0
+
+    @property
+    def skipped_files(self) -> int:
+        return self.total_files - self.scanned_files
+
+    @property
+    def skipped_bytes(self) -> int:
+        return self.total_bytes - self.scanned_bytes
+
+    def __str__(self):
+        return (
+            f"scanning {self.scanned_files}/{self.total_files} files "
+            f"({self.scanned_bytes}/{self.total_bytes} bytes), "
+            f"skipped {self.skipped_files} files ({self.skipped_bytes} bytes)"
+        )
+
+
+def build_row_filter(
+    symbols: Optional[Sequence[str]] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+) -> BooleanExpression:
+    """Build a row filter for symbols and a half-open [start, end) datetime range."""
+    row_filter = AlwaysTrue()
+    if symbols:
+        row_filter = And(row_filter, In("symbol", set(symbols)))
+    if start:
+        row_filter = And(row_filter, GreaterThanOrEqual("datetime", start))
+    if end:
+        row_filter = And(row_filter, LessThan("datetime", end))
+    return row_filter
+
+
+def pushdown_scan(
+    table,
+    symbols: Optional[Sequence[str]] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    columns: Optional[Sequence[str]] = None,
+):
+    """Return a table scan with the row filter and selected fields applied."""
+    row_filter = build_row_filter(symbols, start, end)
+    selected_fields = tuple(columns) if columns else ("*",)
+    return table.scan(row_filter=row_filter, selected_fields=selected_fields)
+
+
+def pruning_stats(table, scan) -> PruningStats:
+    """Compare files planned for a scan with files in the current snapshot.
+
+    Totals come from the snapshot summary, so only the scan is planned.
+    Its total-files-size also counts delete files, so snapshots with
+    delete files, or without totals, are planned in full instead.
+    """
+    stats = PruningStats()
+    snapshot = table.current_snapshot()
+    if snapshot is None:
+        return stats
+    summary = snapshot.summary or {}
+    if summary.get("total-delete-files") == "0" and None not in (
+        summary.get("total-data-files"),
+        summary.get("total-files-size"),
+    ):
+        stats.total_files = int(summary["total-data-files"])
+        stats.total_bytes = int(summary["total-files-size"])
+    else:
+        for task in table.scan().plan_files():
+            stats.total_files += 1
+            stats.total_bytes += task.file.file_size_in_bytes
+    for task in scan.plan_files():
+        stats.scanned_files += 1
+        stats.scanned_bytes += task.file.file_size_in_bytes
+    return stats
+
+
+class _FileBuffers:
+    """Batches of files read in parallel, handed out in file order.
+
+    Each file has its own queue, and all queues share one byte ceiling.
+    Readers stream batches in as they decode them, so a file is never held
+    whole. The file at the head of the order may always add one batch to
+    its empty queue, so the consumer makes progress even when the ceiling
+    is taken by files further ahead.
+    """
+
+    def __init__(self, files: int, max_buffered_bytes: int, read_ahead: int):
+        self.queues = [deque() for _ in range(files)]
+        self.head = 0
+        self.buffered_bytes = 0
+        self.max_buffered_bytes = max_buffered_bytes
+        self.read_ahead = read_ahead
+        self.cond = threading.Condition()
+        self.closed = False
+        self.error = None
+
+    def start(self, index: int) -> bool:
+        """Wait until a file is within read_ahead files of the head. Returns
+        False if the consumer has gone away."""
+        with self.cond:
+            while not self.closed and index >= self.head + self.read_ahead:
+                self.cond.wait()
+            return not self.closed
+
+    def put(self, index: int, batch: pa.RecordBatch) -> bool:
+        """Add a batch of a file, waiting while the byte ceiling is
+        exceeded. Returns False if the consumer has gone away."""
+        with self.cond:
+            while not self.closed and (
+                self.buffered_bytes + batch.nbytes > self.max_buffered_bytes
+                and not (index == self.head and not self.queues[index])
+            ):
+                self.cond.wait()
+            if self.closed:
+                return False
+            self.queues[index].append(batch)
+            self.buffered_bytes += batch.nbytes
+            self.cond.notify_all()
+            return True
+
+    def finish(self, index: int):
+        """Mark a file as completely read."""
+        with self.cond:
+            self.queues[index].append(_END_OF_FILE)
+            self.cond.notify_all()
+
+    def fail(self, error: Exception):
+        """Pass a read error to the consumer."""
+        with self.cond:
+            self.error = self.error or error
+            self.cond.notify_all()
+
+    def get(self):
+        """Return the next batch in file order, or _END_OF_SCAN."""
+        with self.cond:
+            while True:
+                if self.error is not None:
+                    raise self.error
+                if self.head == len(self.queues):
+                    return _END_OF_SCAN
+                queue = self.queues[self.head]
+                if not queue:
+                    self.cond.wait()
+                    continue
+                item = queue.popleft()
+                if item is _END_OF_FILE:
+                    self.head += 1
+                else:
+                    self.buffered_bytes -= item.nbytes
+                self.cond.notify_all()
+                if item is not _END_OF_FILE:
+                    return item
+
+    def close(self):
+        """Stop the readers and release any waiting threads."""
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+
+def stream_batches(
+    scan,
+    prefetch_files: int = DEFAULT_PREFETCH_FILES,
+    max_buffered_bytes: int = DEFAULT_MAX_BUFFERED_BYTES,
+    concurrency: int = 1,
+) -> Iterator[pa.RecordBatch]:
+    """Yield record batches for a scan, reading a bounded number of files ahead.
+
+    Unlike to_arrow() or to_pandas(), the scan is not materialized. Up to
+    concurrency files are fetched in parallel, and no file more than
+    max(prefetch_files, concurrency) files ahead of the consumer is started.
+    Readers pause whenever buffered batches exceed max_buffered_bytes, so
+    memory stays within that ceiling plus one batch per reader. Batches
+    keep file planning order.
+    """
+    from pyiceberg.io.pyarrow import ArrowScan
+
+    arrow_scan = ArrowScan(
+        scan.table_metadata,
+        scan.io,
+        scan.projection(),
+        scan.row_filter,
+        scan.case_sensitive,
+    )
+    with span("scan.plan_files", "catalog"):
+        tasks = list(scan.plan_files())
+    buffers = _FileBuffers(
+        len(tasks), max_buffered_bytes, max(prefetch_files, concurrency)
+    )
+
+    def read_file(index: int, task):
+        try:
+            if not buffers.start(index):
+                return
+            with span("scan.read_file", "io", path=task.file.file_path):
+                for batch in arrow_scan.to_record_batches([task]):
+                    if not buffers.put(index, batch):
+                        return
+            buffers.finish(index)
+        except Exception as e:
+            buffers.fail(e)
+
+    # Files are submitted in order, so a worker only waits in start() for
+    # files that other workers are already reading.
+    pool = ThreadPoolExecutor(max_workers=max(concurrency, 1))
+    for index, task in enumerate(tasks):
+        pool.submit(read_file, index, task)
+    remaining = scan.limit
+    try:
+        while remaining is None or remaining > 0:
+            item = buffers.get()
+            if item is _END_OF_SCAN:
+                break
+            if remaining is not None:
+                item = item.slice(0, remaining)
+                remaining -= item.num_rows
+            yield item
+    finally:
+        buffers.close()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def write_batches(
+    batches: Iterator[pa.RecordBatch], schema: pa.Schema, path: str, fmt: str
+) -> int:
+    """Write batches to a local Parquet or Arrow IPC file and return the row count."""
+    rows = 0
+    if fmt == "parquet":
+        writer = pq.ParquetWriter(path, schema)
+    elif fmt == "ipc":
+        writer = pa.ipc.new_file(path, schema)
+    else:
+        raise ValueError(f"Unknown export format: {fmt}")
+    with writer:
+        for batch in batches:
+            if batch.schema != schema:
+                batch = batch.cast(schema)
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    return rows
@@ -0,0 +1,165 @@
+# Copyright 2025
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+import json
+import time
+import tracemalloc
+from typing import Callable, Sequence
+
+import pyarrow as pa
+
+from config import get_config, init_paths, load_config
+from helpers import ClickHouseHelper
+from history import record_report
+
+DEFAULT_ROWS = 5_000_000
+FETCH_PATHS = ("tuples", "numpy", "arrow_stream", "parquet", "arrow_batches")
+
+
+def default_sql(rows: int = DEFAULT_ROWS) -> str:
+    """Return a query with integer, string, float and timestamp columns."""
+    return f"""
+    SELECT
+        number AS id,
+        toString(number) AS label,
+        number * 0.5 AS value,
+        toDateTime('2024-01-01 00:00:00') + number AS ts
+    FROM numbers({rows})
+    """
+
+
+class FetchBenchmark:
+    """Compare client time, CPU and memory to fetch one large result as
+    row tuples over the native protocol, as NumPy columns, and as Arrow
+    over the HTTP interface."""
+
+    def __init__(self, clickhouse_helper: ClickHouseHelper, test_case):
+        """Initialize the benchmark with a helper and a test case for errors."""
+        self.clickhouse_helper = clickhouse_helper
+        self.test_case = test_case
+
+    def run(self, sql: str, paths: Sequence[str] = FETCH_PATHS) -> dict:
+        """Fetch the result once per path and return a JSON-ready report."""
+        results = [self._measure(path, self._fetcher(path, sql)) for path in paths]
+        baseline = next((r for r in results if r["path"] == "tuples"), None)
+        if baseline:
+            for result in results:
+                result["speedup"] = round(baseline["seconds"] / result["seconds"], 1)
+                result["cpu_ratio"] = round(
+                    baseline["cpu_seconds"] / max(result["cpu_seconds"], 1e-6), 1
+                )
+        return {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "sql": " ".join(sql.split()),
+            "results": results,
+        }
+
+    def _fetcher(self, path: str, sql: str) -> Callable[[], object]:
+        """Return a function that fetches the full result in one way."""
+        helper, test_case = self.clickhouse_helper, self.test_case
+        if path == "tuples":
+
+            def fetch():
+                with helper.pool.connection() as client:
+                    return client.execute(sql)
+
+            return fetch
+        if path == "numpy":
+            return lambda: helper.query_columns(test_case, sql)
+        if path == "arrow_stream":
+            return lambda: helper.query_arrow(test_case, sql, fmt="ArrowStream")
+        if path == "parquet":
+            return lambda: helper.query_arrow(test_case, sql, fmt="Parquet")
+        if path == "arrow_batches":
+            # Batches are counted and dropped, as an export job would do.
+            return lambda: sum(
+                b.num_rows for b in helper.query_arrow_batches(test_case, sql)
+            )
+        raise ValueError(f"Unknown fetch path {path!r}")
+
+    def _measure(self, path: str, fetch: Callable[[], object]) -> dict:
+        """Time one fetch, then repeat it under tracemalloc for the peak
+        Python heap. Arrow buffers are outside the Python heap and are
+        reported separately as the size of the returned table."""
+        wall, cpu = time.perf_counter(), time.process_time()
+        result = fetch()
+        seconds = time.perf_counter() - wall
+        cpu_seconds = time.process_time() - cpu
+        rows = _row_count(result)
+        del result
+
+        tracemalloc.start()
+        result = fetch()
+        _, python_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        arrow_bytes = result.nbytes if isinstance(result, pa.Table) else 0
+        del result
+
+        summary = {
+            "path": path,
+            "rows": rows,
+            "seconds": round(seconds, 3),
+            "cpu_seconds": round(cpu_seconds, 3),
+            "rows_per_sec": round(rows / seconds) if seconds else None,
+            "python_peak_mb": round(python_peak / 2**20, 1),
+            "arrow_mb": round(arrow_bytes / 2**20, 1),
+        }
+        print(
+            f"{path}: {rows} rows in {summary['seconds']}s "
+            f"(cpu {summary['cpu_seconds']}s), python peak "
+            f"{summary['python_peak_mb']} MB, arrow {summary['arrow_mb']} MB"
+        )
+        return summary
+
+
+def _row_count(result) -> int:
+    if isinstance(result, int):
+        return result
+    if isinstance(result, pa.Table):
+        return result.num_rows
+    if isinstance(result, dict):
+        return len(next(iter(result.values()))) if result else 0
+    return len(result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tuple vs. Arrow fetch benchmark")
+    parser.add_argument("--rows", type=int, default=DEFAULT_ROWS)
+    parser.add_argument("--sql", help="Query to fetch instead of numbers(rows)")
+    parser.add_argument("--paths", default=",".join(FETCH_PATHS))
+    parser.add_argument("--output", default="arrow_benchmark.json")
+    parser.add_argument(
+        "--no-history", action="store_true", help="Do not record in the history"
+    )
+    args = parser.parse_args()
+
+    load_config()
+    helper = ClickHouseHelper(get_config(), init_paths())
+    try:
+        benchmark = FetchBenchmark(helper, None)
+        report = benchmark.run(
+            args.sql or default_sql(args.rows), args.paths.split(",")
+        )
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote fetch benchmark results to {args.output}")
+        if not args.no_history:
+            record_report("arrow_fetch", report, helper, benchmark.test_case)
+    finally:
+        helper.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+# Copyright 2025
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+import json
+import math
+import re
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from typing import List, Sequence
+
+from config import get_config, init_paths, load_config
+from helpers import ClickHouseHelper
+from history import record_report
+from swarm_monitor import SWARM_CLUSTER
+
+TAXI_TABLE = "ice_test.`nyc.taxis_test`"
+SWARM_SETTINGS = f"object_storage_cluster = '{SWARM_CLUSTER}'"
+
+# Commands that reset caches before a cold run. Some caches are specific
+# to Antalya builds, so failures are reported but ignored.
+CACHE_CLEAR_COMMANDS = [
+    "SYSTEM DROP FILESYSTEM CACHE",
+    "SYSTEM DROP PARQUET METADATA CACHE",
+    "SYSTEM DROP ICEBERG METADATA CACHE",
+    "SYSTEM DROP QUERY CACHE",
+]
+
+
+@dataclass
+class BenchmarkQuery:
+    """A named query in the benchmark catalog."""
+
+    name: str
+    category: str
+    sql: str
+
+
+DEFAULT_QUERIES = [
+    BenchmarkQuery("count", "full_scan", f"SELECT count() FROM {TAXI_TABLE}"),
+    BenchmarkQuery(
+        "avg_fare",
+        "full_scan",
+        f"SELECT avg(fare_amount), avg(passenger_count) FROM {TAXI_TABLE}",
+    ),
+    BenchmarkQuery(
+        "long_trips",
+        "filtered_scan",
+        f"SELECT count(), avg(total_amount) FROM {TAXI_TABLE} "
+        "WHERE trip_distance > 10",
+    ),
+    BenchmarkQuery(
+        "by_passenger_count",
+        "group_by",
+        f"SELECT passenger_count, count(), avg(fare_amount) FROM {TAXI_TABLE} "
+        "GROUP BY passenger_count",
+    ),
+    BenchmarkQuery(
+        "top_pickup_locations",
+        "top_n",
+        f"SELECT PULocationID, count() AS trips FROM {TAXI_TABLE} "
+        "GROUP BY PULocationID ORDER BY trips DESC LIMIT 10",
+    ),
+]
+
+
+def with_settings(sql: str, settings: str) -> str:
+    """Add settings to a query, extending its SETTINGS clause if it ends
+    with one."""
+    sql = sql.rstrip().rstrip(";")
+    match = None
+    for match in re.finditer(r"\bSETTINGS\b", sql, re.IGNORECASE):
+        pass
+    if match and ")" not in sql[match.end() :]:
+        return f"{sql}, {settings}"
+    return f"{sql} SETTINGS {settings}"
+
+
+def clear_caches(clickhouse_helper, test_case, swarm: bool = False):
+    """Drop caches so the next run reads from object storage. Swarm runs
+    also drop them on every swarm node."""
+    for command in CACHE_CLEAR_COMMANDS:
+        clickhouse_helper.ddl(test_case, command, ignore_errors=True)
+        if swarm:
+            clickhouse_helper.ddl(
+                test_case,
+                f"{command} ON CLUSTER '{SWARM_CLUSTER}'",
+                ignore_errors=True,
+            )
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Return the nearest-rank percentile of a list of values."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class QueryBenchmark:
+    """Run benchmark queries on the vector server alone and with the swarm,
+    combining client latency with server statistics from system.query_log."""
+
+    def __init__(
+        self,
+        clickhouse_helper: ClickHouseHelper,
+        test_case,
+        repeats: int = 5,
+        cold_runs: int = 3,
+    ):
+        """Initialize the benchmark with warm and cold repeat counts. Each
+        cold run follows its own cache clear."""
+        self.clickhouse_helper = clickhouse_helper
+        self.test_case = test_case
+        self.repeats = repeats
+        self.cold_runs = cold_runs
+
+    def run(
+        self,
+        queries: List[BenchmarkQuery] = DEFAULT_QUERIES,
+        modes: Sequence[str] = ("vector", "swarm"),
+    ) -> dict:
+        """Run every query in every mode and return a JSON-ready report."""
+        version = self.clickhouse_helper.query(self.test_case, "SELECT version()")
+        results = [self._run_query(q, mode) for q in queries for mode in modes]
+        return {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "version": version.get("version()"),
+            "repeats": self.repeats,
+            "cold_runs": self.cold_runs,
+            "results": results,
+            "speedups": self._speedups(results),
+        }
+
+    def _run_query(self, query: BenchmarkQuery, mode: str) -> dict:
+        """Run one query cold and then warm, and summarize the runs."""
+        swarm = mode == "swarm"
+        sql = with_settings(query.sql, SWARM_SETTINGS) if swarm else query.sql
+        runs = []
+        for _ in range(self.cold_runs):
+            clear_caches(self.clickhouse_helper, self.test_case, swarm)
+            runs.append(self._timed(sql, "cold"))
+        for _ in range(self.repeats):
+            runs.append(self._timed(sql, "warm"))
+        self._add_server_stats(runs)
+
+        warm = [r for r in runs if r["phase"] == "warm"]
+        cold = [r for r in runs if r["phase"] == "cold"]
+        latencies = [r["client_ms"] for r in warm]
+        cold_latencies = [r["client_ms"] for r in cold]
+        summary = {
+            **asdict(query),
+            "mode": mode,
+            "cold_p50_ms": percentile(cold_latencies, 50),
+            "cold_p95_ms": percentile(cold_latencies, 95),
+            "warm_p50_ms": percentile(latencies, 50),
+            "warm_p95_ms": percentile(latencies, 95),
+            "read_rows": warm[-1].get("read_rows") if warm else None,
+            "read_bytes": warm[-1].get("read_bytes") if warm else None,
+            "runs": runs,
+        }
+        print(
+            f"{query.name} [{mode}]: cold p50={summary['cold_p50_ms']}ms "
+            f"p95={summary['cold_p95_ms']}ms, warm p50={summary['warm_p50_ms']}ms "
+            f"p95={summary['warm_p95_ms']}ms"
+        )
+        return summary
+
+    def _timed(self, sql: str, phase: str) -> dict:
+        """Run a query with a known query id and measure client latency."""
+        query_id = str(uuid.uuid4())
+        start = time.perf_counter()
+        self.clickhouse_helper.query(self.test_case, sql, query_id=query_id)
+        elapsed_ms = round((time.perf_counter() - start) * 1000, 1)
+        return {"query_id": query_id, "phase": phase, "client_ms": elapsed_ms}
+
+    def _add_server_stats(self, runs: List[dict]):
+        """Merge elapsed time, rows and bytes read from system.query_log."""
+        self.clickhouse_helper.ddl(self.test_case, "SYSTEM FLUSH LOGS")
+        ids = ", ".join(f"'{r['query_id']}'" for r in runs)
+        sql = f"""
+        SELECT query_id, query_duration_ms, read_rows, read_bytes, result_rows
+        FROM system.query_log
+        WHERE type = 'QueryFinish' AND query_id IN ({ids})
+        """
+        stats = {}
+        for block in self.clickhouse_helper.query_iter(self.test_case, sql):
+            for query_id, duration_ms, read_rows, read_bytes, result_rows in block:
+                stats[query_id] = {
+                    "server_ms": duration_ms,
+                    "read_rows": read_rows,
+                    "read_bytes": read_bytes,
+                    "result_rows": result_rows,
+                }
+        for run in runs:
+            run.update(stats.get(run["query_id"], {}))
+
+    def _speedups(self, results: List[dict]) -> dict:
+        """Return vector p50 divided by swarm p50 for each query."""
+        by_key = {(r["name"], r["mode"]): r for r in results}
+        speedups = {}
+        for (name, mode), result in by_key.items():
+            swarm = by_key.get((name, "swarm"))
+            if mode == "vector" and swarm and swarm["warm_p50_ms"]:
+                speedups[name] = round(result["warm_p50_ms"] / swarm["warm_p50_ms"], 2)
+        return speedups
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Swarm vs. vector benchmark")
+    parser.add_argument("--output", default="benchmark.json")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--modes", default="vector,swarm")
+    parser.add_argument(
+        "--cold-runs", type=int, default=3, help="Cold runs per query, 0 to skip"
+    )
+    parser.add_argument(
+        "--no-history", action="store_true", help="Do not record in the history"
+    )
+    args = parser.parse_args()
+
+    load_config()
+    helper = ClickHouseHelper(get_config(), init_paths())
+    try:
+        benchmark = QueryBenchmark(
+            helper, None, repeats=args.repeats, cold_runs=args.cold_runs
+        )
+        report = benchmark.run(modes=args.modes.split(","))
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote benchmark results to {args.output}")
+        if not args.no_history:
+            record_report("benchmark", report, helper, benchmark.test_case)
+    finally:
+        helper.close()
+
+
+if __name__ == "__main__":
+    main()
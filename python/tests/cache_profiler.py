@@ -0,0 +1,194 @@
+# Copyright 2025
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+import json
+import time
+import uuid
+
+from benchmark import DEFAULT_QUERIES, SWARM_SETTINGS, clear_caches, with_settings
+from config import get_config, init_paths, load_config
+from helpers import ClickHouseHelper
+from swarm_monitor import SWARM_CLUSTER, SwarmMonitor
+
+# ProfileEvents counters for each cache as (hits, misses, bytes read from
+# cache). Names follow Antalya builds; counters a build does not have are 0.
+CACHE_EVENTS = {
+    "iceberg_metadata": (
+        "IcebergMetadataFilesCacheHits",
+        "IcebergMetadataFilesCacheMisses",
+        None,
+    ),
+    "parquet_metadata": (
+        "ParquetMetaDataCacheHits",
+        "ParquetMetaDataCacheMisses",
+        None,
+    ),
+    "filesystem": (
+        "CachedReadBufferReadFromCacheHits",
+        "CachedReadBufferReadFromCacheMisses",
+        "CachedReadBufferReadFromCacheBytes",
+    ),
+    "list_objects": (
+        "ObjectStorageListObjectsCacheHits",
+        "ObjectStorageListObjectsCacheMisses",
+        None,
+    ),
+}
+S3_REQUEST_EVENTS = ["S3GetObject", "S3HeadObject", "S3ListObjects"]
+S3_BYTES_EVENT = "ReadBufferFromS3Bytes"
+
+
+def hit_rate(hits: int, misses: int) -> float:
+    """Return hits over lookups, or None when the cache was not used."""
+    lookups = hits + misses
+    return round(hits / lookups, 3) if lookups else None
+
+
+class CacheProfiler:
+    """Run a query cold after clearing caches and then warm, and compare
+    ProfileEvents counters of both runs for each Antalya cache."""
+
+    def __init__(self, clickhouse_helper: ClickHouseHelper, test_case):
+        """Initialize the profiler with a ClickHouse helper on the vector server."""
+        self.clickhouse_helper = clickhouse_helper
+        self.test_case = test_case
+
+    def profile(self, sql: str, swarm: bool = False, warm_runs: int = 1) -> dict:
+        """Return cold and warm latency and counters with per-cache hit rates.
+        The warm phase is the last of warm_runs runs after the cold one."""
+        if warm_runs < 1:
+            raise ValueError(f"warm_runs must be at least 1, got {warm_runs}")
+        if swarm:
+            sql = with_settings(sql, SWARM_SETTINGS)
+        clear_caches(self.clickhouse_helper, self.test_case, swarm)
+        cold = self._run(sql, swarm)
+        for _ in range(warm_runs):
+            warm = self._run(sql, swarm)
+
+        caches = {}
+        for name, (hits, misses, cache_bytes) in CACHE_EVENTS.items():
+            caches[name] = {
+                phase: {
+                    "hits": run["events"].get(hits, 0),
+                    "misses": run["events"].get(misses, 0),
+                    "hit_rate": hit_rate(
+                        run["events"].get(hits, 0), run["events"].get(misses, 0)
+                    ),
+                    "bytes_from_cache": (
+                        run["events"].get(cache_bytes, 0) if cache_bytes else None
+                    ),
+                }
+                for phase, run in (("cold", cold), ("warm", warm))
+            }
+        report = {
+            "sql": sql,
+            "swarm": swarm,
+            "cold_ms": cold["ms"],
+            "warm_ms": warm["ms"],
+            "latency_delta_ms": round(cold["ms"] - warm["ms"], 1),
+            "s3_requests": {
+                "cold": sum(cold["events"].get(e, 0) for e in S3_REQUEST_EVENTS),
+                "warm": sum(warm["events"].get(e, 0) for e in S3_REQUEST_EVENTS),
+            },
+            "s3_bytes_saved": cold["events"].get(S3_BYTES_EVENT, 0)
+            - warm["events"].get(S3_BYTES_EVENT, 0),
+            "caches": caches,
+            # Cache counters of other names, to spot caches not listed above.
+            "other_cache_events": {
+                e: [cold["events"].get(e, 0), warm["events"].get(e, 0)]
+                for e in sorted(set(cold["events"]) | set(warm["events"]))
+                if "Cache" in e and not _is_known(e)
+            },
+        }
+        self._print(report)
+        return report
+
+    def _run(self, sql: str, swarm: bool) -> dict:
+        """Run a query and return its latency and summed ProfileEvents."""
+        query_id = str(uuid.uuid4())
+        start = time.perf_counter()
+        self.clickhouse_helper.query(self.test_case, sql, query_id=query_id)
+        elapsed_ms = round((time.perf_counter() - start) * 1000, 1)
+        self.clickhouse_helper.ddl(self.test_case, "SYSTEM FLUSH LOGS")
+        union = ""
+        if swarm:
+            # Wait until swarm nodes have flushed the sub-query logs.
+            SwarmMonitor(self.clickhouse_helper, self.test_case).distribution(query_id)
+            union = f"""
+            UNION ALL
+            SELECT ProfileEvents
+            FROM clusterAllReplicas('{SWARM_CLUSTER}', system.query_log)
+            WHERE initial_query_id = '{query_id}' AND is_initial_query = 0
+                AND type = 'QueryFinish'
+            """
+        sql = f"""
+        SELECT sumMap(ProfileEvents) AS events FROM (
+            SELECT ProfileEvents
+            FROM system.query_log
+            WHERE query_id = '{query_id}' AND type = 'QueryFinish'
+            {union}
+        )
+        """
+        events = self.clickhouse_helper.query(self.test_case, sql).get("events", {})
+        return {"query_id": query_id, "ms": elapsed_ms, "events": dict(events)}
+
+    def _print(self, report: dict):
+        print(
+            f"cold={report['cold_ms']}ms warm={report['warm_ms']}ms "
+            f"delta={report['latency_delta_ms']}ms "
+            f"s3_requests={report['s3_requests']} "
+            f"s3_bytes_saved={report['s3_bytes_saved']}"
+        )
+        for name, phases in report["caches"].items():
+            print(
+                f"  {name:<17} cold hit rate={phases['cold']['hit_rate']} "
+                f"warm hit rate={phases['warm']['hit_rate']} "
+                f"warm hits={phases['warm']['hits']} "
+                f"bytes from cache={phases['warm']['bytes_from_cache']}"
+            )
+
+
+def _is_known(event: str) -> bool:
+    return any(event in names for names in CACHE_EVENTS.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Antalya cache effectiveness")
+    parser.add_argument("--sql", help="Query to profile (default: benchmark catalog)")
+    parser.add_argument("--swarm", action="store_true", help="Run on the swarm")
+    parser.add_argument("--warm-runs", type=int, default=1)
+    parser.add_argument("--output", default="cache_profile.json")
+    args = parser.parse_args()
+    if args.warm_runs < 1:
+        parser.error("--warm-runs must be at least 1")
+
+    load_config()
+    helper = ClickHouseHelper(get_config(), init_paths())
+    try:
+        profiler = CacheProfiler(helper, None)
+        queries = [args.sql] if args.sql else [q.sql for q in DEFAULT_QUERIES]
+        reports = [
+            profiler.profile(sql, swarm=args.swarm, warm_runs=args.warm_runs)
+            for sql in queries
+        ]
+    finally:
+        helper.close()
+    with open(args.output, "w") as f:
+        json.dump(reports, f, indent=2)
+    print(f"Wrote cache profile to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
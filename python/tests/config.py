@@ -13,10 +13,15 @@
 # limitations under the License.
 
 import os
+import sys
 from dataclasses import dataclass, fields
 
 import yaml
 
+# Test modules import config first, so this makes tracing.py and the other
+# scripts in the parent directory importable from all of them.
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 
 @dataclass
 class TestConfig:
@@ -33,6 +38,22 @@ class TestConfig:
     ice_setting_storage_endpoint: str
     ice_setting_warehouse: str
     use_docker: bool
+    ch_pool_size: int = 4
+    test_parallel: int = 1
+    dataset_cache_dir: str = "var/datasets"
+    dataset_cache_max_mb: int = 10240
+    dataset_synthetic_rows: int = 0
+    dataset_fallback_rows: int = 0
+    log_since: str = ""
+    log_compress: bool = False
+    ch_http_port: int = 8123
+    minio_health_url: str = ""
+    keeper_host: str = ""
+    keeper_port: int = 9181
+    swarm_nodes: int = 0
+    readiness_timeout: int = 120
+    history_db: str = "var/history.sqlite"
+    history_window: int = 10
 
 
 @dataclass
@@ -0,0 +1,238 @@
+# Copyright 2025
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Optional
+
+import requests
+
+from config import TestConfig, TestPaths
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class DatasetCache:
+    """Content-addressed local cache for test datasets. Files are stored
+    under their SHA-256 checksum, an index maps source URLs to checksums,
+    and least recently used files are evicted when the cache exceeds its
+    size limit."""
+
+    def __init__(self, root: str, max_bytes: int):
+        """Initialize the cache in a root directory with a size limit."""
+        self.root = root
+        self.max_bytes = max_bytes
+        self.objects_dir = os.path.join(root, "objects")
+        self.index_path = os.path.join(root, "index.json")
+        self._lock = threading.RLock()
+        os.makedirs(self.objects_dir, exist_ok=True)
+
+    @classmethod
+    def from_config(cls, config: TestConfig, paths: TestPaths) -> "DatasetCache":
+        """Create the cache described by the test profile."""
+        root = os.path.join(paths.tests_dir, config.dataset_cache_dir)
+        return cls(root, config.dataset_cache_max_mb * 1024 * 1024)
+
+    def resolve(
+        self,
+        url: str,
+        synthetic_rows: int = 0,
+        verify: bool = False,
+        fallback_rows: int = 0,
+    ) -> str:
+        """Return a local path for a dataset URL, downloading it on a miss.
+
+        If synthetic_rows is set, a synthetic Parquet file with a compatible
+        schema is generated instead. A failed download raises RuntimeError
+        unless fallback_rows is set, in which case that many synthetic rows
+        are used. With verify set, the checksum of a cached file is checked
+        before use.
+        """
+        key = f"synthetic:{synthetic_rows}:{url}" if synthetic_rows else url
+        with self._lock:
+            index = self._load_index()
+            entry = index.get(key)
+            if entry and self._is_valid(entry, verify):
+                entry["last_used"] = time.time()
+                self._save_index(index)
+                print(f"Dataset cache hit for {key}: {entry['path']}")
+                return entry["path"]
+
+            if synthetic_rows:
+                entry = self._store(lambda f: write_synthetic_taxi(f, synthetic_rows))
+                entry["synthetic"] = True
+            else:
+                try:
+                    entry = self._store(lambda f: self._download(url, f))
+                except requests.exceptions.RequestException as e:
+                    if not fallback_rows:
+                        raise RuntimeError(f"Download of {url} failed: {e}") from e
+                    print(f"Download of {url} failed, using synthetic data: {e}")
+                    return self.resolve(url, fallback_rows)
+            entry["last_used"] = time.time()
+            index[key] = entry
+            self._evict(index, keep=entry["sha256"])
+            self._save_index(index)
+            print(f"Dataset cache stored {key}: {entry['path']}")
+            return entry["path"]
+
+    def total_bytes(self) -> int:
+        """Return the size of all cached objects."""
+        return sum(
+            os.path.getsize(os.path.join(self.objects_dir, name))
+            for name in os.listdir(self.objects_dir)
+        )
+
+    def _store(self, write) -> dict:
+        """Write a dataset to a temporary file, then move it to its checksum."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.objects_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            sha256 = _file_sha256(tmp_path)
+            path = os.path.join(self.objects_dir, f"{sha256}.parquet")
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return {"sha256": sha256, "path": path, "size": os.path.getsize(path)}
+
+    def _download(self, url: str, f):
+        """Stream a URL to an open file."""
+        with requests.get(url, stream=True, timeout=60) as response:
+            response.raise_for_status()
+            for chunk in response.iter_content(CHUNK_SIZE):
+                f.write(chunk)
+
+    def _is_valid(self, entry: dict, verify: bool) -> bool:
+        """Check that a cached file exists, has its size, and optionally its checksum."""
+        path = entry["path"]
+        if not os.path.exists(path) or os.path.getsize(path) != entry["size"]:
+            return False
+        return not verify or _file_sha256(path) == entry["sha256"]
+
+    def _evict(self, index: dict, keep: str):
+        """Remove least recently used entries until the cache fits its limit."""
+        entries = sorted(index.items(), key=lambda item: item[1]["last_used"])
+        total = sum({e["sha256"]: e["size"] for _, e in entries}.values())
+        for key, entry in entries:
+            if total <= self.max_bytes:
+                break
+            if entry["sha256"] == keep:
+                continue
+            del index[key]
+            # Several URLs may share the same content.
+            if not any(e["sha256"] == entry["sha256"] for e in index.values()):
+                if os.path.exists(entry["path"]):
+                    os.unlink(entry["path"])
+                total -= entry["size"]
+            print(f"Dataset cache evicted {key}")
+
+    def _load_index(self) -> dict:
+        if not os.path.exists(self.index_path):
+            return {}
+        with open(self.index_path) as f:
+            return json.load(f)
+
+    def _save_index(self, index: dict):
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(index, f, indent=2)
+        os.replace(tmp_path, self.index_path)
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def write_synthetic_taxi(
+    f, rows: int, batch_rows: int = 1_000_000, seed: Optional[int] = 0
+):
+    """Write random NYC yellow taxi trips with the public file schema to an
+    open file. Batches are written one at a time, so size is not bounded by
+    memory."""
+    import numpy as np
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    rng = np.random.default_rng(seed)
+    start = np.datetime64("2025-01-01T00:00:00", "us")
+    month_us = 31 * 24 * 3600 * 1_000_000
+    money = pa.float64()
+    schema = pa.schema(
+        [
+            ("VendorID", pa.int32()),
+            ("tpep_pickup_datetime", pa.timestamp("us")),
+            ("tpep_dropoff_datetime", pa.timestamp("us")),
+            ("passenger_count", pa.int64()),
+            ("trip_distance", pa.float64()),
+            ("RatecodeID", pa.int64()),
+            ("store_and_fwd_flag", pa.string()),
+            ("PULocationID", pa.int32()),
+            ("DOLocationID", pa.int32()),
+            ("payment_type", pa.int64()),
+            ("fare_amount", money),
+            ("extra", money),
+            ("mta_tax", money),
+            ("tip_amount", money),
+            ("tolls_amount", money),
+            ("improvement_surcharge", money),
+            ("total_amount", money),
+            ("congestion_surcharge", money),
+            ("Airport_fee", money),
+            ("cbd_congestion_fee", money),
+        ]
+    )
+    with pq.ParquetWriter(f, schema) as writer:
+        remaining = rows
+        while remaining > 0:
+            n = min(batch_rows, remaining)
+            pickup = start + rng.integers(0, month_us, n).astype("timedelta64[us]")
+            duration = rng.integers(60, 3600, n) * 1_000_000
+            distance = rng.exponential(3.0, n).round(2)
+            fare = (3.0 + distance * 2.5).round(2)
+            tip = (fare * rng.uniform(0, 0.3, n)).round(2)
+            zeros = np.zeros(n)
+            columns = {
+                "VendorID": rng.integers(1, 3, n, dtype=np.int32),
+                "tpep_pickup_datetime": pickup,
+                "tpep_dropoff_datetime": pickup + duration.astype("timedelta64[us]"),
+                "passenger_count": rng.integers(1, 7, n),
+                "trip_distance": distance,
+                "RatecodeID": np.ones(n, dtype=np.int64),
+                "store_and_fwd_flag": np.full(n, "N", dtype=object),
+                "PULocationID": rng.integers(1, 266, n, dtype=np.int32),
+                "DOLocationID": rng.integers(1, 266, n, dtype=np.int32),
+                "payment_type": rng.integers(1, 5, n),
+                "fare_amount": fare,
+                "extra": zeros,
+                "mta_tax": np.full(n, 0.5),
+                "tip_amount": tip,
+                "tolls_amount": zeros,
+                "improvement_surcharge": np.full(n, 1.0),
+                "total_amount": (fare + tip + 1.5).round(2),
+                "congestion_surcharge": np.full(n, 2.5),
+                "Airport_fee": zeros,
+                "cbd_congestion_fee": np.full(n, 0.75),
+            }
+            writer.write_table(pa.table(columns, schema=schema))
+            remaining -= n
@@ -0,0 +1,80 @@
+# Copyright 2025
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+import uuid
+from collections import defaultdict
+
+from config import get_config, get_paths
+from dataset_cache import DatasetCache
+
+TAXI_DATABASE = "ice_test"
+TAXI_ICEBERG_TABLE = "nyc.taxis_test"
+TAXI_URL = (
+    "https://d37ci6vzurychx.cloudfront.net/trip-data/yellow_tripdata_2025-01.parquet"
+)
+
+_values = {}
+_locks = defaultdict(threading.Lock)
+_locks_lock = threading.Lock()
+
+
+def session_fixture(name: str, create):
+    """Return the value of a session fixture, creating it on first use.
+    Concurrent callers wait for a single creation. Failures are not cached,
+    so the next caller retries."""
+    with _locks_lock:
+        lock = _locks[name]
+    with lock:
+        if name not in _values:
+            _values[name] = create()
+        return _values[name]
+
+
+def unique_name(prefix: str) -> str:
+    """Return a database or table name that no other test uses."""
+    return f"{prefix}_{uuid.uuid4().hex[:8]}"
+
+
+def taxi_table(test_case) -> str:
+    """Load the NYC taxi file into the Ice catalog once per session and
+    return the ClickHouse table name. The file is read from the local
+    dataset cache, or generated when dataset_synthetic_rows is set."""
+
+    def load():
+        config = get_config()
+        cache = DatasetCache.from_config(config, get_paths())
+        path = cache.resolve(
+            TAXI_URL,
+            synthetic_rows=config.dataset_synthetic_rows,
+            fallback_rows=config.dataset_fallback_rows,
+        )
+        test_case.os_helper.run_ice_command(
+            test_case,
+            ice_command=["delete-table", "--purge", TAXI_ICEBERG_TABLE],
+            ignore_returncode=True,
+        )
+        test_case.os_helper.run_ice_command(
+            test_case,
+            ice_command=["insert", TAXI_ICEBERG_TABLE, "-p", f"file://{path}"],
+            expected_output="Committed snapshot",
+            expected_returncode=0,
+        )
+        # Create the catalog database after loading so the table is listed.
+        assert test_case.clickhouse_helper.create_iceberg_rest_catalog(
+            test_case, TAXI_DATABASE, True
+        )
+        return f"{TAXI_DATABASE}.`{TAXI_ICEBERG_TABLE}`"
+
+    return session_fixture("taxi_table", load)
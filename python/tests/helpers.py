@@ -13,17 +13,26 @@
 # limitations under the License.
 
 import base64
+import gzip
+import heapq
 import os
 import re
 import shutil
 import subprocess
 import sys
+import tempfile
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from queue import Empty, LifoQueue
 from typing import Optional
 
 import requests
 
 from config import TestConfig, TestPaths
+from readiness import default_probes, wait_until_ready
+from tracing import span
 
 
 class DockerHelper:
@@ -63,11 +72,21 @@ class DockerHelper:
             print("Stopping Docker Compose services...")
             self._stop_docker_services()
 
-    def capture_container_logs(self):
-        """Capture container logs and save them to execution_logs directory."""
+    def capture_container_logs(
+        self, since: Optional[str] = None, compress: Optional[bool] = None
+    ):
+        """Capture container logs and save them to execution_logs directory.
+
+        Logs are streamed to one file per service in parallel, optionally
+        limited to a --since window (e.g. "30m") and gzip compressed. The
+        combined log is merged from the service files by timestamp.
+        """
         print("Capturing container logs...")
+        since = since if since is not None else self.config.log_since
+        compress = compress if compress is not None else self.config.log_compress
         logs_dir = os.path.join(self.paths.tests_dir, "execution_logs")
         timestamp = time.strftime("%Y%m%d_%H%M%S")
+        suffix = ".log.gz" if compress else ".log"
 
         try:
             result = subprocess.run(
@@ -76,69 +95,94 @@ class DockerHelper:
                 text=True,
                 check=True,
             )
-            services = (
-                result.stdout.strip().split("\n") if result.stdout.strip() else []
-            )
-
-            for service in services:
-                if service:
-                    try:
-                        log_result = subprocess.run(
-                            ["docker", "compose", "logs", "--no-color", service],
-                            capture_output=True,
-                            text=True,
-                            check=True,
-                        )
-                        log_file = os.path.join(logs_dir, f"{service}_{timestamp}.log")
-                        with open(log_file, "w") as f:
-                            f.write(f"=== Logs for service: {service} ===\n")
-                            f.write(
-                                f"=== Captured at: {time.strftime('%Y-%m-%d %H:%M:%S')} ===\n\n"
-                            )
-                            f.write(log_result.stdout)
-                        print(f"Saved logs for {service} to {log_file}")
-                    except subprocess.CalledProcessError as e:
-                        print(f"Failed to capture logs for service {service}: {e}")
-
-            try:
-                combined_result = subprocess.run(
-                    ["docker", "compose", "logs", "--no-color"],
-                    capture_output=True,
-                    text=True,
-                    check=True,
-                )
-                combined_log_file = os.path.join(logs_dir, f"combined_{timestamp}.log")
-                with open(combined_log_file, "w") as f:
-                    f.write("=== Combined Docker Compose Logs ===\n")
-                    f.write(
-                        f"=== Captured at: {time.strftime('%Y-%m-%d %H:%M:%S')} ===\n\n"
-                    )
-                    f.write(combined_result.stdout)
-                print(f"Saved combined logs to {combined_log_file}")
-            except subprocess.CalledProcessError as e:
-                print(f"Failed to capture combined logs: {e}")
-
         except subprocess.CalledProcessError as e:
             print(f"Failed to get service list: {e}")
             print(f"stdout: {e.stdout}")
             print(f"stderr: {e.stderr}")
+            return
+        services = [s for s in result.stdout.strip().split("\n") if s]
+
+        service_files = {
+            service: os.path.join(logs_dir, f"{service}_{timestamp}{suffix}")
+            for service in services
+        }
+        with ThreadPoolExecutor(max_workers=max(1, len(services))) as executor:
+            futures = {
+                executor.submit(self._stream_service_logs, service, path, since): (
+                    service
+                )
+                for service, path in service_files.items()
+            }
+        for future, service in futures.items():
+            try:
+                future.result()
+                print(f"Saved logs for {service} to {service_files[service]}")
+            except subprocess.CalledProcessError as e:
+                print(f"Failed to capture logs for service {service}: {e}")
+                print(f"stderr: {e.stderr}")
+                del service_files[service]
+
+        combined_log_file = os.path.join(logs_dir, f"combined_{timestamp}{suffix}")
+        merge_log_files(service_files, combined_log_file)
+        print(f"Saved combined logs to {combined_log_file}")
+
+    def _stream_service_logs(self, service: str, path: str, since: str):
+        """Stream the timestamped logs of one service to a file. They are
+        written to a hidden temporary file that is renamed once docker
+        compose logs succeeds, so a failure leaves no partial log."""
+        command = ["docker", "compose", "logs", "--no-color", "--no-log-prefix"]
+        command += ["--timestamps"] + (["--since", since] if since else [])
+        command.append(service)
+        tmp_path = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}")
+        try:
+            with _open_log(tmp_path, "wb") as f, tempfile.TemporaryFile() as err:
+                f.write(f"=== Logs for service: {service} ===\n".encode())
+                f.write(
+                    f"=== Captured at: {time.strftime('%Y-%m-%d %H:%M:%S')} ===\n\n".encode()
+                )
+                process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=err)
+                shutil.copyfileobj(process.stdout, f)
+                process.stdout.close()
+                if process.wait() != 0:
+                    err.seek(0)
+                    raise subprocess.CalledProcessError(
+                        process.returncode,
+                        command,
+                        stderr=err.read().decode(errors="replace"),
+                    )
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
 
     def _start_docker_services(self):
         """Start Docker Compose services."""
         try:
-            subprocess.run(
-                ["docker", "compose", "up", "-d"],
-                capture_output=True,
-                text=True,
-                check=True,
-            )
+            with span("docker.compose_up", "subprocess"):
+                subprocess.run(
+                    ["docker", "compose", "up", "-d"],
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                )
             print("Docker Compose started successfully")
-            time.sleep(5)
         except subprocess.CalledProcessError as e:
             print(f"Failed to start Docker Compose: {e}")
             print(f"stdout: {e.stdout}")
             print(f"stderr: {e.stderr}")
             sys.exit(1)
+        if not self.wait_until_ready():
+            print("Docker Compose services did not become ready")
+            sys.exit(1)
+
+    def wait_until_ready(self) -> bool:
+        """Poll every service concurrently until all are ready or time out."""
+        with span("docker.wait_until_ready", "subprocess"):
+            results = wait_until_ready(
+                default_probes(self.config), self.config.readiness_timeout
+            )
+        return all(result.ready for result in results)
 
     def _stop_docker_services(self):
         """Stop Docker Compose services."""
@@ -171,25 +215,242 @@ class DockerHelper:
                 print("Warning: No running Docker Compose services found")
             else:
                 print(f"Found running services: {', '.join(running_services)}")
+                if not self.wait_until_ready():
+                    print("Warning: Some services are not ready")
         except subprocess.CalledProcessError as e:
             print(f"Failed to verify services: {e}")
             print(f"stdout: {e.stdout}")
             print(f"stderr: {e.stderr}")
 
 
+def fail(test_case, message: str):
+    """Fail a test case, or raise RuntimeError if test_case is None, as
+    when a helper is used by a command line tool rather than a test."""
+    if test_case is None:
+        raise RuntimeError(message)
+    test_case.fail(message)
+
+
+def _open_log(path: str, mode: str):
+    """Open a log file, using gzip when its name ends in .gz."""
+    if path.endswith(".gz"):
+        return gzip.open(path, mode)
+    return open(path, mode)
+
+
+def _timestamped_lines(service: str, path: str):
+    """Yield (sort key, line) for a service log written with --timestamps.
+    Continuation lines without a timestamp keep the key of the line before."""
+    key = ""
+    with _open_log(path, "rt") as f:
+        for line in f:
+            if line.startswith("=== ") or line == "\n":
+                continue
+            stamp = line.split(" ", 1)[0]
+            if stamp[:4].isdigit() and stamp.endswith("Z"):
+                # Pad the fraction so that timestamps compare as strings.
+                seconds, _, fraction = stamp[:-1].partition(".")
+                key = f"{seconds}.{fraction:0<9}"
+            yield key, f"{service} | {line}"
+
+
+def merge_log_files(service_files: dict, output_path: str):
+    """Merge per-service log files into one file ordered by timestamp,
+    reading one line at a time from each file."""
+    streams = [_timestamped_lines(s, p) for s, p in service_files.items()]
+    with _open_log(output_path, "wt") as f:
+        f.write("=== Combined Docker Compose Logs ===\n")
+        f.write(f"=== Captured at: {time.strftime('%Y-%m-%d %H:%M:%S')} ===\n\n")
+        for _, line in heapq.merge(*streams, key=lambda item: item[0]):
+            f.write(line)
+
+
+class ClickHousePool:
+    """Thread-safe pool of reusable clickhouse-driver clients. Idle clients
+    are health-checked with a ping before reuse and broken ones are replaced."""
+
+    def __init__(
+        self,
+        config: TestConfig,
+        size: int = 4,
+        timeout: float = 30.0,
+        health_check_interval: float = 10.0,
+        settings: Optional[dict] = None,
+    ):
+        """Initialize an empty pool that opens at most size connections.
+        Settings are passed to each client, e.g. use_numpy."""
+        self.config = config
+        self.settings = settings
+        self.size = size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self._idle = LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    @property
+    def open_connections(self) -> int:
+        """Number of clients currently owned by the pool."""
+        return self._created
+
+    @contextmanager
+    def connection(self):
+        """Check out a client, returning it to the pool when done. A client
+        whose query failed on the server is returned as well. Other errors,
+        such as network or protocol errors, disconnect and discard it."""
+        from clickhouse_driver.errors import ServerException
+
+        client = self._acquire()
+        try:
+            yield client
+        except ServerException:
+            self._idle.put((client, time.monotonic()))
+            raise
+        except BaseException:
+            # Includes GeneratorExit when a streamed result is abandoned,
+            # which leaves unread packets on the connection.
+            self._discard(client)
+            raise
+        else:
+            self._idle.put((client, time.monotonic()))
+
+    def close(self):
+        """Disconnect all idle clients."""
+        while True:
+            try:
+                client, _ = self._idle.get_nowait()
+            except Empty:
+                return
+            self._discard(client)
+
+    def _acquire(self):
+        """Return a healthy idle client, a new client, or wait for one."""
+        while True:
+            try:
+                client, idle_since = self._idle.get_nowait()
+            except Empty:
+                with self._lock:
+                    if self._created < self.size:
+                        self._created += 1
+                        return self._create_client()
+                try:
+                    client, idle_since = self._idle.get(timeout=self.timeout)
+                except Empty:
+                    raise TimeoutError(
+                        f"No ClickHouse connection available after {self.timeout}s"
+                    )
+            if time.monotonic() - idle_since < self.health_check_interval:
+                return client
+            if self._is_healthy(client):
+                return client
+            self._discard(client)
+
+    def _is_healthy(self, client) -> bool:
+        """Ping the server on an open connection."""
+        connection = client.connection
+        if not connection.connected:
+            return True
+        try:
+            return connection.ping()
+        except Exception as e:
+            print(f"ClickHouse health check failed: {e}")
+            return False
+
+    def _discard(self, client):
+        """Disconnect a client and free its slot."""
+        try:
+            client.disconnect()
+        finally:
+            with self._lock:
+                self._created -= 1
+
+    def _create_client(self):
+        """Create a ClickHouse client connection."""
+        from clickhouse_driver import Client
+
+        return Client(
+            host=self.config.ch_host,
+            port=self.config.ch_port,
+            user=self.config.ch_user,
+            password=self.config.ch_password,
+            settings=self.settings,
+        )
+
+
+def _error_text(data: bytes) -> str:
+    """Return a ClickHouse exception written into a response body, if any."""
+    text = data.decode(errors="replace")
+    match = re.search(r"Code: \d+\..*", text, re.DOTALL)
+    return match.group(0).strip()[:500] if match else ""
+
+
+class _TailReader:
+    """File-like wrapper that keeps the last bytes read, so that an error
+    message the Arrow reader consumed can still be reported."""
+
+    def __init__(self, raw, keep: int = 4096):
+        self.raw = raw
+        self.keep = keep
+        self.tail = b""
+        self.closed = False
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.raw.read() if size is None or size < 0 else self.raw.read(size)
+        self.tail = (self.tail + data)[-self.keep :]
+        return data
+
+    def readable(self) -> bool:
+        return True
+
+
+def _check_trailing(data: bytes):
+    """Raise if anything follows the end of an Arrow stream. ClickHouse
+    appends the exception text when a query fails after the HTTP status
+    was sent, which leaves the stream truncated."""
+    if data:
+        raise RuntimeError(
+            _error_text(data) or f"{len(data)} unexpected bytes after the result"
+        )
+
+
 class ClickHouseHelper:
-    """Helper class for ClickHouse database operations."""
+    """Helper class for ClickHouse database operations. Errors fail the
+    test case passed to each method, or raise RuntimeError if it is None."""
 
     def __init__(self, config: TestConfig, paths: TestPaths):
         """Initialize ClickHouseHelper with test configuration."""
         self.config = config
         self.paths = paths
-
-    def query(self, test_case, sql: str = "SELECT 1") -> dict:
+        # Each concurrent test may hold two connections, e.g. a streamed
+        # result or a running query plus a monitoring query.
+        size = max(config.ch_pool_size, 2 * config.test_parallel)
+        self.pool = ClickHousePool(config, size=size)
+        self.numpy_pool = ClickHousePool(
+            config, size=size, settings={"use_numpy": True}
+        )
+        self.http_url = f"http://{config.ch_host}:{config.ch_http_port}/"
+        self._local = threading.local()
+        self._sessions = []
+        self._sessions_lock = threading.Lock()
+
+    def close(self):
+        """Disconnect pooled client connections and HTTP sessions."""
+        self.pool.close()
+        self.numpy_pool.close()
+        with self._sessions_lock:
+            for session in self._sessions:
+                session.close()
+            self._sessions.clear()
+
+    def query(
+        self, test_case, sql: str = "SELECT 1", query_id: Optional[str] = None
+    ) -> dict:
         """Execute a ClickHouse query and return first row as dictionary."""
-        client = self._create_client()
         try:
-            result = client.execute(sql, with_column_types=True)
+            with self.pool.connection() as client, span(
+                "clickhouse.query", "query", sql=sql[:200]
+            ):
+                result = client.execute(sql, with_column_types=True, query_id=query_id)
 
             if not result:
                 return {}
@@ -203,22 +464,195 @@ class ClickHouseHelper:
             return {}
 
         except Exception as e:
-            test_case.fail(f"ClickHouse query failed. SQL: '{sql}', Error: {e}")
-        finally:
-            client.disconnect()
+            fail(test_case, f"ClickHouse query failed. SQL: '{sql}', Error: {e}")
+
+    def query_iter(self, test_case, sql: str, block_rows: int = 65536):
+        """Stream a ClickHouse query result as lists of at most block_rows
+        row tuples. Only one block is held in memory at a time."""
+        try:
+            with self.pool.connection() as client, span(
+                "clickhouse.query_iter", "query", nest=False, sql=sql[:200]
+            ):
+                blocks = client.execute_iter(
+                    sql,
+                    settings={"max_block_size": block_rows},
+                    chunk_size=block_rows,
+                )
+                for block in blocks:
+                    yield block
+            print(f"Query streamed successfully: {sql[:50]}...")
+        except Exception as e:
+            fail(test_case, f"ClickHouse query failed. SQL: '{sql}', Error: {e}")
+
+    def query_columns(self, test_case, sql: str, arrow: bool = False):
+        """Execute a ClickHouse query and return the full result by column,
+        as a dict of NumPy arrays or as an Arrow table if arrow is True."""
+        try:
+            with self.numpy_pool.connection() as client, span(
+                "clickhouse.query_columns", "query", sql=sql[:200]
+            ):
+                columns, column_info = client.execute(
+                    sql, columnar=True, with_column_types=True
+                )
+            print(f"Query executed successfully: {sql[:50]}...")
+            names = [col[0] for col in column_info]
+            if arrow:
+                import pyarrow as pa
+
+                return pa.table({n: pa.array(c) for n, c in zip(names, columns)})
+            return dict(zip(names, columns))
+
+        except Exception as e:
+            fail(test_case, f"ClickHouse query failed. SQL: '{sql}', Error: {e}")
+
+    def query_arrow(
+        self,
+        test_case,
+        sql: str,
+        fmt: str = "ArrowStream",
+        compression: str = "zstd",
+        http_compression: bool = False,
+    ):
+        """Execute a query over the HTTP interface and decode the result
+        straight into an Arrow table, with no Python objects per row. fmt is
+        ArrowStream or Parquet, and compression is applied within the format.
+        http_compression also gzips the response, which helps on slow links."""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        try:
+            with span("clickhouse.query_arrow", "query", sql=sql[:200], fmt=fmt):
+                response = self._http_query(
+                    sql, fmt, compression, http_compression, stream=False
+                )
+                buffer = pa.py_buffer(response.content)
+                if fmt == "Parquet":
+                    table = pq.read_table(buffer)
+                else:
+                    source = pa.BufferReader(buffer)
+                    try:
+                        table = pa.ipc.open_stream(source).read_all()
+                    except pa.ArrowException as e:
+                        raise RuntimeError(_error_text(response.content) or e)
+                    _check_trailing(source.read())
+            print(f"Query executed successfully: {sql[:50]}...")
+            return table
+
+        except Exception as e:
+            fail(test_case, f"ClickHouse query failed. SQL: '{sql}', Error: {e}")
+
+    def query_arrow_batches(
+        self,
+        test_case,
+        sql: str,
+        compression: str = "zstd",
+        http_compression: bool = False,
+    ):
+        """Stream a query result over HTTP as Arrow record batches in the
+        ArrowStream format. Only one batch is decoded at a time. An error
+        the server hits after it started sending the result is raised
+        once the batches before it have been read."""
+        import pyarrow as pa
 
-    def ddl(self, test_case, sql: str) -> bool:
-        """Execute a ClickHouse DDL command."""
-        client = self._create_client()
         try:
-            client.execute(sql)
+            with span(
+                "clickhouse.query_arrow_batches", "query", nest=False, sql=sql[:200]
+            ):
+                with self._http_query(
+                    sql, "ArrowStream", compression, http_compression, stream=True
+                ) as response:
+                    response.raw.decode_content = True
+                    source = _TailReader(response.raw)
+                    try:
+                        for batch in pa.ipc.open_stream(source):
+                            yield batch
+                    except pa.ArrowException as e:
+                        raise RuntimeError(
+                            _error_text(source.tail + source.read()) or e
+                        )
+                    _check_trailing(source.read())
+            print(f"Query streamed successfully: {sql[:50]}...")
+        except Exception as e:
+            fail(test_case, f"ClickHouse query failed. SQL: '{sql}', Error: {e}")
+
+    def query_http(self, sql: str, fmt: str = "TabSeparated") -> int:
+        """Run a query over the HTTP interface and discard the result, e.g.
+        to generate load. Returns the number of bytes received. Failures
+        raise RuntimeError with the server error, including one the server
+        appends to the result after it sent the HTTP status."""
+        with span("clickhouse.query_http", "query", sql=sql[:200]):
+            with self._http_query(sql, fmt, "none", False, stream=True) as response:
+                received, tail = 0, b""
+                for chunk in response.iter_content(65536):
+                    received += len(chunk)
+                    tail = (tail + chunk)[-4096:]
+        error = _error_text(tail)
+        if error:
+            raise RuntimeError(error)
+        return received
+
+    def _http_query(
+        self,
+        sql: str,
+        fmt: str,
+        compression: str,
+        http_compression: bool,
+        stream: bool,
+    ) -> requests.Response:
+        """POST a query to the HTTP interface with a per-thread keep-alive
+        session. fmt is used unless the query has its own FORMAT clause."""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+            with self._sessions_lock:
+                self._sessions.append(session)
+        params = {
+            "default_format": fmt,
+            "output_format_arrow_compression_method": compression,
+            "output_format_parquet_compression_method": compression,
+            # String columns as utf8 rather than binary, as in native results.
+            "output_format_arrow_string_as_string": 1,
+            "output_format_parquet_string_as_string": 1,
+        }
+        headers = {
+            "X-ClickHouse-User": self.config.ch_user,
+            "X-ClickHouse-Key": self.config.ch_password or "",
+        }
+        if http_compression:
+            params["enable_http_compression"] = 1
+            headers["Accept-Encoding"] = "gzip"
+        response = session.post(
+            self.http_url,
+            params=params,
+            data=sql.encode(),
+            headers=headers,
+            stream=stream,
+            timeout=600,
+        )
+        code = response.headers.get("X-ClickHouse-Exception-Code")
+        if response.status_code != 200 or code:
+            raise RuntimeError(
+                f"HTTP {response.status_code}, exception code {code}: "
+                f"{response.text.strip()[:500]}"
+            )
+        return response
+
+    def ddl(self, test_case, sql: str, ignore_errors: bool = False) -> bool:
+        """Execute a ClickHouse DDL command. If ignore_errors is set, failures
+        are printed and reported by returning False."""
+        try:
+            with self.pool.connection() as client, span(
+                "clickhouse.ddl", "query", sql=sql[:200]
+            ):
+                client.execute(sql)
             print(f"DDL executed successfully: {sql[:50]}...")
             return True
 
         except Exception as e:
-            test_case.fail(f"ClickHouse DDL failed. SQL: '{sql}', Error: {e}")
-        finally:
-            client.disconnect()
+            if ignore_errors:
+                print(f"DDL failed (ignored): {sql[:50]}... Error: {e}")
+                return False
+            fail(test_case, f"ClickHouse DDL failed. SQL: '{sql}', Error: {e}")
 
     def create_iceberg_rest_catalog(
         self, test_case, name, drop_first: bool = False
@@ -241,7 +675,7 @@ class ClickHouseHelper:
         else:
             ice_setting_warehouse = ""
         create_ddl = f"""
-        CREATE DATABASE ice_test ENGINE = DataLakeCatalog('http://ice-rest-catalog:5000')
+        CREATE DATABASE {name} ENGINE = DataLakeCatalog('http://ice-rest-catalog:5000')
         SETTINGS
           catalog_type = 'rest'
           {ice_setting_auth_header} {ice_setting_warehouse} {ice_setting_storage_endpoint}
@@ -249,17 +683,6 @@ class ClickHouseHelper:
 
         return self.ddl(test_case, create_ddl)
 
-    def _create_client(self):
-        """Create a ClickHouse client connection."""
-        from clickhouse_driver import Client
-
-        return Client(
-            host=self.config.ch_host,
-            port=self.config.ch_port,
-            user=self.config.ch_user,
-            password=self.config.ch_password,
-        )
-
 
 class OsHelper:
     """Helper class for OS-level operations including command execution,
@@ -306,69 +729,76 @@ class OsHelper:
     ):
         """Run a command and verify expected output."""
         try:
-            result = subprocess.run(
-                command,
-                capture_output=True,
-                text=True,
-                check=False,
-            )
+            with span("run_command", "subprocess", command=" ".join(command)) as attrs:
+                result = subprocess.run(
+                    command,
+                    capture_output=True,
+                    text=True,
+                    check=False,
+                )
+                attrs["returncode"] = result.returncode
 
             if not ignore_returncode and result.returncode != expected_returncode:
-                test_case.fail(
+                fail(
+                    test_case,
                     f"Command {command} returned {result.returncode}, "
                     f"expected {expected_returncode}\n"
-                    f"stdout: {result.stdout}\nstderr: {result.stderr}"
+                    f"stdout: {result.stdout}\nstderr: {result.stderr}",
                 )
 
             combined_output = result.stdout + result.stderr
 
             if expected_output is not None and expected_output not in combined_output:
-                test_case.fail(
+                fail(
+                    test_case,
                     f"Expected output '{expected_output}' not found in command output\n"
-                    f"stdout: {result.stdout}\nstderr: {result.stderr}"
+                    f"stdout: {result.stdout}\nstderr: {result.stderr}",
                 )
 
             if expected_pattern is not None:
                 if not re.search(expected_pattern, combined_output):
-                    test_case.fail(
+                    fail(
+                        test_case,
                         f"Expected pattern '{expected_pattern}' not found in output\n"
-                        f"stdout: {result.stdout}\nstderr: {result.stderr}"
+                        f"stdout: {result.stdout}\nstderr: {result.stderr}",
                     )
 
             print(f"Command executed successfully: {' '.join(command[:3])}...")
             return result
 
         except Exception as e:
-            test_case.fail(f"Failed to run command {command}: {e}")
+            fail(test_case, f"Failed to run command {command}: {e}")
 
-    def run_python_script(self, test_case, script_name: str):
-        """Run a Python script from the python directory."""
+    def run_python_script(self, test_case, script_name: str, *args: str):
+        """Run a Python script from the python directory with arguments."""
         try:
             script_path = os.path.join(self.paths.python_dir, script_name)
 
-            result = subprocess.run(
-                ["python", script_path],
-                capture_output=True,
-                text=True,
-                check=True,
-                cwd=self.paths.python_dir,
-            )
+            with span("run_python_script", "subprocess", script=script_name):
+                result = subprocess.run(
+                    ["python", script_path, *args],
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                    cwd=self.paths.python_dir,
+                )
             print(f"{script_name} executed successfully")
             print(f"stdout: {result.stdout}")
             return result
         except subprocess.CalledProcessError as e:
-            test_case.fail(
+            fail(
+                test_case,
                 f"{script_name} failed with exit code {e.returncode}\n"
-                f"stdout: {e.stdout}\nstderr: {e.stderr}"
+                f"stdout: {e.stdout}\nstderr: {e.stderr}",
             )
         except FileNotFoundError:
-            test_case.fail(f"{script_name} not found in {self.paths.python_dir}")
+            fail(test_case, f"{script_name} not found in {self.paths.python_dir}")
 
     def check_executable_in_path(self, test_case, executable_name: str) -> str:
         """Verify an executable exists in PATH."""
         path = shutil.which(executable_name)
         if path is None:
-            test_case.fail(f"Executable '{executable_name}' not found in PATH")
+            fail(test_case, f"Executable '{executable_name}' not found in PATH")
         print(f"Found '{executable_name}' at: {path}")
         return path
 
@@ -400,15 +830,17 @@ class OsHelper:
             min_version_tuple = self._parse_version(min_version)
 
             if actual_version is None:
-                test_case.fail(
+                fail(
+                    test_case,
                     f"Could not parse version from '{executable_name} {version_flag}'\n"
-                    f"Output: {output}"
+                    f"Output: {output}",
                 )
 
             if actual_version < min_version_tuple:
-                test_case.fail(
+                fail(
+                    test_case,
                     f"'{executable_name}' version {'.'.join(map(str, actual_version))} "
-                    f"is less than required {min_version}"
+                    f"is less than required {min_version}",
                 )
 
             version_display = ".".join(map(str, actual_version))
@@ -416,9 +848,9 @@ class OsHelper:
             return actual_version
 
         except FileNotFoundError:
-            test_case.fail(f"Executable '{executable_name}' not found")
+            fail(test_case, f"Executable '{executable_name}' not found")
         except Exception as e:
-            test_case.fail(f"Failed to check version of '{executable_name}': {e}")
+            fail(test_case, f"Failed to check version of '{executable_name}': {e}")
 
     def http_get(
         self,
@@ -439,13 +871,14 @@ class OsHelper:
                 print(f"HTTP GET to {url} successful: {response.status_code}")
                 return response
             else:
-                test_case.fail(
-                    f"Expected status {expected_status_code}, got {response.status_code}"
+                fail(
+                    test_case,
+                    f"Expected status {expected_status_code}, got {response.status_code}",
                 )
         except requests.exceptions.RequestException as e:
             print(f"HTTP request failed for URL: {url}")
             print(f"Exception: {e}")
-            test_case.fail(f"HTTP request failed: {e}")
+            fail(test_case, f"HTTP request failed: {e}")
 
     def generate_basic_auth_header(self, username: str, password: str) -> str:
         """Generate a properly encoded basic authentication header."""
@@ -0,0 +1,340 @@
+# Copyright 2025
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+import json
+import math
+import os
+import re
+import socket
+import sqlite3
+import statistics
+import subprocess
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from config import TestConfig, TestPaths, get_config, init_paths, load_config
+
+# A change is a regression only if it is significant at this level...
+ALPHA = 0.01
+# ...and makes the median worse by at least this fraction.
+MIN_EFFECT = 0.1
+# Metrics recorded by fewer earlier runs than this are not compared.
+MIN_BASELINE_RUNS = 3
+
+SUITES = ("benchmark", "load", "arrow_fetch", "scale_out", "tests")
+
+# (suite, name, metric, value, higher_is_better)
+Measurement = Tuple[str, str, str, float, bool]
+
+
+@dataclass
+class Regression:
+    """A metric that got significantly worse than its rolling baseline."""
+
+    suite: str
+    name: str
+    metric: str
+    baseline: float
+    current: float
+    change_pct: float
+    p_value: float
+
+    def __str__(self):
+        return (
+            f"{self.suite} {self.name} {self.metric}: {self.baseline:.4g} -> "
+            f"{self.current:.4g} ({self.change_pct:+.1f}%, p={self.p_value:.2g})"
+        )
+
+
+def ice_image(paths: TestPaths) -> str:
+    """Return the digest of the running ice-rest-catalog image. The compose
+    file pulls the tag on every start, so the tag alone does not identify
+    it. Falls back to the tag if the container cannot be inspected."""
+    tag = os.getenv("ICE_REST_CATALOG_TAG", "latest")
+    try:
+        container = subprocess.run(
+            ["docker", "compose", "ps", "-q", "ice-rest-catalog"],
+            cwd=paths.docker_dir,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        if not container:
+            return tag
+        image = subprocess.run(
+            ["docker", "inspect", "--format", "{{.Image}}", container],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        digests = subprocess.run(
+            ["docker", "image", "inspect", "--format", "{{json .RepoDigests}}", image],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"Could not inspect the ice-rest-catalog image: {e}")
+        return tag
+    digests = json.loads(digests or "null") or []
+    return digests[0] if digests else image
+
+
+def environment(clickhouse_helper, test_case, paths: TestPaths) -> dict:
+    """Return the ClickHouse version, image tag, ice-rest-catalog image
+    digest and host for a run."""
+    version = clickhouse_helper.query(test_case, "SELECT version() AS v").get("v")
+    image_tag = None
+    compose_file = os.path.join(paths.docker_dir, "docker-compose.yml")
+    if os.path.exists(compose_file):
+        with open(compose_file) as f:
+            match = re.search(r"altinity/clickhouse-server:(\S+)", f.read())
+        image_tag = match.group(1) if match else None
+    return {
+        "clickhouse_version": version,
+        "image_tag": image_tag,
+        "ice_tag": ice_image(paths),
+        "host": socket.gethostname(),
+    }
+
+
+def measurements(suite: str, report: dict) -> Iterator[Measurement]:
+    """Extract metrics from a report of one of the harness tools. Each
+    sample of a metric is yielded separately and compared by its median."""
+    results = report.get("results", [])
+    if suite == "benchmark":
+        for r in results:
+            name = f"{r['name']}/{r['mode']}"
+            for run in r.get("runs", []):
+                metric = "latency_ms" if run["phase"] == "warm" else "cold_ms"
+                yield suite, name, metric, run["client_ms"], False
+    elif suite == "load":
+        for r in results:
+            name = f"{r['protocol']}/{r['mode']}/{r['level']}"
+            yield suite, name, "throughput_qps", r["throughput_qps"], True
+            if r.get("p95_ms") is not None:
+                yield suite, name, "p95_ms", r["p95_ms"], False
+            if r.get("error_rate") is not None:
+                yield suite, name, "error_rate", r["error_rate"], False
+    elif suite == "arrow_fetch":
+        for r in results:
+            yield suite, r["path"], "seconds", r["seconds"], False
+            yield suite, r["path"], "python_peak_mb", r["python_peak_mb"], False
+    elif suite == "scale_out":
+        for r in results:
+            name = f"{r['name']}/{r['nodes']}"
+            yield suite, name, "latency_ms", r["warm_p50_ms"], False
+        for point in report.get("curve", []):
+            if point["speedup"] is not None:
+                yield suite, f"{point['nodes']}", "speedup", point["speedup"], True
+    elif suite == "tests":
+        for r in results:
+            yield suite, r["name"], "seconds", r["seconds"], False
+    else:
+        raise ValueError(f"Unknown suite {suite!r}")
+
+
+class HistoryStore:
+    """Benchmark and test measurements of every run, kept in SQLite."""
+
+    def __init__(self, path: str):
+        """Open or create the store at path."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id INTEGER PRIMARY KEY AUTOINCREMENT, started_at REAL,
+                clickhouse_version TEXT, image_tag TEXT, ice_tag TEXT, host TEXT);
+            CREATE TABLE IF NOT EXISTS measurements (
+                run_id INTEGER, suite TEXT, name TEXT, metric TEXT, value REAL,
+                higher_is_better INTEGER);
+            CREATE INDEX IF NOT EXISTS measurements_key
+                ON measurements (suite, name, metric, run_id);
+            """
+        )
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: TestConfig, paths: TestPaths) -> "HistoryStore":
+        return cls(os.path.join(paths.tests_dir, config.history_db))
+
+    def start_run(self, env: dict) -> int:
+        """Record a new run with its environment and return the run id."""
+        with self._lock, self.db:
+            cursor = self.db.execute(
+                "INSERT INTO runs (started_at, clickhouse_version, image_tag, ice_tag,"
+                " host) VALUES (?, ?, ?, ?, ?)",
+                (
+                    time.time(),
+                    env.get("clickhouse_version"),
+                    env.get("image_tag"),
+                    env.get("ice_tag"),
+                    env.get("host"),
+                ),
+            )
+        return cursor.lastrowid
+
+    def record(self, run_id: int, rows: Sequence[Measurement]):
+        """Store measurements of a run."""
+        with self._lock, self.db:
+            self.db.executemany(
+                "INSERT INTO measurements VALUES (?, ?, ?, ?, ?, ?)",
+                [(run_id, *row) for row in rows],
+            )
+
+    def compare(
+        self,
+        run_id: int,
+        window: int = 10,
+        alpha: float = ALPHA,
+        min_effect: float = MIN_EFFECT,
+    ) -> List[Regression]:
+        """Compare every metric of a run with the same metric in the last
+        window earlier runs on the same host that recorded it, and return
+        the regressions."""
+        regressions = []
+        with self._lock:
+            host = self.db.execute(
+                "SELECT host FROM runs WHERE run_id = ?", (run_id,)
+            ).fetchone()[0]
+            current = self._samples(run_id)
+            for key, (values, higher_is_better) in current.items():
+                baseline = self._baseline(key, host, run_id, window)
+                regression = _check(key, values, baseline, higher_is_better)
+                if (
+                    regression
+                    and regression.p_value < alpha
+                    and abs(regression.change_pct) >= min_effect * 100
+                ):
+                    regressions.append(regression)
+        return sorted(regressions, key=lambda r: (r.suite, r.name, r.metric))
+
+    def _samples(self, run_id: int) -> Dict[tuple, tuple]:
+        """Return {(suite, name, metric): ([values], higher_is_better)} of a run."""
+        samples = {}
+        for suite, name, metric, value, higher in self.db.execute(
+            "SELECT suite, name, metric, value, higher_is_better"
+            " FROM measurements WHERE run_id = ?",
+            (run_id,),
+        ):
+            values, _ = samples.setdefault((suite, name, metric), ([], bool(higher)))
+            values.append(value)
+        return samples
+
+    def _baseline(self, key: tuple, host: str, run_id: int, window: int) -> List[float]:
+        """Return the median of a metric in each of the last window runs
+        before run_id on host that recorded it."""
+        runs = {}
+        for previous, value in self.db.execute(
+            """
+            SELECT run_id, value FROM measurements
+            WHERE suite = ? AND name = ? AND metric = ? AND run_id IN (
+                SELECT DISTINCT m.run_id FROM measurements m
+                JOIN runs r ON r.run_id = m.run_id
+                WHERE m.suite = ? AND m.name = ? AND m.metric = ?
+                    AND r.host = ? AND m.run_id < ?
+                ORDER BY m.run_id DESC LIMIT ?)
+            """,
+            (*key, *key, host, run_id, window),
+        ):
+            runs.setdefault(previous, []).append(value)
+        return [statistics.median(values) for values in runs.values()]
+
+    def close(self):
+        self.db.close()
+
+
+def _check(
+    key: tuple,
+    current: List[float],
+    baseline: List[float],
+    higher_is_better: bool,
+) -> Optional[Regression]:
+    """Test whether the median of current values is worse than the run
+    medians of the baseline. Samples within a run are not independent of
+    each other, so each run counts once."""
+    if len(baseline) < MIN_BASELINE_RUNS or not current:
+        return None
+    base_median = statistics.median(baseline)
+    current_median = statistics.median(current)
+    if base_median == 0:
+        return None
+    change_pct = (current_median - base_median) / abs(base_median) * 100
+    if (change_pct > 0) == higher_is_better or change_pct == 0:
+        return None
+    # z of a new observation against the baseline runs, with the extra
+    # uncertainty of estimating their mean from few runs.
+    stdev = statistics.stdev(baseline) * math.sqrt(1 + 1 / len(baseline))
+    if stdev == 0:
+        p_value = 0.0
+    else:
+        z = abs(current_median - statistics.mean(baseline)) / stdev
+        p_value = 1 - statistics.NormalDist().cdf(z)
+    return Regression(*key, base_median, current_median, round(change_pct, 1), p_value)
+
+
+def record_report(
+    suite: str, report: dict, clickhouse_helper, test_case, window: int = None
+) -> List[Regression]:
+    """Record a report in the store from the test profile, compare it with
+    the rolling baseline and print any regressions. Does nothing if
+    history_db is empty."""
+    config, paths = get_config(), init_paths()
+    if not config.history_db:
+        return []
+    store = HistoryStore.from_config(config, paths)
+    try:
+        run_id = store.start_run(environment(clickhouse_helper, test_case, paths))
+        store.record(run_id, list(measurements(suite, report)))
+        regressions = store.compare(run_id, window or config.history_window)
+    finally:
+        store.close()
+    print_regressions(regressions)
+    return regressions
+
+
+def print_regressions(regressions: List[Regression]):
+    if not regressions:
+        print("No regressions against the baseline")
+        return
+    print(f"{len(regressions)} regressions against the baseline:")
+    for regression in regressions:
+        print(f"  {regression}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record and compare benchmarks")
+    parser.add_argument("suite", choices=SUITES)
+    parser.add_argument("report", help="JSON report written by the tool")
+    parser.add_argument("--window", type=int, help="Number of baseline runs")
+    args = parser.parse_args()
+
+    from helpers import ClickHouseHelper
+
+    load_config()
+    with open(args.report) as f:
+        report = json.load(f)
+    helper = ClickHouseHelper(get_config(), init_paths())
+    try:
+        record_report(args.suite, report, helper, None, args.window)
+    finally:
+        helper.close()
+
+
+if __name__ == "__main__":
+    main()
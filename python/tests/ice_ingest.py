@@ -0,0 +1,309 @@
+# Copyright 2025
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+import glob
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Sequence
+
+from config import TestConfig, TestPaths, get_config, init_paths, load_config
+from helpers import fail
+from tracing import span
+
+# ice output that means the commit lost a race with another writer. After
+# CommitFailedException nothing was committed, but after
+# CommitStateUnknownException the commit may have succeeded. Retries are
+# only correct because they pass --skip-duplicates, so files an earlier
+# attempt committed are not added twice.
+CONFLICT_PATTERN = re.compile(
+    r"CommitFailedException|CommitStateUnknownException|[Cc]ommit conflict|"
+    r"Requirement failed|branch main has changed",
+)
+
+# Output lines kept per batch to report failures.
+TAIL_LINES = 20
+
+
+def discover(sources: Sequence[str]) -> List[str]:
+    """Expand directories, local globs and manifests into a sorted list of
+    file URIs. Manifests are .txt files with one path per line or .json
+    files with a list of paths. Remote URIs such as s3:// or https:// are
+    passed to ice unchanged, so ice expands any wildcards in them."""
+    files = []
+    for source in sources:
+        if "://" in source and not source.startswith("file://"):
+            files.append(source)
+        elif os.path.isdir(source):
+            files.extend(
+                glob.glob(os.path.join(source, "**", "*.parquet"), recursive=True)
+            )
+        elif source.endswith(".json"):
+            with open(source) as f:
+                files.extend(discover(json.load(f)))
+        elif source.endswith(".txt"):
+            with open(source) as f:
+                lines = [line.strip() for line in f]
+            files.extend(discover([line for line in lines if line]))
+        else:
+            prefixed = source.startswith("file://")
+            matches = glob.glob(source[len("file://") :] if prefixed else source)
+            if not matches:
+                raise FileNotFoundError(f"No files match {source}")
+            files.extend(matches)
+    uris = [f if "://" in f else f"file://{os.path.abspath(f)}" for f in files]
+    return sorted(dict.fromkeys(uris))
+
+
+def batches(files: Sequence[str], batch_size: int) -> List[List[str]]:
+    """Split files into commit batches of at most batch_size files."""
+    return [list(files[i : i + batch_size]) for i in range(0, len(files), batch_size)]
+
+
+class Progress:
+    """Count finished files from many threads and print the rate."""
+
+    def __init__(self, total: int):
+        self.total = total
+        self.done = 0
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def add(self, files: int):
+        with self._lock:
+            self.done += files
+            elapsed = time.monotonic() - self.started
+            rate = self.done / elapsed if elapsed else 0.0
+            eta = (self.total - self.done) / rate if rate else 0.0
+            print(
+                f"Progress: {self.done}/{self.total} files, "
+                f"{rate:.1f} files/s, ETA {eta:.0f}s"
+            )
+
+    def rate(self) -> float:
+        elapsed = time.monotonic() - self.started
+        return self.done / elapsed if elapsed else 0.0
+
+
+class IceIngest:
+    """Load many files into one Iceberg table with ice insert.
+
+    Files are inserted in batches of batch_size files per ice invocation,
+    so JVM startup and the catalog commit are paid once per batch. Up to
+    parallel batches run at a time. The first batch runs alone so that -p
+    creates the table before concurrent inserts, and if it fails the other
+    batches are not started. A batch whose commit
+    conflicts with another is retried with jittered exponential backoff.
+    ice output is printed line by line as it arrives, prefixed with the
+    batch number.
+    """
+
+    def __init__(
+        self,
+        config: TestConfig,
+        paths: TestPaths,
+        test_case,
+        table: str,
+        batch_size: int = 50,
+        parallel: int = 4,
+        retries: int = 5,
+        backoff: float = 1.0,
+        extra_args: Sequence[str] = (),
+        executable: str = "ice",
+    ):
+        """Initialize the orchestrator. extra_args are passed to every ice
+        insert, e.g. --force-no-copy or --s3-region=us-east-2."""
+        self.config = config
+        self.paths = paths
+        self.test_case = test_case
+        self.table = table
+        self.batch_size = batch_size
+        self.parallel = parallel
+        self.retries = retries
+        self.backoff = backoff
+        self.extra_args = list(extra_args)
+        self.executable = executable
+        self._retried = 0
+        self._lock = threading.Lock()
+
+    def run(self, files: Sequence[str]) -> dict:
+        """Insert all files and return a report. Fails the test case, or
+        raises RuntimeError without one, if any batch still fails after
+        retries."""
+        report = self.insert(files)
+        if report["failed"]:
+            fail(
+                self.test_case,
+                f"{len(report['failed'])} ice insert batches failed:\n"
+                + "\n".join(
+                    f"batch {f['batch']}: {f['error']}" for f in report["failed"]
+                ),
+            )
+        return report
+
+    def insert(self, files: Sequence[str]) -> dict:
+        """Insert all files and return a report with the failed batches."""
+        work = batches(files, self.batch_size)
+        progress = Progress(len(files))
+        print(
+            f"Inserting {len(files)} files into {self.table} in {len(work)} "
+            f"batches, {self.parallel} at a time"
+        )
+        failed = []
+        skipped = 0
+        with span("ice_ingest.run", "subprocess", table=self.table, files=len(files)):
+            if work:
+                failed += self._insert(0, work[0], progress)
+            if failed:
+                skipped = len(work) - 1
+                print(f"First batch failed, skipping the other {skipped} batches")
+            else:
+                with ThreadPoolExecutor(max_workers=self.parallel) as pool:
+                    futures = [
+                        pool.submit(self._insert, number, batch, progress)
+                        for number, batch in enumerate(work[1:], start=1)
+                    ]
+                    for future in futures:
+                        failed += future.result()
+        seconds = time.monotonic() - progress.started
+        report = {
+            "table": self.table,
+            "files": len(files),
+            "batches": len(work),
+            "batch_size": self.batch_size,
+            "parallel": self.parallel,
+            "seconds": round(seconds, 1),
+            "files_per_sec": round(progress.rate(), 2),
+            "retries": self._retried,
+            "failed": failed,
+            "skipped_batches": skipped,
+        }
+        print(
+            f"Inserted {progress.done}/{len(files)} files in {report['seconds']}s "
+            f"({report['files_per_sec']} files/s, {self._retried} retries)"
+        )
+        return report
+
+    def command(self, files: Sequence[str], retry: bool = False) -> List[str]:
+        """Return the ice insert command for a batch. Retries skip files
+        that an earlier attempt may have committed before failing."""
+        ice_cfg_file = os.path.join(self.paths.tests_dir, self.config.ice_config)
+        args = list(self.extra_args)
+        if retry and "--skip-duplicates" not in args:
+            args.append("--skip-duplicates")
+        return (
+            [self.executable, "-c", ice_cfg_file, "insert", self.table, "-p"]
+            + args
+            + list(files)
+        )
+
+    def _insert(self, number: int, files: List[str], progress: Progress) -> list:
+        """Insert one batch, retrying commit conflicts. Returns a list with
+        a failure record, or an empty list on success."""
+        for attempt in range(self.retries + 1):
+            with span(
+                "ice_ingest.batch", "subprocess", batch=number, attempt=attempt
+            ) as attrs:
+                returncode, tail = stream_command(
+                    self.command(files, retry=attempt > 0), f"[batch {number}] "
+                )
+                attrs["returncode"] = returncode
+            if returncode == 0:
+                progress.add(len(files))
+                return []
+            output = "\n".join(tail)
+            if attempt == self.retries or not CONFLICT_PATTERN.search(output):
+                return [{"batch": number, "files": files, "error": output}]
+            with self._lock:
+                self._retried += 1
+            delay = self.backoff * 2**attempt * random.uniform(0.5, 1.5)
+            print(f"[batch {number}] Commit conflict, retrying in {delay:.1f}s")
+            time.sleep(delay)
+        return []
+
+
+def stream_command(command: List[str], prefix: str = "") -> tuple:
+    """Run a command and print its output line by line as it is written.
+    Returns the exit code and the last output lines."""
+    tail = deque(maxlen=TAIL_LINES)
+    try:
+        process = subprocess.Popen(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1,
+        )
+    except FileNotFoundError as e:
+        return 127, [str(e)]
+    with process:
+        for line in process.stdout:
+            line = line.rstrip("\n")
+            tail.append(line)
+            print(f"{prefix}{line}", flush=True)
+    return process.returncode, list(tail)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Parallel ice insert of many files",
+        epilog="Options after -- are passed to ice insert, e.g. -- --force-no-copy",
+    )
+    parser.add_argument("table", help="Iceberg table, e.g. nyc.taxis")
+    parser.add_argument(
+        "sources", nargs="+", help="Directories, globs, URIs or .txt/.json manifests"
+    )
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--parallel", type=int, default=4)
+    parser.add_argument("--retries", type=int, default=5)
+    parser.add_argument("--output", help="Write the report as JSON")
+    argv = sys.argv[1:]
+    extra_args = []
+    if "--" in argv:
+        split = argv.index("--")
+        argv, extra_args = argv[:split], argv[split + 1 :]
+    args = parser.parse_args(argv)
+
+    load_config()
+    ingest = IceIngest(
+        get_config(),
+        init_paths(),
+        None,
+        args.table,
+        batch_size=args.batch_size,
+        parallel=args.parallel,
+        retries=args.retries,
+        extra_args=extra_args,
+    )
+    report = ingest.insert(discover(args.sources))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote ingest report to {args.output}")
+    for failure in report["failed"]:
+        print(f"batch {failure['batch']} failed:\n{failure['error']}")
+    if report["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+# Copyright 2025
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+import json
+import random
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+from benchmark import (
+    DEFAULT_QUERIES,
+    SWARM_SETTINGS,
+    BenchmarkQuery,
+    percentile,
+    with_settings,
+)
+from config import TestConfig, get_config, init_paths, load_config
+from helpers import ClickHouseHelper, ClickHousePool
+from history import record_report
+
+# Upper bounds of latency histogram buckets in milliseconds.
+HISTOGRAM_BOUNDS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+# Adding load past the knee raises throughput by less than this fraction.
+KNEE_MIN_GAIN = 0.1
+
+
+@dataclass
+class WeightedQuery:
+    """A query in the load mix, picked with probability proportional to weight."""
+
+    query: BenchmarkQuery
+    weight: float
+
+
+DEFAULT_MIX = [
+    WeightedQuery(query, weight)
+    for query, weight in zip(DEFAULT_QUERIES, (4, 3, 2, 2, 1))
+]
+
+
+@dataclass
+class Sample:
+    """Outcome of one request."""
+
+    name: str
+    latency_ms: float
+    error: Optional[str] = None
+
+
+class HttpClient:
+    """Run queries over the HTTP interface with the keep-alive sessions of
+    a ClickHouseHelper, one per thread."""
+
+    def __init__(self, config: TestConfig):
+        self.helper = ClickHouseHelper(config, init_paths())
+
+    def execute(self, sql: str):
+        self.helper.query_http(sql)
+
+    def close(self):
+        self.helper.close()
+
+
+class NativeClient:
+    """Run queries over the native protocol with one pooled client per worker."""
+
+    def __init__(self, config: TestConfig, size: int):
+        self.pool = ClickHousePool(config, size=size, timeout=300)
+
+    def execute(self, sql: str):
+        with self.pool.connection() as client:
+            client.execute(sql, query_id=str(uuid.uuid4()))
+
+    def close(self):
+        self.pool.close()
+
+
+def histogram(latencies: Sequence[float]) -> dict:
+    """Count latencies per bucket, keyed by the bucket upper bound."""
+    counts = {f"<={bound}ms": 0 for bound in HISTOGRAM_BOUNDS_MS}
+    counts[f">{HISTOGRAM_BOUNDS_MS[-1]}ms"] = 0
+    for latency in latencies:
+        for bound in HISTOGRAM_BOUNDS_MS:
+            if latency <= bound:
+                counts[f"<={bound}ms"] += 1
+                break
+        else:
+            counts[f">{HISTOGRAM_BOUNDS_MS[-1]}ms"] += 1
+    return counts
+
+
+def find_knee(results: List[dict], min_gain: float = KNEE_MIN_GAIN) -> Optional[int]:
+    """Return the load level after which throughput grows by less than
+    min_gain, or falls short of the target QPS by more than min_gain, i.e.
+    where the server saturates. Results are ordered by level."""
+    for previous, current in zip(results, results[1:]):
+        target = current.get("target_qps")
+        if target and current["throughput_qps"] < target * (1 - min_gain):
+            return previous["level"]
+        if current["throughput_qps"] < previous["throughput_qps"] * (1 + min_gain):
+            return previous["level"]
+    return None
+
+
+class LoadGenerator:
+    """Replay a weighted query mix against the vector server from many
+    threads, alone or with the swarm, over HTTP or the native protocol.
+
+    With qps unset, each of the concurrency workers sends its next query as
+    soon as the last one returns (closed loop). With qps set, queries are
+    started on a fixed schedule by up to concurrency workers, and latency
+    counts from the scheduled start, so queueing on a saturated server
+    shows up in the results (open loop).
+    """
+
+    def __init__(
+        self, config: TestConfig, mix: List[WeightedQuery] = DEFAULT_MIX, seed=0
+    ):
+        """Initialize the generator with a query mix and random seed."""
+        self.config = config
+        self.mix = mix
+        self.seed = seed
+
+    def run(
+        self,
+        protocol: str,
+        mode: str,
+        concurrency: int,
+        duration: float,
+        qps: Optional[float] = None,
+    ) -> dict:
+        """Generate load for duration seconds and summarize the samples."""
+        client = (
+            HttpClient(self.config)
+            if protocol == "http"
+            else NativeClient(self.config, concurrency)
+        )
+        rng = random.Random(self.seed)
+        weights = [q.weight for q in self.mix]
+        sql = {
+            q.query.name: (
+                with_settings(q.query.sql, SWARM_SETTINGS)
+                if mode == "swarm"
+                else q.query.sql
+            )
+            for q in self.mix
+        }
+
+        def request(query: BenchmarkQuery, start: float) -> Sample:
+            try:
+                client.execute(sql[query.name])
+                error = None
+            except Exception as e:
+                error = str(e).splitlines()[0] if str(e) else type(e).__name__
+            return Sample(query.name, (time.perf_counter() - start) * 1000, error)
+
+        def worker(worker_id: int) -> List[Sample]:
+            worker_rng = random.Random(self.seed + worker_id)
+            samples = []
+            while time.perf_counter() < deadline:
+                query = worker_rng.choices(self.mix, weights)[0].query
+                samples.append(request(query, time.perf_counter()))
+            return samples
+
+        started = time.perf_counter()
+        deadline = started + duration
+        try:
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                if qps is None:
+                    futures = [pool.submit(worker, i) for i in range(concurrency)]
+                    samples = [s for f in futures for s in f.result()]
+                else:
+                    futures = []
+                    scheduled = started
+                    while scheduled < deadline:
+                        time.sleep(max(0.0, scheduled - time.perf_counter()))
+                        query = rng.choices(self.mix, weights)[0].query
+                        futures.append(pool.submit(request, query, scheduled))
+                        scheduled += 1 / qps
+                    samples = [f.result() for f in futures]
+        finally:
+            client.close()
+        elapsed = time.perf_counter() - started
+        return self._summarize(
+            samples, elapsed, protocol, mode, concurrency, qps, duration
+        )
+
+    def sweep(
+        self,
+        protocols: Sequence[str] = ("http", "native"),
+        modes: Sequence[str] = ("vector", "swarm"),
+        levels: Sequence[int] = (1, 2, 4, 8, 16, 32, 50),
+        duration: float = 30,
+        open_loop: bool = False,
+        concurrency: int = 50,
+    ) -> dict:
+        """Run each protocol and mode at increasing load levels and find the
+        saturation knee. Levels are worker counts, or target QPS with up to
+        concurrency workers if open_loop is set."""
+        results = []
+        knees = {}
+        for protocol in protocols:
+            for mode in modes:
+                runs = []
+                for level in levels:
+                    if open_loop:
+                        run = self.run(protocol, mode, concurrency, duration, level)
+                    else:
+                        run = self.run(protocol, mode, level, duration)
+                    run["level"] = level
+                    runs.append(run)
+                results.extend(runs)
+                key = f"{protocol}/{mode}"
+                knees[key] = find_knee(runs)
+                print(f"{key} saturates at level {knees[key]}")
+        return {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "duration": duration,
+            "open_loop": open_loop,
+            "mix": {q.query.name: q.weight for q in self.mix},
+            "results": results,
+            "knees": knees,
+        }
+
+    def _summarize(
+        self,
+        samples: List[Sample],
+        elapsed: float,
+        protocol: str,
+        mode: str,
+        concurrency: int,
+        qps: Optional[float],
+        duration: float,
+    ) -> dict:
+        """Return throughput, error rate and latency percentiles of a run."""
+        ok = [s.latency_ms for s in samples if s.error is None]
+        errors = [s for s in samples if s.error is not None]
+        summary = {
+            "protocol": protocol,
+            "mode": mode,
+            "concurrency": concurrency,
+            "target_qps": qps,
+            "requests": len(samples),
+            "errors": len(errors),
+            "error_rate": round(len(errors) / len(samples), 4) if samples else None,
+            "throughput_qps": round(len(ok) / elapsed, 2),
+            "p50_ms": percentile(ok, 50),
+            "p95_ms": percentile(ok, 95),
+            "p99_ms": percentile(ok, 99),
+            "max_ms": max(ok) if ok else None,
+            "histogram": histogram(ok),
+            "error_samples": sorted({s.error for s in errors})[:5],
+            "overrun_s": round(max(0.0, elapsed - duration), 2),
+        }
+        for key in ("p50_ms", "p95_ms", "p99_ms", "max_ms"):
+            if summary[key] is not None:
+                summary[key] = round(summary[key], 1)
+        print(
+            f"{protocol}/{mode} c={concurrency}"
+            + (f" qps={qps}" if qps else "")
+            + f": {summary['throughput_qps']} qps, p50={summary['p50_ms']}ms "
+            f"p95={summary['p95_ms']}ms p99={summary['p99_ms']}ms, "
+            f"{len(errors)} errors"
+        )
+        return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent query load generator")
+    parser.add_argument("--protocols", default="http,native")
+    parser.add_argument("--modes", default="vector,swarm")
+    parser.add_argument("--levels", default="1,2,4,8,16,32,50")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds per level")
+    parser.add_argument(
+        "--qps", action="store_true", help="Treat levels as target QPS (open loop)"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=50, help="Workers in open loop mode"
+    )
+    parser.add_argument("--output", default="load.json")
+    parser.add_argument(
+        "--no-history", action="store_true", help="Do not record in the history"
+    )
+    args = parser.parse_args()
+
+    load_config()
+    generator = LoadGenerator(get_config())
+    report = generator.sweep(
+        protocols=args.protocols.split(","),
+        modes=args.modes.split(","),
+        levels=[int(level) for level in args.levels.split(",")],
+        duration=args.duration,
+        open_loop=args.qps,
+        concurrency=args.concurrency,
+    )
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote load results to {args.output}")
+    if not args.no_history:
+        helper = ClickHouseHelper(get_config(), init_paths())
+        try:
+            record_report("load", report, helper, None)
+        finally:
+            helper.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+# Copyright 2025
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+import requests
+
+from config import TestConfig
+
+
+@dataclass
+class Probe:
+    """A named readiness check. The check returns True when the service is
+    ready and may raise while it is still starting."""
+
+    name: str
+    check: Callable[[], bool]
+
+
+@dataclass
+class ProbeResult:
+    """Outcome of waiting for one probe."""
+
+    name: str
+    ready: bool
+    seconds: float
+    attempts: int
+    error: Optional[str] = None
+
+
+def wait_for(
+    probe: Probe,
+    timeout: float,
+    initial_delay: float = 0.1,
+    max_delay: float = 5.0,
+) -> ProbeResult:
+    """Poll a probe with exponential backoff until it succeeds or times out."""
+    start = time.monotonic()
+    deadline = start + timeout
+    delay = initial_delay
+    attempts = 0
+    error = None
+    while True:
+        attempts += 1
+        try:
+            if probe.check():
+                return ProbeResult(probe.name, True, time.monotonic() - start, attempts)
+            error = "not ready"
+        except Exception as e:
+            error = str(e)
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return ProbeResult(
+                probe.name, False, time.monotonic() - start, attempts, error
+            )
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, max_delay)
+
+
+def wait_until_ready(probes: List[Probe], timeout: float) -> List[ProbeResult]:
+    """Wait for all probes concurrently, so the total wait is that of the
+    slowest service, and print a readiness timing report."""
+    with ThreadPoolExecutor(max_workers=max(1, len(probes))) as executor:
+        results = list(executor.map(lambda p: wait_for(p, timeout), probes))
+    print("Service readiness:")
+    for result in results:
+        status = "ready" if result.ready else f"NOT READY ({result.error})"
+        print(
+            f"  {result.name:<16} {status} after {result.seconds:.2f}s "
+            f"({result.attempts} attempts)"
+        )
+    return results
+
+
+def _http_ok(url: str, headers: Optional[dict] = None, expected: str = None):
+    response = requests.get(url, headers=headers, timeout=5)
+    response.raise_for_status()
+    return expected is None or response.text.strip() == expected
+
+
+def _clickhouse_value(config: TestConfig, sql: str) -> str:
+    """Run a query over the ClickHouse HTTP interface and return its text."""
+    response = requests.get(
+        f"http://{config.ch_host}:{config.ch_http_port}/",
+        params={"query": sql},
+        headers={
+            "X-ClickHouse-User": config.ch_user,
+            "X-ClickHouse-Key": config.ch_password,
+        },
+        timeout=5,
+    )
+    response.raise_for_status()
+    return response.text.strip()
+
+
+def _keeper_ok(host: str, port: int) -> bool:
+    """Send the Keeper four-letter 'ruok' command, which answers 'imok'."""
+    with socket.create_connection((host, port), timeout=5) as sock:
+        sock.sendall(b"ruok")
+        return sock.recv(16) == b"imok"
+
+
+def default_probes(config: TestConfig) -> List[Probe]:
+    """Return probes for the services in the test profile. Services without
+    an address in the profile are skipped."""
+    name, _, value = config.ice_setting_auth_header.partition(":")
+    ice_headers = {name.strip(): value.strip()}
+    probes = [
+        Probe(
+            "clickhouse",
+            lambda: _http_ok(
+                f"http://{config.ch_host}:{config.ch_http_port}/ping", expected="Ok."
+            ),
+        ),
+        Probe(
+            "ice-rest-catalog",
+            lambda: _http_ok(
+                f"http://{config.ice_rest_host}:{config.ice_rest_port}/v1/namespaces",
+                headers=ice_headers,
+            ),
+        ),
+    ]
+    if config.minio_health_url:
+        probes.append(Probe("minio", lambda: _http_ok(config.minio_health_url)))
+    if config.keeper_host:
+        probes.append(
+            Probe("keeper", lambda: _keeper_ok(config.keeper_host, config.keeper_port))
+        )
+    if config.swarm_nodes:
+        # Swarm nodes register under /clickhouse/discovery/swarm in Keeper,
+        # and the vector server lists them in system.clusters once discovered.
+        sql = "SELECT count() FROM system.clusters WHERE cluster = 'swarm'"
+        probes.append(
+            Probe(
+                "swarm",
+                lambda: int(_clickhouse_value(config, sql)) >= config.swarm_nodes,
+            )
+        )
+    return probes
@@ -6,6 +6,7 @@ set -e
 # Parse command line arguments
 MANAGE_DOCKER=false
 TEST_PROFILE="docker"
+TEST_PARALLEL=1
 for arg in "$@"; do
     case $arg in
         --manage-docker)
@@ -16,11 +17,16 @@ for arg in "$@"; do
             TEST_PROFILE="${arg#*=}"
             shift
             ;;
+        --parallel=*)
+            TEST_PARALLEL="${arg#*=}"
+            shift
+            ;;
         *)
             # Unknown option
-            echo "Usage: $0 [--manage-docker] [--profile=docker|kubernetes]"
+            echo "Usage: $0 [--manage-docker] [--profile=docker|kubernetes] [--parallel=N]"
             echo "  --manage-docker  Start/stop Docker Compose services (default: use existing setup)"
             echo "  --profile        Test profile to use (default: docker)"
+            echo "  --parallel       Number of tests to run concurrently (default: 1)"
             exit 1
             ;;
     esac
@@ -47,6 +53,7 @@ pip install -r test-requirements.txt
 
 # Set environment variables
 export TEST_PROFILE
+export TEST_PARALLEL
 if $MANAGE_DOCKER; then
     export MANAGE_DOCKER=true
 fi
@@ -0,0 +1,103 @@
+# Copyright 2025
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import sys
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+
+def serial(test_method):
+    """Mark a test to run alone, after the concurrent tests of its class,
+    e.g. because it clears server caches or measures latency."""
+    test_method.serial = True
+    return test_method
+
+
+def _is_serial(test) -> bool:
+    return getattr(getattr(test, test._testMethodName, None), "serial", False)
+
+
+def _flatten(suite):
+    """Yield individual test cases from a nested test suite."""
+    for test in suite:
+        if isinstance(test, unittest.TestSuite):
+            yield from _flatten(test)
+        else:
+            yield test
+
+
+def _run_one(test) -> unittest.TestResult:
+    """Run a single test into its own result object."""
+    result = unittest.TestResult()
+    start = time.perf_counter()
+    test.run(result)
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def _status(result: unittest.TestResult) -> str:
+    if result.errors:
+        return "ERROR"
+    if result.failures:
+        return "FAIL"
+    if result.skipped:
+        return f"skipped {result.skipped[0][1]!r}"
+    return "ok"
+
+
+def _add(total: unittest.TestResult, test, result: unittest.TestResult):
+    """Print the outcome of a test and add it to the total."""
+    print(f"{test.id()} ... {_status(result)} ({result.seconds:.1f}s)")
+    total.errors.extend(result.errors)
+    total.failures.extend(result.failures)
+    total.skipped.extend(result.skipped)
+    total.testsRun += result.testsRun
+
+
+def run_parallel(suite, workers: int) -> unittest.TestResult:
+    """Run tests concurrently on a thread pool. Class fixtures run once per
+    test class before its tests start and after they all finish. Tests
+    marked with @serial run one at a time after the others."""
+    by_class = {}
+    for test in _flatten(suite):
+        by_class.setdefault(type(test), []).append(test)
+
+    total = unittest.TestResult()
+    start = time.perf_counter()
+    for cls, tests in by_class.items():
+        try:
+            cls.setUpClass()
+        except Exception:
+            for test in tests:
+                total.addError(test, sys.exc_info())
+            continue
+        try:
+            concurrent = [t for t in tests if not _is_serial(t)]
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for test, result in zip(concurrent, executor.map(_run_one, concurrent)):
+                    _add(total, test, result)
+            for test in tests:
+                if _is_serial(test):
+                    _add(total, test, _run_one(test))
+        finally:
+            cls.tearDownClass()
+
+    for kind, problems in (("ERROR", total.errors), ("FAIL", total.failures)):
+        for test, trace in problems:
+            print(f"\n{'=' * 70}\n{kind}: {test.id()}\n{'-' * 70}\n{trace}")
+    elapsed = time.perf_counter() - start
+    print(f"\nRan {total.testsRun} tests with {workers} workers in {elapsed:.1f}s")
+    print("OK" if total.wasSuccessful() else "FAILED")
+    return total
@@ -0,0 +1,307 @@
+# Copyright 2025
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+import copy
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from typing import List, Sequence
+
+import yaml
+
+from benchmark import DEFAULT_QUERIES, BenchmarkQuery, QueryBenchmark
+from config import TestConfig, TestPaths, get_config, init_paths, load_config
+from helpers import ClickHouseHelper, fail
+from history import record_report
+from readiness import Probe, wait_for
+from swarm_monitor import SWARM_CLUSTER
+
+DEFAULT_SIZES = (1, 2, 4, 8)
+
+# Swarm nodes defined in docker-compose.yml. Larger swarms add copies of
+# swarm-1 in a generated override file.
+COMPOSE_SWARM_NODES = 2
+
+# Adding nodes past this point improves the median latency by less than
+# this fraction per step.
+MIN_STEP_GAIN = 0.1
+
+
+def swarm_service(template: dict, index: int) -> dict:
+    """Return a compose service for swarm node index, copied from the
+    definition of swarm-1 with its name and data directories changed.
+    Nodes join the swarm cluster through Keeper discovery."""
+    name = f"swarm-{index}"
+    service = copy.deepcopy(template)
+    service["container_name"] = name
+    service["hostname"] = name
+    # Host ports would collide with swarm-1.
+    service.pop("ports", None)
+    service["volumes"] = [
+        volume.replace("/swarm-1/", f"/{name}/") if isinstance(volume, str) else volume
+        for volume in service.get("volumes", [])
+    ]
+    return service
+
+
+def write_override(path: str, nodes: int, compose_file: str):
+    """Write a compose override that adds swarm nodes beyond those in
+    compose_file, up to nodes in total."""
+    with open(compose_file) as f:
+        template = yaml.safe_load(f)["services"]["swarm-1"]
+    services = {
+        f"swarm-{i}": swarm_service(template, i)
+        for i in range(COMPOSE_SWARM_NODES + 1, nodes + 1)
+    }
+    with open(path, "w") as f:
+        yaml.safe_dump({"services": services}, f, sort_keys=False)
+
+
+def scaling_curve(results: List[dict], min_gain: float = MIN_STEP_GAIN) -> dict:
+    """Compute speedup and efficiency per swarm size from query results.
+
+    Speedup of size N is the median latency at the smallest size divided by
+    that at N, and efficiency is speedup over the growth in nodes, so 1.0
+    means perfectly linear scaling. Per-size figures are geometric means
+    over queries. The knee is the last size at which adding nodes still cut
+    the latency by at least min_gain.
+    """
+    sizes = sorted({r["nodes"] for r in results})
+    base = sizes[0]
+    p50 = {(r["name"], r["nodes"]): r["warm_p50_ms"] for r in results}
+    names = sorted({r["name"] for r in results})
+    curve = []
+    for nodes in sizes:
+        speedups = [
+            p50[(name, base)] / p50[(name, nodes)]
+            for name in names
+            if p50.get((name, base)) and p50.get((name, nodes))
+        ]
+        speedup = _geometric_mean(speedups)
+        curve.append(
+            {
+                "nodes": nodes,
+                "speedup": round(speedup, 2) if speedup else None,
+                "efficiency": round(speedup / (nodes / base), 2) if speedup else None,
+                "per_query": {
+                    name: round(p50[(name, base)] / p50[(name, nodes)], 2)
+                    for name in names
+                    if p50.get((name, base)) and p50.get((name, nodes))
+                },
+            }
+        )
+    knee = None
+    for previous, current in zip(curve, curve[1:]):
+        if not previous["speedup"] or not current["speedup"]:
+            continue
+        if current["speedup"] < previous["speedup"] * (1 + min_gain):
+            knee = previous["nodes"]
+            break
+    return {"curve": curve, "knee": knee}
+
+
+def _geometric_mean(values: Sequence[float]):
+    if not values:
+        return None
+    product = 1.0
+    for value in values:
+        product *= value
+    return product ** (1 / len(values))
+
+
+class ScaleOutRunner:
+    """Run a fixed query set on the local docker compose stack with the
+    swarm scaled to each size in turn, and report the scaling curve."""
+
+    def __init__(
+        self,
+        config: TestConfig,
+        paths: TestPaths,
+        clickhouse_helper: ClickHouseHelper,
+        test_case,
+        sizes: Sequence[int] = DEFAULT_SIZES,
+        repeats: int = 3,
+        timeout: float = 180,
+    ):
+        """Initialize the runner. timeout bounds the wait for each size."""
+        self.config = config
+        self.paths = paths
+        self.clickhouse_helper = clickhouse_helper
+        self.test_case = test_case
+        self.sizes = sorted(sizes)
+        self.repeats = repeats
+        self.timeout = timeout
+        self.total_nodes = max(max(self.sizes), COMPOSE_SWARM_NODES)
+        self.override = None
+
+    def run(self, queries: List[BenchmarkQuery] = DEFAULT_QUERIES) -> dict:
+        """Scale to every size, run the queries and return a report. The
+        swarm is restored to the nodes in docker-compose.yml afterwards and
+        the generated compose override is deleted."""
+        benchmark = QueryBenchmark(
+            self.clickhouse_helper, self.test_case, self.repeats, cold_runs=0
+        )
+        results = []
+        scale_seconds = {}
+        with tempfile.TemporaryDirectory() as override_dir:
+            self.override = os.path.join(override_dir, "docker-compose.swarm.yml")
+            write_override(
+                self.override,
+                self.total_nodes,
+                os.path.join(self.paths.docker_dir, "docker-compose.yml"),
+            )
+            try:
+                for nodes in self.sizes:
+                    scale_seconds[nodes] = round(self.scale(nodes), 1)
+                    for result in benchmark.run(queries, modes=("swarm",))["results"]:
+                        result.pop("runs")
+                        results.append({**result, "nodes": nodes})
+            finally:
+                self.restore()
+        report = {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "repeats": self.repeats,
+            "scale_seconds": scale_seconds,
+            "results": results,
+            **scaling_curve(results),
+        }
+        for point in report["curve"]:
+            print(
+                f"{point['nodes']} nodes: speedup {point['speedup']}, "
+                f"efficiency {point['efficiency']}"
+            )
+        print(f"Adding nodes stops paying off after {report['knee']} nodes")
+        return report
+
+    def scale(self, nodes: int) -> float:
+        """Start swarm nodes 1..nodes, stop the others and wait until exactly
+        nodes are listed in system.clusters. Returns the seconds taken."""
+        start = time.monotonic()
+        running = [f"swarm-{i}" for i in range(1, nodes + 1)]
+        stopped = [f"swarm-{i}" for i in range(nodes + 1, self.total_nodes + 1)]
+        print(f"Scaling swarm to {nodes} nodes")
+        self._compose(["up", "-d"] + running)
+        if stopped:
+            self._compose(["stop"] + stopped)
+        # Stopped nodes drop out of discovery when their Keeper session
+        # expires, which can take longer than new nodes take to join.
+        result = wait_for(
+            Probe(f"swarm={nodes}", lambda: self._swarm_size() == nodes),
+            self.timeout,
+        )
+        if not result.ready:
+            fail(
+                self.test_case,
+                f"Swarm did not reach {nodes} nodes in {self.timeout}s: {result.error}",
+            )
+        return time.monotonic() - start
+
+    def restore(self):
+        """Return the swarm to the nodes defined in docker-compose.yml and
+        delete the data directories of the added nodes."""
+        extra = [
+            f"swarm-{i}" for i in range(COMPOSE_SWARM_NODES + 1, self.total_nodes + 1)
+        ]
+        base = [f"swarm-{i}" for i in range(1, COMPOSE_SWARM_NODES + 1)]
+        if extra:
+            self._compose(["rm", "--stop", "--force"] + extra)
+        self._compose(["up", "-d"] + base)
+        for name in extra:
+            data_dir = os.path.join(self.paths.docker_dir, "data", name)
+            try:
+                shutil.rmtree(data_dir)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"Could not remove {data_dir}: {e}")
+
+    def _swarm_size(self) -> int:
+        """Return the number of swarm nodes that are listed and answer."""
+        listed = self.clickhouse_helper.query(
+            self.test_case,
+            "SELECT count() AS n FROM system.clusters "
+            f"WHERE cluster = '{SWARM_CLUSTER}'",
+        )["n"]
+        answering = self.clickhouse_helper.query(
+            self.test_case,
+            f"SELECT count() AS n FROM clusterAllReplicas('{SWARM_CLUSTER}', "
+            "system.one)",
+        )["n"]
+        return listed if listed == answering else -1
+
+    def _compose(self, args: List[str]):
+        """Run docker compose with the override file in the docker directory."""
+        command = [
+            "docker",
+            "compose",
+            "-f",
+            "docker-compose.yml",
+            "-f",
+            self.override,
+        ] + args
+        result = subprocess.run(
+            command,
+            capture_output=True,
+            text=True,
+            cwd=self.paths.docker_dir,
+        )
+        if result.returncode != 0:
+            fail(
+                self.test_case,
+                f"Command {' '.join(command)} failed: {result.stderr.strip()}",
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Swarm scale-out experiment")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)))
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=180)
+    parser.add_argument("--output", default="scale_out.json")
+    parser.add_argument(
+        "--no-history", action="store_true", help="Do not record in the history"
+    )
+    args = parser.parse_args()
+
+    load_config()
+    config, paths = get_config(), init_paths()
+    if not config.use_docker:
+        parser.error("Scaling the swarm requires the docker profile")
+    helper = ClickHouseHelper(config, paths)
+    try:
+        runner = ScaleOutRunner(
+            config,
+            paths,
+            helper,
+            None,
+            sizes=[int(n) for n in args.sizes.split(",")],
+            repeats=args.repeats,
+            timeout=args.timeout,
+        )
+        report = runner.run()
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote scale-out results to {args.output}")
+        if not args.no_history:
+            record_report("scale_out", report, helper, runner.test_case)
+    finally:
+        helper.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+# Copyright 2025
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+import json
+import statistics
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import List
+
+from config import get_config, init_paths, load_config
+from helpers import ClickHouseHelper
+
+SWARM_CLUSTER = "swarm"
+STRAGGLER_FACTOR = 1.5
+# ProfileEvents counter of files read by object storage table functions
+# and engines, which is how work is split between swarm nodes.
+FILES_EVENT = "EngineFileLikeReadFiles"
+
+
+@dataclass
+class SwarmNode:
+    """A swarm node registered through cluster discovery."""
+
+    host_name: str
+    port: int
+    errors_count: int
+
+
+@dataclass
+class NodeStats:
+    """Sub-query work done by one swarm node for an initial query."""
+
+    node: str
+    sub_queries: int = 0
+    files: int = 0
+    read_rows: int = 0
+    read_bytes: int = 0
+    duration_ms: int = 0
+
+
+@dataclass
+class QueryDistribution:
+    """How the sub-queries of one initial query spread over the swarm."""
+
+    query_id: str
+    nodes: List[NodeStats]
+    bytes_skew: float = None
+    duration_skew: float = None
+    stragglers: List[str] = field(default_factory=list)
+
+    def __str__(self):
+        lines = [f"Query {self.query_id} on {len(self.nodes)} nodes:"]
+        for n in self.nodes:
+            lines.append(
+                f"  {n.node:<12} sub_queries={n.sub_queries} files={n.files} "
+                f"rows={n.read_rows} "
+                f"bytes={n.read_bytes} ms={n.duration_ms}"
+            )
+        lines.append(
+            f"  skew: bytes={self.bytes_skew} duration={self.duration_skew} "
+            f"stragglers={self.stragglers}"
+        )
+        return "\n".join(lines)
+
+
+def skew(values: List[float]) -> float:
+    """Return max over mean, where 1.0 means perfectly even work."""
+    mean = statistics.mean(values) if values else 0
+    return round(max(values) / mean, 2) if mean else None
+
+
+class SwarmMonitor:
+    """Report swarm membership and how sub-queries of a query are spread
+    over swarm nodes, using system tables read from every swarm replica."""
+
+    def __init__(self, clickhouse_helper: ClickHouseHelper, test_case):
+        """Initialize the monitor with a ClickHouse helper on the vector server."""
+        self.clickhouse_helper = clickhouse_helper
+        self.test_case = test_case
+
+    def _rows(self, sql: str) -> list:
+        return [
+            row
+            for block in self.clickhouse_helper.query_iter(self.test_case, sql)
+            for row in block
+        ]
+
+    def members(self) -> List[SwarmNode]:
+        """Return swarm nodes currently listed in system.clusters."""
+        sql = f"""
+        SELECT host_name, port, errors_count
+        FROM system.clusters
+        WHERE cluster = '{SWARM_CLUSTER}'
+        ORDER BY host_name
+        """
+        return [SwarmNode(*row) for row in self._rows(sql)]
+
+    def running(self, query_id: str) -> List[NodeStats]:
+        """Return per-node sub-queries of a running query from system.processes."""
+        sql = f"""
+        SELECT hostName() AS node, count(), sum(ProfileEvents['{FILES_EVENT}']),
+            sum(read_rows), sum(read_bytes), toUInt64(max(elapsed) * 1000)
+        FROM clusterAllReplicas('{SWARM_CLUSTER}', system.processes)
+        WHERE initial_query_id = '{query_id}' AND query_id != initial_query_id
+        GROUP BY node
+        ORDER BY node
+        """
+        return [NodeStats(*row) for row in self._rows(sql)]
+
+    def finished(self, query_id: str) -> List[NodeStats]:
+        """Return per-node finished sub-queries of a query from system.query_log."""
+        sql = f"""
+        SELECT hostName() AS node, count(), sum(ProfileEvents['{FILES_EVENT}']),
+            sum(read_rows), sum(read_bytes), max(query_duration_ms)
+        FROM clusterAllReplicas('{SWARM_CLUSTER}', system.query_log)
+        WHERE initial_query_id = '{query_id}' AND is_initial_query = 0
+            AND type = 'QueryFinish'
+        GROUP BY node
+        ORDER BY node
+        """
+        return [NodeStats(*row) for row in self._rows(sql)]
+
+    def distribution(
+        self, query_id: str, timeout: float = 30.0, interval: float = 1.0
+    ) -> QueryDistribution:
+        """Return the distribution of a finished query. Swarm nodes flush
+        query_log on their own schedule, so this polls until the per-node
+        sub-query counts stop changing or the timeout expires."""
+        self.clickhouse_helper.ddl(
+            self.test_case,
+            f"SYSTEM FLUSH LOGS ON CLUSTER {SWARM_CLUSTER}",
+            ignore_errors=True,
+        )
+        deadline = time.monotonic() + timeout
+        nodes, previous = [], None
+        while time.monotonic() < deadline:
+            nodes = self.finished(query_id)
+            counts = [(n.node, n.sub_queries) for n in nodes]
+            if nodes and counts == previous:
+                break
+            previous = counts
+            time.sleep(interval)
+        return self._summarize(query_id, nodes)
+
+    def watch(self, query_id: str, done: threading.Event, interval: float = 0.5):
+        """Print per-node progress of a running query until done is set."""
+        while not done.wait(interval):
+            for n in self.running(query_id):
+                print(
+                    f"[{query_id[:8]}] {n.node}: files={n.files} "
+                    f"bytes={n.read_bytes} elapsed_ms={n.duration_ms}"
+                )
+
+    def run_and_measure(self, sql: str, watch: bool = False) -> QueryDistribution:
+        """Run a query on the swarm and return its distribution."""
+        query_id = str(uuid.uuid4())
+        done = threading.Event()
+        watcher = None
+        errors = []
+
+        def watch_progress():
+            # A failure in this thread, e.g. test_case.fail, would be lost.
+            try:
+                self.watch(query_id, done)
+            except BaseException as e:
+                errors.append(e)
+
+        if watch:
+            watcher = threading.Thread(target=watch_progress)
+            watcher.start()
+        try:
+            self.clickhouse_helper.query(
+                self.test_case,
+                f"{sql} SETTINGS object_storage_cluster = '{SWARM_CLUSTER}'",
+                query_id=query_id,
+            )
+        finally:
+            done.set()
+            if watcher:
+                watcher.join()
+        if errors:
+            raise errors[0]
+        return self.distribution(query_id)
+
+    def _summarize(self, query_id: str, nodes: List[NodeStats]) -> QueryDistribution:
+        """Compute skew and stragglers from per-node stats."""
+        # Include members that received no work, since idle nodes are skew too.
+        seen = {n.node for n in nodes}
+        nodes = nodes + [
+            NodeStats(m.host_name) for m in self.members() if m.host_name not in seen
+        ]
+        result = QueryDistribution(query_id, sorted(nodes, key=lambda n: n.node))
+        if nodes:
+            durations = [n.duration_ms for n in nodes if n.sub_queries]
+            result.bytes_skew = skew([n.read_bytes for n in nodes])
+            result.duration_skew = skew(durations)
+            median = statistics.median(durations) if durations else 0
+            result.stragglers = [
+                n.node
+                for n in nodes
+                if n.sub_queries
+                and median
+                and n.duration_ms > STRAGGLER_FACTOR * median
+            ]
+        return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Swarm work distribution monitor")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--query-id", help="Report a query that already ran")
+    group.add_argument("--sql", help="Run a query on the swarm and report it")
+    parser.add_argument("--watch", action="store_true", help="Print live progress")
+    parser.add_argument("--output", help="Write the report as JSON")
+    args = parser.parse_args()
+
+    load_config()
+    helper = ClickHouseHelper(get_config(), init_paths())
+    try:
+        monitor = SwarmMonitor(helper, None)
+        print("Swarm members:")
+        for member in monitor.members():
+            print(f"  {member.host_name}:{member.port} errors={member.errors_count}")
+        if args.sql:
+            report = monitor.run_and_measure(args.sql, watch=args.watch)
+        else:
+            report = monitor.distribution(args.query_id)
+    finally:
+        helper.close()
+    print(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(asdict(report), f, indent=2)
+        print(f"Wrote swarm distribution to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,10 +12,39 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import gzip
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
 import unittest
 
-from config import init_paths, load_config
-from helpers import ClickHouseHelper, DockerHelper, OsHelper
+import yaml
+
+from arrow_benchmark import FetchBenchmark, default_sql
+from benchmark import DEFAULT_QUERIES, QueryBenchmark
+from cache_profiler import CACHE_EVENTS, CacheProfiler
+from config import get_config, init_paths, load_config
+from dataset_cache import DatasetCache
+from fixtures import taxi_table, unique_name
+from helpers import (
+    ClickHouseHelper,
+    ClickHousePool,
+    DockerHelper,
+    OsHelper,
+    merge_log_files,
+)
+from history import HistoryStore, measurements, record_report
+from ice_ingest import IceIngest, discover
+from load_generator import LoadGenerator
+from readiness import Probe, wait_for, wait_until_ready
+from runner import run_parallel, serial
+from scale_out import scaling_curve, write_override
+from swarm_monitor import SwarmMonitor
+from tracing import Tracer
 
 
 class AntalyaTestFramework(unittest.TestCase):
@@ -26,6 +55,7 @@ class AntalyaTestFramework(unittest.TestCase):
     os_helper: OsHelper = None
     profile_name: str = None
     config: str = None
+    test_seconds: list = []
 
     @classmethod
     def setUpClass(cls):
@@ -41,10 +71,38 @@ class AntalyaTestFramework(unittest.TestCase):
 
     @classmethod
     def tearDownClass(cls):
-        """Capture logs and stop Docker Compose services if we started them."""
+        """Record test timings, then capture logs and stop Docker Compose
+        services if we started them."""
+        if cls.test_seconds:
+            report = {
+                "results": [
+                    {"name": name, "seconds": seconds}
+                    for name, seconds in cls.test_seconds
+                ]
+            }
+            try:
+                record_report("tests", report, cls.clickhouse_helper, None)
+            except RuntimeError as e:
+                print(f"Test timings not recorded: {str(e).splitlines()[0]}")
+        cls.clickhouse_helper.close()
         if cls.docker_helper:
             cls.docker_helper.cleanup_services()
 
+    def setUp(self):
+        self._started = time.perf_counter()
+
+    def tearDown(self):
+        # Tests may run on several threads; list.append is atomic.
+        self.test_seconds.append(
+            (self._testMethodName, time.perf_counter() - self._started)
+        )
+
+    def temp_dir(self) -> str:
+        """Return a new directory that is deleted after the test."""
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        return root
+
     def test_ice_catalog_liveness(self):
         """Confirm ice catalog on 5000 can list namespaces."""
         self.os_helper.http_get(
@@ -69,8 +127,27 @@ class AntalyaTestFramework(unittest.TestCase):
         """Confirm that iceberg py scripts run without errors."""
         # FIXME: Scripts need to be fixed to run on Kubernetes as well as Docker"
         if self.config.use_docker:
-            self.os_helper.run_python_script(self, "iceberg_setup.py")
-            self.os_helper.run_python_script(self, "iceberg_read.py")
+            from iceberg_catalog import get_catalog
+            from pyiceberg.exceptions import NoSuchTableError
+
+            table = f"iceberg.{unique_name('bids')}"
+
+            def drop():
+                try:
+                    get_catalog().drop_table(table)
+                except NoSuchTableError:
+                    pass
+
+            self.addCleanup(drop)
+            self.os_helper.run_python_script(
+                self,
+                "iceberg_setup.py",
+                f"--table={table}",
+                f"--location=s3://warehouse/{table}",
+            )
+            self.os_helper.run_python_script(
+                self, "iceberg_read.py", f"--table={table}"
+            )
         else:
             print("FIXME: Test case skipped for non-docker environments")
 
@@ -82,59 +159,652 @@ class AntalyaTestFramework(unittest.TestCase):
         self.assertIsNotNone(version)
         print(f"ClickHouse version: {version}")
 
-    def test_ice_database_show_tables(self):
-        """Verify we can create an Ice catalog database and show tables."""
-        # Create a test Ice catalog database in ClickHouse, dropping it first.
-        catalog_created = self.clickhouse_helper.create_iceberg_rest_catalog(
-            self, "ice_test", True
+    def test_clickhouse_pooled_connections(self):
+        """Confirm concurrent queries share at most pool size connections."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        def select(i):
+            return self.clickhouse_helper.query(self, f"SELECT {i} AS n")["n"]
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(select, range(32)))
+        self.assertEqual(results, list(range(32)))
+        self.assertLessEqual(
+            self.clickhouse_helper.pool.open_connections,
+            self.clickhouse_helper.pool.size,
         )
-        self.clickhouse_helper.query(self, "show tables from ice_test")
 
-    def test_load_ice_and_select(self):
-        """Verify we can load a file to Ice catalog and read from ClickHouse."""
-        # Create a test Ice catalog database in ClickHouse, dropping it first.
-        catalog_created = self.clickhouse_helper.create_iceberg_rest_catalog(
-            self, "ice_test", True
+        # A query that fails on the server does not cost the connection.
+        from clickhouse_driver.errors import ServerException
+
+        pool = ClickHousePool(self.config, size=1)
+        self.addCleanup(pool.close)
+        with pool.connection() as first:
+            first.execute("SELECT 1")
+        with self.assertRaises(ServerException):
+            with pool.connection() as client:
+                client.execute("SELECT throwIf(1)")
+        with pool.connection() as client:
+            self.assertIs(client, first)
+            self.assertEqual(client.execute("SELECT 2"), [(2,)])
+
+    def test_clickhouse_streaming_and_columnar_results(self):
+        """Confirm large results can be streamed in blocks or read by column."""
+        sql = "SELECT number, toString(number) AS s FROM numbers(1000000)"
+        rows = 0
+        for block in self.clickhouse_helper.query_iter(self, sql, block_rows=65536):
+            self.assertLessEqual(len(block), 65536)
+            rows += len(block)
+        self.assertEqual(rows, 1000000)
+
+        columns = self.clickhouse_helper.query_columns(self, sql)
+        self.assertEqual(len(columns["number"]), 1000000)
+        self.assertEqual(int(columns["number"].sum()), 999999 * 1000000 // 2)
+
+        table = self.clickhouse_helper.query_columns(self, sql, arrow=True)
+        self.assertEqual(table.num_rows, 1000000)
+        self.assertEqual(table.column_names, ["number", "s"])
+
+    def test_clickhouse_arrow_results(self):
+        """Confirm Arrow results over HTTP match columnar native results."""
+        sql = "SELECT number AS n, toString(number) AS s FROM numbers(100000)"
+        columns = self.clickhouse_helper.query_columns(self, sql)
+        for fmt in ("ArrowStream", "Parquet"):
+            table = self.clickhouse_helper.query_arrow(self, sql, fmt=fmt)
+            self.assertEqual(table.column_names, ["n", "s"])
+            self.assertEqual(table.column("n").to_pylist(), list(columns["n"]))
+            self.assertEqual(table.column("s").to_pylist(), list(columns["s"]))
+        batches = list(
+            self.clickhouse_helper.query_arrow_batches(self, sql, http_compression=True)
         )
-        assert catalog_created
+        self.assertEqual(sum(b.num_rows for b in batches), 100000)
 
-        # Remove test table if it existed.
-        self.os_helper.run_ice_command(
-            self,
-            ice_command=[
-                "delete-table",
-                "--purge",
-                "nyc.taxis_test",
-            ],
-            ignore_returncode=True,
+        # An error after the first blocks were sent must not look like a
+        # short result.
+        failing = (
+            "SELECT number, throwIf(number >= 900000, 'late error') AS e "
+            "FROM numbers(1000000) SETTINGS max_block_size = 1000"
+        )
+        with self.assertRaises(AssertionError) as raised:
+            list(self.clickhouse_helper.query_arrow_batches(self, failing))
+        self.assertIn("late error", str(raised.exception))
+        self.assertGreater(self.clickhouse_helper.query_http(sql), 0)
+        with self.assertRaisesRegex(RuntimeError, "late error"):
+            self.clickhouse_helper.query_http(failing)
+
+        report = FetchBenchmark(self.clickhouse_helper, self).run(default_sql(200000))
+        for result in report["results"]:
+            self.assertEqual(result["rows"], 200000)
+
+    def test_concurrent_scan_reader(self):
+        """Confirm concurrent streaming scans from MinIO keep file order at
+        every concurrency level, even with a byte ceiling below one batch."""
+        if not self.config.use_docker:
+            print("FIXME: Test case skipped for non-docker environments")
+            return
+        import pyarrow as pa
+        from iceberg_catalog import get_catalog
+        from scan_reader import stream_batches
+
+        catalog = get_catalog()
+        catalog.create_namespace_if_not_exists("iceberg")
+        name = f"iceberg.{unique_name('scan')}"
+        schema = pa.schema([("n", pa.int64())])
+        table = catalog.create_table(
+            name, schema=schema, location=f"s3://warehouse/{name}"
+        )
+        self.addCleanup(catalog.drop_table, name)
+        for i in range(16):
+            table.append(pa.table({"n": range(i * 10000, (i + 1) * 10000)}))
+
+        expected = None
+        for concurrency in (1, 8, 32):
+            for max_buffered_bytes in (1, 64 << 20):
+                values = []
+                for batch in stream_batches(
+                    table.scan(),
+                    prefetch_files=concurrency,
+                    max_buffered_bytes=max_buffered_bytes,
+                    concurrency=concurrency,
+                ):
+                    values.extend(batch.column("n").to_pylist())
+                expected = expected or values
+                self.assertEqual(values, expected)
+        self.assertEqual(sorted(expected), list(range(160000)))
+
+    def test_catalog_table_cache(self):
+        """Confirm cached tables are private copies and see commits made
+        through any of them."""
+        if not self.config.use_docker:
+            print("FIXME: Test case skipped for non-docker environments")
+            return
+        import pyarrow as pa
+        from iceberg_catalog import get_catalog
+
+        catalog = get_catalog(ttl_seconds=60)
+        catalog.create_namespace_if_not_exists("iceberg")
+        name = f"iceberg.{unique_name('cache')}"
+        schema = pa.schema([("n", pa.int64())])
+        catalog.create_table(name, schema=schema, location=f"s3://warehouse/{name}")
+        self.addCleanup(catalog.drop_table, name)
+
+        first, second = catalog.load_table(name), catalog.load_table(name)
+        self.assertIsNot(first, second)
+        first.append(pa.table({"n": [1, 2]}))
+        self.assertIsNone(second.current_snapshot())
+        self.assertEqual(
+            catalog.load_table(name).current_snapshot().snapshot_id,
+            first.current_snapshot().snapshot_id,
+        )
+        self.assertGreater(catalog.hits, 0)
+
+    def test_compact_and_expire(self):
+        """Confirm compaction keeps the rows, and expiring snapshots deletes
+        the rewritten files from MinIO but keeps every referenced file."""
+        if not self.config.use_docker:
+            print("FIXME: Test case skipped for non-docker environments")
+            return
+        import pyarrow as pa
+        from iceberg_catalog import get_catalog
+        from iceberg_compact import Compactor, expire_snapshots
+
+        catalog = get_catalog()
+        catalog.create_namespace_if_not_exists("iceberg")
+        name = f"iceberg.{unique_name('compact')}"
+        schema = pa.schema([("n", pa.int64())])
+        table = catalog.create_table(
+            name, schema=schema, location=f"s3://warehouse/{name}"
+        )
+        self.addCleanup(catalog.drop_table, name)
+        for i in range(12):
+            table.append(pa.table({"n": range(i * 1000, (i + 1) * 1000)}))
+        rewritten = {task.file.file_path for task in table.scan().plan_files()}
+
+        stats = Compactor(table).compact()
+        self.assertEqual(stats.files_removed, 12)
+        expired, deleted = expire_snapshots(table, retain_last=1, max_age_hours=0)
+        self.assertEqual(expired, 12)
+        self.assertGreaterEqual(deleted, len(rewritten))
+
+        self.assertEqual(table.scan().to_arrow().num_rows, 12000)
+        for snapshot in table.metadata.snapshots:
+            live = {snapshot.manifest_list}
+            live.update(m.manifest_path for m in snapshot.manifests(table.io))
+            live.update(
+                task.file.file_path
+                for task in table.scan(snapshot_id=snapshot.snapshot_id).plan_files()
+            )
+            for path in live:
+                self.assertTrue(table.io.new_input(path).exists(), path)
+        for path in rewritten:
+            self.assertFalse(table.io.new_input(path).exists(), path)
+
+    def test_datagen_tables(self):
+        """Confirm datagen loads a day-partitioned table in one snapshot with
+        each file sorted, and an unpartitioned table through BulkLoader."""
+        if not self.config.use_docker:
+            print("FIXME: Test case skipped for non-docker environments")
+            return
+        import dataclasses
+
+        import pyarrow.parquet as pq
+        from datagen import load_specs, setup_table
+        from iceberg_catalog import get_catalog
+
+        catalog = get_catalog()
+        specs = {spec.name: spec for spec in load_specs()}
+        name = f"iceberg.{unique_name('datagen')}"
+        spec = dataclasses.replace(
+            specs["iceberg.bids_large"],
+            name=name,
+            location=f"s3://warehouse/{name}",
+            rows=20000,
+            batch_rows=3000,
+        )
+        self.addCleanup(catalog.drop_table, name)
+        stats = setup_table(catalog, spec, workers=2)
+        self.assertEqual(stats.rows, 20000)
+        self.assertEqual(stats.commits, 1)
+
+        table = catalog.load_table(name)
+        self.assertEqual(len(table.metadata.snapshots), 1)
+        self.assertEqual(table.scan().to_arrow().num_rows, 20000)
+        tasks = list(table.scan().plan_files())
+        self.assertEqual(len({task.file.partition[0] for task in tasks}), len(tasks))
+        for task in tasks:
+            with table.io.new_input(task.file.file_path).open() as f:
+                symbols = pq.read_table(f, columns=["symbol"])["symbol"].to_pylist()
+            self.assertEqual(symbols, sorted(symbols), task.file.file_path)
+
+        name = f"iceberg.{unique_name('datagen')}"
+        spec = dataclasses.replace(
+            specs["iceberg.trades"],
+            name=name,
+            location=f"s3://warehouse/{name}",
+            rows=5000,
+            partition=None,
+            sort_by=[],
+        )
+        self.addCleanup(catalog.drop_table, name)
+        stats = setup_table(catalog, spec)
+        self.assertEqual(stats.rows, 5000)
+        table = catalog.load_table(name)
+        self.assertEqual(table.scan().to_arrow().num_rows, 5000)
+
+    def test_plan_index_refresh(self):
+        """Confirm the plan index matches table.scan() after appends, an
+        overwrite and compaction with snapshot expiry."""
+        if not self.config.use_docker:
+            print("FIXME: Test case skipped for non-docker environments")
+            return
+        import datetime
+
+        import pyarrow as pa
+        from iceberg_catalog import get_catalog
+        from iceberg_compact import Compactor, expire_snapshots
+        from plan_index import PlanIndex
+        from pyiceberg.expressions import (
+            And,
+            EqualTo,
+            GreaterThanOrEqual,
+            LessThan,
+        )
+        from pyiceberg.transforms import DayTransform
+
+        catalog = get_catalog()
+        catalog.create_namespace_if_not_exists("iceberg")
+        name = f"iceberg.{unique_name('plan')}"
+        schema = pa.schema(
+            [
+                ("datetime", pa.timestamp("us")),
+                ("symbol", pa.string()),
+                ("bid", pa.float64()),
+            ]
+        )
+        table = catalog.create_table(
+            name, schema=schema, location=f"s3://warehouse/{name}"
+        )
+        self.addCleanup(catalog.drop_table, name)
+        with table.update_spec() as spec:
+            spec.add_field("datetime", DayTransform(), "datetime_day")
+
+        start = datetime.datetime(2019, 8, 7)
+
+        def append(i):
+            symbols = ["AAPL", "MSFT"] if i % 2 == 0 else ["GOOG", "TSLA"]
+            times = [
+                start + datetime.timedelta(days=i % 3, minutes=m) for m in range(10)
+            ]
+            table.append(
+                pa.table(
+                    {
+                        "datetime": times,
+                        "symbol": [symbols[m % 2] for m in range(10)],
+                        "bid": [float(i * 10 + m) for m in range(10)],
+                    },
+                    schema=schema,
+                )
+            )
+
+        index = PlanIndex.for_table(table, self.temp_dir())
+        self.addCleanup(index.close)
+        filters = [
+            And(
+                GreaterThanOrEqual("datetime", "2019-08-08T00:00:00"),
+                LessThan("datetime", "2019-08-09T00:00:00"),
+            ),
+            EqualTo("symbol", "AAPL"),
+        ]
+
+        def check_plan():
+            for row_filter in filters:
+                expected = table.scan(row_filter=row_filter).plan_files()
+                planned = index.plan_files(table, row_filter)
+                self.assertTrue(planned)
+                self.assertEqual(
+                    {t.file.file_path for t in planned},
+                    {t.file.file_path for t in expected},
+                )
+
+        for i in range(6):
+            append(i)
+        self.assertTrue(index.refresh(table).full_rebuild)
+        check_plan()
+
+        # Rewrites the files with GOOG rows, so the new manifests hold
+        # DELETED and EXISTING entries.
+        replacement = pa.table(
+            {"datetime": [start], "symbol": ["GOOG"], "bid": [1.0]}, schema=schema
+        )
+        table.overwrite(replacement, overwrite_filter=EqualTo("symbol", "GOOG"))
+        stats = index.refresh(table)
+        self.assertFalse(stats.full_rebuild)
+        self.assertGreater(stats.files_removed, 0)
+        check_plan()
+
+        for i in range(6, 8):
+            append(i)
+        self.assertFalse(index.refresh(table).full_rebuild)
+        check_plan()
+
+        # The indexed snapshot is expired, so the index is rebuilt.
+        Compactor(table).compact()
+        expire_snapshots(table, retain_last=1, max_age_hours=0)
+        self.assertTrue(index.refresh(table).full_rebuild)
+        check_plan()
+
+    def test_incremental_reader(self):
+        """Confirm consumers read only new appends, skip compaction, and
+        stop at overwrites, expired checkpoints and recreated tables."""
+        if not self.config.use_docker:
+            print("FIXME: Test case skipped for non-docker environments")
+            return
+        import pyarrow as pa
+        from iceberg_catalog import get_catalog
+        from iceberg_compact import Compactor, expire_snapshots
+        from incremental_reader import CheckpointStore, IncrementalReader
+        from pyiceberg.expressions import LessThan
+
+        catalog = get_catalog()
+        catalog.create_namespace_if_not_exists("iceberg")
+        name = f"iceberg.{unique_name('incremental')}"
+        schema = pa.schema([("n", pa.int64())])
+        table = catalog.create_table(
+            name, schema=schema, location=f"s3://warehouse/{name}"
+        )
+        self.addCleanup(catalog.drop_table, name)
+        store = CheckpointStore(os.path.join(self.temp_dir(), "checkpoints.sqlite"))
+        self.addCleanup(store.close)
+
+        def append(start, end):
+            table.append(pa.table({"n": range(start, end)}, schema=schema))
+
+        def read(reader):
+            values = [v for b in reader.read() for v in b.column("n").to_pylist()]
+            reader.commit()
+            return sorted(values)
+
+        loader = IncrementalReader(table, store, "loader", skip_overwrites=True)
+        stale = IncrementalReader(table, store, "stale")
+        append(0, 10)
+        self.assertEqual(read(loader), list(range(10)))
+        self.assertEqual(read(stale), list(range(10)))
+        append(10, 20)
+        self.assertEqual(read(loader), list(range(10, 20)))
+
+        self.assertEqual(Compactor(table).compact().files_removed, 2)
+        append(20, 30)
+        self.assertEqual(read(loader), list(range(20, 30)))
+
+        replacement = pa.table({"n": [100]}, schema=schema)
+        table.overwrite(replacement, overwrite_filter=LessThan("n", 5))
+        with self.assertRaisesRegex(ValueError, "not an append"):
+            loader.scan()
+
+        expire_snapshots(table, retain_last=1, max_age_hours=0)
+        with self.assertRaisesRegex(ValueError, "expired"):
+            stale.scan()
+
+        catalog.drop_table(name)
+        table = catalog.create_table(
+            name, schema=schema, location=f"s3://warehouse/{name}"
+        )
+        append(0, 5)
+        with self.assertRaisesRegex(ValueError, "recreated"):
+            IncrementalReader(table, store, "loader").scan()
+        store.reset("loader", name)
+        self.assertEqual(
+            read(IncrementalReader(table, store, "loader")), [0, 1, 2, 3, 4]
+        )
+
+    def test_dataset_cache(self):
+        """Confirm cached datasets are reused and evicted by size."""
+        root = self.temp_dir()
+        cache = DatasetCache(root, max_bytes=2 * 1024 * 1024)
+        first = cache.resolve("https://example.com/a.parquet", synthetic_rows=10000)
+        self.assertEqual(
+            cache.resolve(
+                "https://example.com/a.parquet", synthetic_rows=10000, verify=True
+            ),
+            first,
+        )
+        size = os.path.getsize(first)
+        for i in range(2 * 1024 * 1024 // size + 1):
+            cache.resolve(f"https://example.com/{i}.parquet", synthetic_rows=10000 + i)
+        self.assertLessEqual(cache.total_bytes(), cache.max_bytes)
+        self.assertFalse(os.path.exists(first))
+
+        # A failed download only falls back to synthetic data when asked to.
+        unreachable = "http://127.0.0.1:9/taxi.parquet"
+        with self.assertRaises(RuntimeError):
+            cache.resolve(unreachable)
+        path = cache.resolve(unreachable, fallback_rows=1000)
+        self.assertEqual(path, cache.resolve(unreachable, synthetic_rows=1000))
+
+    def test_merge_log_files(self):
+        """Confirm service logs are merged in timestamp order."""
+        root = self.temp_dir()
+        logs = {
+            "vector": "2025-01-01T00:00:01.5Z a\n  more a\n2025-01-01T00:00:03Z c\n",
+            "swarm": "2025-01-01T00:00:01.25Z b\n",
+        }
+        service_files = {}
+        for service, text in logs.items():
+            service_files[service] = os.path.join(root, f"{service}.log.gz")
+            with gzip.open(service_files[service], "wt") as f:
+                f.write(f"=== Logs for service: {service} ===\n\n{text}")
+        combined = os.path.join(root, "combined.log")
+        merge_log_files(service_files, combined)
+        with open(combined) as f:
+            lines = [line for line in f if " | " in line]
+        self.assertEqual(
+            [line.split(" ")[0] + line.rstrip()[-1] for line in lines],
+            ["swarmb", "vectora", "vectora", "vectorc"],
+        )
+
+    def test_readiness_backoff(self):
+        """Confirm probes are retried with backoff and time out."""
+        attempts = []
+
+        def flaky():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise ConnectionError("starting")
+            return True
+
+        result = wait_for(Probe("flaky", flaky), timeout=5, initial_delay=0.01)
+        self.assertTrue(result.ready)
+        self.assertEqual(result.attempts, 3)
+
+        results = wait_until_ready([Probe("never", lambda: False)], timeout=0.2)
+        self.assertFalse(results[0].ready)
+        self.assertEqual(results[0].error, "not ready")
+
+    def test_tracing_export(self):
+        """Confirm spans nest per thread and export in the Chrome format."""
+        tracer = Tracer()
+        tracer.enable(fmt="chrome")
+        with tracer.span("outer", "query") as attrs:
+            attrs["rows"] = 3
+            with tracer.span("inner", "catalog"):
+                pass
+        thread = threading.Thread(target=tracer.traced("worker", "io")(lambda: None))
+        thread.start()
+        thread.join()
+
+        def blocks():
+            with tracer.span("stream", "query", nest=False):
+                yield from range(2)
+
+        with tracer.span("consumer"):
+            for _ in blocks():
+                with tracer.span("block"):
+                    pass
+
+        spans = {s.name: s for s in tracer.spans}
+        self.assertEqual(spans["inner"].parent, spans["outer"].id)
+        self.assertIsNone(spans["worker"].parent)
+        self.assertEqual(spans["stream"].parent, spans["consumer"].id)
+        self.assertEqual(spans["block"].parent, spans["consumer"].id)
+        self.assertGreaterEqual(spans["outer"].duration, spans["inner"].duration)
+        path = tracer.export(os.path.join(self.temp_dir(), "trace.json"))
+        with open(path) as f:
+            events = [e for e in json.load(f)["traceEvents"] if e["ph"] == "X"]
+        self.assertEqual([e["name"] for e in events][:3], ["outer", "inner", "worker"])
+        self.assertEqual(events[0]["args"], {"rows": 3})
+
+    def test_scaling_curve(self):
+        """Confirm speedup, efficiency and the knee of a scale-out run."""
+        latencies = {1: 800, 2: 400, 4: 250, 8: 240}
+        results = [
+            {"name": name, "nodes": nodes, "warm_p50_ms": ms * factor}
+            for nodes, ms in latencies.items()
+            for name, factor in (("count", 1), ("avg_fare", 2))
+        ]
+        report = scaling_curve(results)
+        self.assertEqual([p["speedup"] for p in report["curve"]], [1.0, 2.0, 3.2, 3.33])
+        self.assertEqual(report["curve"][1]["efficiency"], 1.0)
+        self.assertEqual(report["knee"], 4)
+
+        path = os.path.join(self.temp_dir(), "docker-compose.swarm.yml")
+        compose_file = os.path.join(init_paths().docker_dir, "docker-compose.yml")
+        write_override(path, 4, compose_file)
+        with open(path) as f:
+            services = yaml.safe_load(f)["services"]
+        with open(compose_file) as f:
+            swarm_1 = yaml.safe_load(f)["services"]["swarm-1"]
+        self.assertEqual(list(services), ["swarm-3", "swarm-4"])
+        self.assertEqual(services["swarm-3"]["image"], swarm_1["image"])
+        self.assertEqual(services["swarm-3"]["environment"], swarm_1["environment"])
+        self.assertIn(
+            "./data/swarm-3/clickhouse:/var/lib/clickhouse",
+            services["swarm-3"]["volumes"],
+        )
+
+    def test_history_regression(self):
+        """Confirm the history store flags a slower run but not noise, with
+        runs of other suites in between."""
+        store = HistoryStore(os.path.join(self.temp_dir(), "history.sqlite"))
+        self.addCleanup(store.close)
+        env = {"clickhouse_version": "25.8", "host": "ci"}
+
+        def run(latency, qps):
+            run_id = store.start_run(env)
+            report = {
+                "results": [
+                    {
+                        "name": "count",
+                        "mode": "swarm",
+                        "runs": [
+                            {"phase": "warm", "client_ms": latency + i}
+                            for i in range(5)
+                        ],
+                    }
+                ]
+            }
+            load = {"results": [{"protocol": "http", "mode": "swarm", "level": 8}]}
+            load["results"][0]["throughput_qps"] = qps
+            store.record(run_id, list(measurements("benchmark", report)))
+            store.record(run_id, list(measurements("load", load)))
+            return run_id
+
+        for i in range(5):
+            run(100 + i % 2, 50 + i % 3)
+            for _ in range(3):
+                tests = {"results": [{"name": "test_a", "seconds": 1.0}]}
+                store.record(store.start_run(env), list(measurements("tests", tests)))
+        self.assertEqual(store.compare(run(101, 51)), [])
+
+        regressions = store.compare(run(150, 30))
+        self.assertEqual(
+            [(r.name, r.metric) for r in regressions],
+            [("count/swarm", "latency_ms"), ("http/swarm/8", "throughput_qps")],
         )
+        self.assertEqual(regressions[0].change_pct, 48.3)
 
-        # Create the table from scratch.
-        self.os_helper.run_ice_command(
+    def test_ice_ingest_batches(self):
+        """Confirm ice inserts run in batches and commit conflicts are retried."""
+        root = self.temp_dir()
+        for i in range(5):
+            open(os.path.join(root, f"part-{i}.parquet"), "w").close()
+        manifest = os.path.join(root, "files.txt")
+        with open(manifest, "w") as f:
+            f.write(f"{root}/part-0.parquet\n\n{root}/part-4.parquet\n")
+        files = discover([root, manifest, "s3://bucket/more/*.parquet"])
+        self.assertEqual(len(files), 6)
+
+        # Fake ice that fails the first commit of the batch with part-2.
+        ice = os.path.join(root, "ice")
+        with open(ice, "w") as f:
+            f.write(
+                f"#!{sys.executable}\n"
+                "import os, sys\n"
+                f"root = {root!r}\n"
+                "marker = os.path.join(root, 'conflicted')\n"
+                "if any('part-2' in a for a in sys.argv) and not os.path.exists(marker):\n"
+                "    open(marker, 'w').close()\n"
+                "    print('CommitFailedException: branch main has changed')\n"
+                "    sys.exit(1)\n"
+                "with open(os.path.join(root, 'calls'), 'a') as log:\n"
+                "    log.write(' '.join(sys.argv[4:]) + '\\n')\n"
+                "print('Committed snapshot')\n"
+            )
+        os.chmod(ice, 0o755)
+
+        ingest = IceIngest(
+            self.config,
+            init_paths(),
             self,
-            ice_command=[
-                "insert",
-                "nyc.taxis_test",
-                "-p",
-                "https://d37ci6vzurychx.cloudfront.net/trip-data/yellow_tripdata_2025-01.parquet",
-            ],
-            expected_output="Committed snapshot",
-            expected_returncode=0,
+            "nyc.taxis",
+            batch_size=2,
+            parallel=2,
+            backoff=0.01,
+            executable=ice,
         )
+        report = ingest.run(files)
+        self.assertEqual((report["batches"], report["retries"]), (3, 1))
+        with open(os.path.join(root, "calls")) as f:
+            calls = f.read().splitlines()
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(sum("--skip-duplicates" in call for call in calls), 1)
 
-        # Create a test iceberg catalog database in ClickHouse, dropping it first.
-        catalog_created = self.clickhouse_helper.create_iceberg_rest_catalog(
-            self, "ice_test", True
+        # A failed first batch, e.g. one that cannot create the table, stops
+        # the ingest before other batches start.
+        failing = os.path.join(root, "failing-ice")
+        with open(failing, "w") as f:
+            f.write(f"#!{sys.executable}\nprint('Table not found')\nexit(1)\n")
+        os.chmod(failing, 0o755)
+        ingest.executable = failing
+        report = ingest.insert(files)
+        self.assertEqual([f["batch"] for f in report["failed"]], [0])
+        self.assertEqual(report["skipped_batches"], 2)
+        # Without a test case, as in the command line tool, failures raise.
+        ingest.test_case = None
+        with self.assertRaisesRegex(RuntimeError, "1 ice insert batches failed"):
+            ingest.run(files)
+
+    def test_ice_database_show_tables(self):
+        """Verify we can create an Ice catalog database and show tables."""
+        # Create a test Ice catalog database in ClickHouse with a unique name.
+        database = unique_name("ice_test")
+        self.clickhouse_helper.create_iceberg_rest_catalog(self, database, True)
+        self.addCleanup(
+            self.clickhouse_helper.ddl, self, f"DROP DATABASE IF EXISTS {database}"
         )
-        assert catalog_created
+        self.clickhouse_helper.query(self, f"show tables from {database}")
+
+    def test_load_ice_and_select(self):
+        """Verify we can load a file to Ice catalog and read from ClickHouse."""
+        # Load the table once per session and create its catalog database.
+        table = taxi_table(self)
 
         # Issue a query to check stats. Number must be greater than 0.
-        vector_query = """
+        vector_query = f"""
         SELECT
             count() AS count,
             avg(passenger_count) AS passengers,
             avg(fare_amount) AS fare
-        FROM ice_test.`nyc.taxis_test`
+        FROM {table}
         """
         vector_result = self.clickhouse_helper.query(self, vector_query)
         assert "count" in vector_result
@@ -150,6 +820,63 @@ class AntalyaTestFramework(unittest.TestCase):
             f"Swarm count {swarm_result['count']} equals vector count {vector_result['count']}"
         )
 
+    @serial
+    def test_swarm_benchmark(self):
+        """Confirm the benchmark reports latency and query_log stats per mode."""
+        taxi_table(self)
+        benchmark = QueryBenchmark(self.clickhouse_helper, self, repeats=2, cold_runs=2)
+        report = benchmark.run(queries=DEFAULT_QUERIES[:1])
+        self.assertEqual(len(report["results"]), 2)
+        for result in report["results"]:
+            self.assertIsNotNone(result["cold_p50_ms"])
+            self.assertIsNotNone(result["warm_p50_ms"])
+            self.assertGreater(result["read_rows"], 0)
+        self.assertIn("count", report["speedups"])
+
+    def test_load_generator(self):
+        """Confirm concurrent load is reported per protocol, mode and level."""
+        taxi_table(self)
+        generator = LoadGenerator(self.config)
+        report = generator.sweep(levels=(1, 2), duration=2)
+        self.assertEqual(len(report["results"]), 8)
+        for result in report["results"]:
+            self.assertGreater(result["requests"], 0)
+            self.assertEqual(result["errors"], 0, result["error_samples"])
+            self.assertEqual(sum(result["histogram"].values()), result["requests"])
+        self.assertEqual(
+            set(report["knees"]),
+            {"http/vector", "http/swarm", "native/vector", "native/swarm"},
+        )
+
+    def test_swarm_distribution(self):
+        """Confirm sub-queries of a swarm query are reported per node."""
+        table = taxi_table(self)
+        monitor = SwarmMonitor(self.clickhouse_helper, self)
+        self.assertGreater(len(monitor.members()), 0)
+        report = monitor.run_and_measure(f"SELECT count() FROM {table}", watch=True)
+        print(report)
+        self.assertGreater(sum(n.sub_queries for n in report.nodes), 0)
+        self.assertGreater(sum(n.files for n in report.nodes), 0)
+        self.assertGreater(sum(n.read_rows for n in report.nodes), 0)
+        self.assertIsNotNone(report.bytes_skew)
+
+    @serial
+    def test_cache_profile(self):
+        """Confirm cold and warm runs are compared for every cache."""
+        table = taxi_table(self)
+        profiler = CacheProfiler(self.clickhouse_helper, self)
+        report = profiler.profile(f"SELECT avg(fare_amount) FROM {table}", swarm=True)
+        self.assertEqual(set(report["caches"]), set(CACHE_EVENTS))
+        self.assertGreater(report["cold_ms"], 0)
+        self.assertGreater(report["s3_requests"]["cold"], 0)
+        with self.assertRaises(ValueError):
+            profiler.profile("SELECT 1", warm_runs=0)
+
 
 if __name__ == "__main__":
+    load_config()
+    workers = get_config().test_parallel
+    if workers > 1:
+        suite = unittest.defaultTestLoader.loadTestsFromModule(sys.modules[__name__])
+        sys.exit(0 if run_parallel(suite, workers).wasSuccessful() else 1)
     unittest.main(verbosity=2)
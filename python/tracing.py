@@ -0,0 +1,269 @@
+# Copyright 2025
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Lightweight timing spans for the scripts and test helpers. Spans nest per
+# thread and are grouped by category, e.g. catalog, commit, query or
+# subprocess, so a slow run can be attributed to catalog round trips,
+# object storage I/O or ClickHouse. Tracing is off unless enabled, and is
+# exported as JSON or in the Chrome trace format for chrome://tracing or
+# Perfetto. A cProfile or pyinstrument profile can be captured alongside.
+#
+# Set TRACE_OUTPUT to enable tracing for a whole process. {name} and {pid}
+# in the path are replaced by the script name and process id.
+#   TRACE_OUTPUT=traces/{name}-{pid}.json python iceberg_read.py
+
+import atexit
+import cProfile
+import functools
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import List, Optional
+
+FORMATS = ("chrome", "json")
+PROFILERS = ("cprofile", "pyinstrument")
+
+
+@dataclass
+class Span:
+    """A timed section of work. Times are seconds since tracing started."""
+
+    id: int
+    name: str
+    category: str
+    start: float
+    duration: float = 0.0
+    parent: Optional[int] = None
+    thread: str = ""
+    thread_id: int = 0
+    attrs: dict = field(default_factory=dict)
+
+
+class Tracer:
+    """Collect nested timing spans from any thread."""
+
+    def __init__(self):
+        self.enabled = False
+        self.spans: List[Span] = []
+        self.output = None
+        self.format = "chrome"
+        self.profiler_name = None
+        self._profiler = None
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._origin = time.perf_counter()
+
+    def enable(
+        self,
+        output: Optional[str] = None,
+        fmt: str = "chrome",
+        profiler: Optional[str] = None,
+    ):
+        """Start recording spans, and optionally a profile of the calling
+        thread. output is where export() writes by default."""
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown trace format {fmt!r}, expected {FORMATS}")
+        if profiler and profiler not in PROFILERS:
+            raise ValueError(f"Unknown profiler {profiler!r}, expected {PROFILERS}")
+        self.output = output
+        self.format = fmt
+        self.profiler_name = profiler
+        if profiler == "cprofile":
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        elif profiler == "pyinstrument":
+            from pyinstrument import Profiler
+
+            self._profiler = Profiler()
+            self._profiler.start()
+        self.enabled = True
+
+    @contextmanager
+    def span(self, name: str, category: str = "app", nest: bool = True, **attrs):
+        """Time the enclosed block. Yields a dict of attributes that the
+        block can add to, e.g. row counts or whether a cache was hit.
+        Spans opened inside the block are its children unless nest is
+        False, which generators need as their caller runs between yields."""
+        if not self.enabled:
+            yield attrs
+            return
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        record = Span(
+            id=next(self._ids),
+            name=name,
+            category=category,
+            start=time.perf_counter() - self._origin,
+            parent=stack[-1].id if stack else None,
+            thread=threading.current_thread().name,
+            thread_id=threading.get_ident(),
+            attrs=attrs,
+        )
+        if nest:
+            stack.append(record)
+        try:
+            yield attrs
+        except BaseException as e:
+            attrs["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            record.duration = time.perf_counter() - self._origin - record.start
+            if nest:
+                stack.pop()
+            with self._lock:
+                self.spans.append(record)
+
+    def traced(self, name: Optional[str] = None, category: str = "app"):
+        """Decorator that runs a function inside a span."""
+
+        def decorator(fn):
+            span_name = name or fn.__qualname__
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                with self.span(span_name, category):
+                    return fn(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def summary(self) -> List[dict]:
+        """Return count and total and maximum time per span name, slowest
+        first. Nested spans are included in the time of their parents."""
+        totals = defaultdict(lambda: {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+        with self._lock:
+            spans = list(self.spans)
+        for s in spans:
+            t = totals[(s.category, s.name)]
+            t["count"] += 1
+            t["total_ms"] += s.duration * 1000
+            t["max_ms"] = max(t["max_ms"], s.duration * 1000)
+        rows = [
+            {"category": category, "name": name, **t}
+            for (category, name), t in totals.items()
+        ]
+        return sorted(rows, key=lambda r: r["total_ms"], reverse=True)
+
+    def to_chrome(self) -> dict:
+        """Return spans as complete events in the Chrome trace format."""
+        pid = os.getpid()
+        with self._lock:
+            spans = list(self.spans)
+        threads = {s.thread_id: s.thread for s in spans}
+        events = [
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": pid,
+                "tid": tid,
+                "args": {"name": name},
+            }
+            for tid, name in threads.items()
+        ]
+        events += [
+            {
+                "name": s.name,
+                "cat": s.category,
+                "ph": "X",
+                "ts": round(s.start * 1e6, 3),
+                "dur": round(s.duration * 1e6, 3),
+                "pid": pid,
+                "tid": s.thread_id,
+                "args": _jsonable(s.attrs),
+            }
+            for s in sorted(spans, key=lambda s: s.start)
+        ]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def to_json(self) -> dict:
+        """Return spans with parent ids, and the summary."""
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s.start)
+        return {
+            "spans": [{**asdict(s), "attrs": _jsonable(s.attrs)} for s in spans],
+            "summary": self.summary(),
+        }
+
+    def export(self, path: Optional[str] = None, fmt: Optional[str] = None) -> str:
+        """Write the trace, stop the profiler and save its output next to
+        the trace, then print the summary. Returns the trace path."""
+        path = _expand(path or self.output or "trace.json")
+        fmt = fmt or self.format
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.to_chrome() if fmt == "chrome" else self.to_json(), f)
+        print(f"Wrote {len(self.spans)} spans to {path}")
+
+        stem = os.path.splitext(path)[0]
+        if self.profiler_name == "cprofile":
+            self._profiler.disable()
+            self._profiler.dump_stats(f"{stem}.prof")
+            print(f"Wrote cProfile stats to {stem}.prof")
+        elif self.profiler_name == "pyinstrument":
+            self._profiler.stop()
+            with open(f"{stem}.html", "w") as f:
+                f.write(self._profiler.output_html())
+            print(f"Wrote pyinstrument profile to {stem}.html")
+        self.profiler_name = None
+
+        for row in self.summary()[:20]:
+            print(
+                f"  {row['category']:<10} {row['name']:<40} {row['count']:>6}x "
+                f"{row['total_ms']:>10.1f} ms total {row['max_ms']:>10.1f} ms max"
+            )
+        return path
+
+
+def _expand(path: str) -> str:
+    name = os.path.splitext(os.path.basename(sys.argv[0] or "python"))[0]
+    return path.replace("{name}", name).replace("{pid}", str(os.getpid()))
+
+
+def _jsonable(attrs: dict) -> dict:
+    return {
+        k: v if isinstance(v, (str, int, float, bool, type(None))) else str(v)
+        for k, v in attrs.items()
+    }
+
+
+tracer = Tracer()
+span = tracer.span
+traced = tracer.traced
+
+
+def enable_from_env():
+    """Enable tracing if TRACE_OUTPUT is set and export it at exit.
+    TRACE_FORMAT picks chrome or json, TRACE_PROFILER adds a profile."""
+    output = os.getenv("TRACE_OUTPUT")
+    if output and not tracer.enabled:
+        tracer.enable(
+            output,
+            os.getenv("TRACE_FORMAT", "chrome"),
+            os.getenv("TRACE_PROFILER") or None,
+        )
+        atexit.register(tracer.export)
+
+
+enable_from_env()